@@ -4,10 +4,10 @@ from .models import JobSeeker, Employer, UserAccountHistory, OTP
 
 @admin.register(JobSeeker)
 class JobSeekerAdmin(admin.ModelAdmin):
-    list_display = ['user', 'experience_level', 'is_profile_complete', 'created_at']
+    list_display = ['user', 'experience_level', 'profile_completion', 'is_profile_complete', 'created_at']
     list_filter = ['experience_level', 'is_profile_complete', 'is_active', 'created_at']
     search_fields = ['user__username', 'user__email', 'headline', 'skills']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['profile_completion', 'created_at', 'updated_at']
     
     fieldsets = (
         ('User Information', {
@@ -26,7 +26,7 @@ class JobSeekerAdmin(admin.ModelAdmin):
             'fields': ('preferred_job_types', 'preferred_locations', 'expected_salary')
         }),
         ('Status', {
-            'fields': ('is_profile_complete', 'is_active')
+            'fields': ('is_profile_complete', 'is_active', 'profile_completion')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at', 'last_login'),
@@ -86,11 +86,11 @@ class OTPAdmin(admin.ModelAdmin):
     list_display = ['email', 'purpose', 'is_verified', 'attempts', 'created_at']
     list_filter = ['purpose', 'is_verified', 'created_at']
     search_fields = ['email']
-    readonly_fields = ['created_at', 'otp_code']
+    readonly_fields = ['created_at', 'code_hash']
     
     fieldsets = (
         ('OTP Information', {
-            'fields': ('email', 'otp_code', 'purpose')
+            'fields': ('email', 'code_hash', 'purpose')
         }),
         ('Verification', {
             'fields': ('is_verified', 'attempts', 'created_at', 'expires_at')
@@ -8,3 +8,4 @@ class AccountsConfig(AppConfig):
     
     def ready(self):
         import accounts.signals
+        import accounts.audit  # connects the request_finished flush
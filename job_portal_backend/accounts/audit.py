@@ -0,0 +1,150 @@
+"""
+Buffered writer for UserAccountHistory.
+
+``record()`` keeps events in a per-process buffer instead of inserting a row
+inside the request. The buffer is written with one ``bulk_create`` once it
+holds ACCOUNT_HISTORY_BUFFER_SIZE events, or once its oldest event is
+ACCOUNT_HISTORY_FLUSH_INTERVAL seconds old. The age is checked when a
+request finishes, after the response has gone out, and by a timer thread
+started with the first event of a batch, so an idle worker still writes
+within the interval. Whatever is left is written at interpreter exit
+(worker shutdown).
+
+This is best-effort: a worker killed without running atexit (SIGKILL, OOM)
+loses up to one interval of events, and the history view only flushes its
+own process, so events buffered by other workers show up once their timer
+fires.
+
+With ACCOUNT_HISTORY_WRITE_MODE = 'sync' every event is inserted
+immediately, as before.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, connection
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import UserAccountHistory
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._oldest = None
+        self._timer = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, event):
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+                self._start_timer()
+            self._events.append(event)
+            return len(self._events)
+
+    def is_due(self):
+        return bool(self._events) and time.monotonic() - self._oldest >= get_flush_interval()
+
+    def _start_timer(self):
+        self._timer = threading.Timer(get_flush_interval(), self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"❌ Error flushing account history: {str(e)}")
+        finally:
+            # The timer thread's own connection
+            connection.close()
+
+    def cancel_timer(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def flush(self):
+        """Write buffered events; returns how many were written"""
+        with self._lock:
+            events, self._events, self._oldest = self._events, [], None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        try:
+            UserAccountHistory.objects.bulk_create(events)
+            return len(events)
+        except DatabaseError as e:
+            # e.g. a user deleted before the flush: keep the rest of the batch
+            logger.warning(f"⚠️ Bulk history write failed, retrying row by row: {str(e)}")
+            return sum(self._save(event) for event in events)
+
+    def _save(self, event):
+        try:
+            event.save(force_insert=True)
+            return 1
+        except DatabaseError as e:
+            logger.error(f"❌ Dropping history event {event.action} for user {event.user_id}: {str(e)}")
+            return 0
+
+
+buffer = AuditBuffer()
+
+
+def is_buffered():
+    return getattr(settings, 'ACCOUNT_HISTORY_WRITE_MODE', 'buffered') == 'buffered'
+
+
+def get_flush_interval():
+    return getattr(settings, 'ACCOUNT_HISTORY_FLUSH_INTERVAL', 5)
+
+
+def record(user, action, description='', ip_address=None, user_agent=None):
+    """Log an account event for user"""
+    event = UserAccountHistory(
+        user=user,
+        action=action,
+        description=description,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        created_at=timezone.now(),
+    )
+    if not is_buffered():
+        event.save()
+        return
+    if buffer.add(event) >= getattr(settings, 'ACCOUNT_HISTORY_BUFFER_SIZE', 100):
+        buffer.flush()
+
+
+def flush():
+    return buffer.flush()
+
+
+@receiver(request_finished)
+def flush_if_due(sender, **kwargs):
+    if buffer.is_due():
+        try:
+            buffer.flush()
+        except Exception as e:
+            logger.error(f"❌ Error flushing account history: {str(e)}")
+
+
+@atexit.register
+def flush_at_exit():
+    try:
+        buffer.flush()
+    except Exception as e:
+        logger.error(f"❌ Error flushing account history at shutdown: {str(e)}")
@@ -1,9 +1,17 @@
 
+import logging
+import os
 import smtplib
 import socket
 import ssl
+import threading
+import time
+from collections import deque
+from django.conf import settings
 from django.core.mail.backends.smtp import EmailBackend
 
+logger = logging.getLogger(__name__)
+
 class IPv4SMTP(smtplib.SMTP):
     """
     Custom SMTP class that forces IPv4 connection.
@@ -87,44 +95,286 @@ class IPv4SMTP_SSL(smtplib.SMTP_SSL):
         else:
             raise OSError("No IPv4 address found for host")
 
+class PooledConnection:
+    """An authenticated SMTP session plus the bookkeeping the pool needs"""
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+
+class SMTPConnectionPool:
+    """
+    Process-wide pool of authenticated SMTP sessions, keyed on the server and
+    credentials. Idle sessions are reused after a NOOP health check, dropped
+    after ``idle_timeout`` seconds and recycled after ``max_messages`` sends.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._pid = os.getpid()
+
+    def _get_idle(self, key):
+        # Sessions opened before a fork are shared with the parent: start over
+        if self._pid != os.getpid():
+            self._idle = {}
+            self._pid = os.getpid()
+        return self._idle.setdefault(key, [])
+
+    def acquire(self, key, connect, options):
+        """Return an idle healthy session for key, or a new one from connect()"""
+        while True:
+            with self._lock:
+                idle = self._get_idle(key)
+                pooled = idle.pop() if idle else None
+            if pooled is None:
+                return PooledConnection(connect())
+            if self.is_reusable(pooled, options):
+                return pooled
+            self.discard(pooled)
+
+    def release(self, key, pooled, options):
+        pooled.last_used = time.monotonic()
+        if pooled.messages_sent < options['max_messages']:
+            with self._lock:
+                idle = self._get_idle(key)
+                if len(idle) < options['size']:
+                    idle.append(pooled)
+                    return
+        self.discard(pooled)
+
+    def is_reusable(self, pooled, options):
+        idle_for = time.monotonic() - pooled.last_used
+        if idle_for > options['idle_timeout'] or pooled.messages_sent >= options['max_messages']:
+            return False
+        if idle_for < options['check_after']:
+            return True
+        try:
+            return pooled.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def discard(self, pooled):
+        try:
+            pooled.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                pooled.smtp.close()
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for sessions in idle.values():
+            for pooled in sessions:
+                self.discard(pooled)
+
+
+connection_pool = SMTPConnectionPool()
+
+
+class CircuitOpenError(smtplib.SMTPException):
+    """Raised instead of contacting a mail server that is known to be down"""
+    def __init__(self, retry_after):
+        super().__init__(f"Mail server unavailable, circuit open for another {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Process-wide breaker in front of the mail server. Failed sends and sends
+    slower than ``slow_call`` seconds are counted over the last ``window``
+    seconds; at ``failure_threshold`` the circuit opens and sends fail
+    immediately with CircuitOpenError instead of tying up a worker until
+    EMAIL_TIMEOUT. Once ``reset_timeout`` has passed the next send starts a
+    single background probe (half-open): success closes the circuit, failure
+    keeps it open for another timeout.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = deque()
+            self.retry_at = None
+            self.last_error = ''
+            self.last_latency = None
+            self.probe_thread = None
+
+    def retry_after(self):
+        return max(self.retry_at - self.clock(), 0) if self.retry_at is not None else 0
+
+    def allow(self, probe, options):
+        """True if a send may go ahead; starts the probe once an open circuit is due"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() >= self.retry_at:
+                self.state = self.HALF_OPEN
+                self.probe_thread = threading.Thread(
+                    target=self._probe, args=(probe, options), name='smtp-circuit-probe', daemon=True
+                )
+                self.probe_thread.start()
+            return False
+
+    def _probe(self, probe, options):
+        start = self.clock()
+        try:
+            probe()
+        except Exception as e:
+            self.record_failure(e, options)
+        else:
+            self.record_success(self.clock() - start, options)
+
+    def record_success(self, latency, options):
+        if latency > options['slow_call']:
+            self.record_failure(f'Slow response: {latency:.1f}s', options, latency)
+            return
+        with self._lock:
+            self.last_latency = latency
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self.failures.clear()
+                self.retry_at = None
+                logger.info("✅ Mail server is responding again, email circuit closed")
+
+    def record_failure(self, error, options, latency=None):
+        now = self.clock()
+        with self._lock:
+            self.last_error = str(error)
+            if latency is not None:
+                self.last_latency = latency
+            if self.state == self.OPEN:
+                return
+            self.failures.append(now)
+            while self.failures and self.failures[0] < now - options['window']:
+                self.failures.popleft()
+            if self.state == self.HALF_OPEN or len(self.failures) >= options['failure_threshold']:
+                self.state = self.OPEN
+                self.retry_at = now + options['reset_timeout']
+                logger.error(f"❌ Email circuit opened for {options['reset_timeout']}s after: {error}")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_failures': len(self.failures),
+                'retry_after': round(self.retry_after(), 1),
+                'last_error': self.last_error,
+                'last_latency_ms': round(self.last_latency * 1000) if self.last_latency is not None else None,
+            }
+
+
+email_circuit = CircuitBreaker()
+
+
 class IPv4EmailBackend(EmailBackend):
     """
     A Django EmailBackend that forces IPv4 connections to avoid IPv6 timeouts
     triggered by 'Network is unreachable' errors in some environments.
+
+    Sessions come from the process-wide connection_pool, so only the first
+    email pays for the TCP + TLS + AUTH handshake. close() hands a healthy
+    session back to the pool instead of quitting it.
+
+    Every send goes through the email_circuit breaker, so an unreachable or
+    hanging server fails fast after a few attempts. Sends made inside a
+    request don't pass a timeout, so their socket timeout defaults to
+    EMAIL_CIRCUIT_SLOW_CALL instead of EMAIL_TIMEOUT: even the attempts
+    before the circuit opens give up once a send would count as slow.
     """
+    def __init__(self, *args, timeout=None, **kwargs):
+        super().__init__(*args, timeout=timeout, **kwargs)
+        self.pooled = None
+        self.pool_options = {
+            'size': getattr(settings, 'EMAIL_POOL_SIZE', 4),
+            'idle_timeout': getattr(settings, 'EMAIL_POOL_IDLE_TIMEOUT', 60),
+            'max_messages': getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100),
+            'check_after': getattr(settings, 'EMAIL_POOL_CHECK_AFTER', 5),
+        }
+        self.circuit_options = {
+            'failure_threshold': getattr(settings, 'EMAIL_CIRCUIT_FAILURE_THRESHOLD', 3),
+            'window': getattr(settings, 'EMAIL_CIRCUIT_WINDOW', 60),
+            'slow_call': getattr(settings, 'EMAIL_CIRCUIT_SLOW_CALL', 10),
+            'reset_timeout': getattr(settings, 'EMAIL_CIRCUIT_RESET_TIMEOUT', 30),
+        }
+        if timeout is None:
+            self.timeout = min(self.timeout or self.circuit_options['slow_call'], self.circuit_options['slow_call'])
+
+    @property
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.password, self.use_ssl, self.use_tls)
+
+    def connect(self):
+        """Open and authenticate a new SMTP session"""
+        # Override the connection class based on security setting
+        if self.use_ssl:
+            connection_class = IPv4SMTP_SSL
+        else:
+            connection_class = IPv4SMTP
+            
+        # Instantiate our custom connection class
+        connection = connection_class(
+            host=self.host, 
+            port=self.port, 
+            timeout=self.timeout
+        )
+        
+        # Additional setup that Django's EmailBackend usually does
+        if not self.use_ssl and self.use_tls:
+            # Python 3.12 removed keyfile/certfile args from starttls
+            # Use context instead
+            if self.ssl_certfile or self.ssl_keyfile:
+                context = ssl.create_default_context()
+                context.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
+                connection.starttls(context=context)
+            else:
+                connection.starttls()
+            
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+            
+        return connection
+
+    def probe(self):
+        """Open and NOOP a fresh session for the half-open circuit, then pool it"""
+        pooled = PooledConnection(self.connect())
+        code = pooled.smtp.noop()[0]
+        if code != 250:
+            connection_pool.discard(pooled)
+            raise smtplib.SMTPResponseException(code, 'NOOP failed')
+        connection_pool.release(self.pool_key, pooled, self.pool_options)
+
+    def check_circuit(self):
+        """False (or CircuitOpenError) if the mail server is known to be down"""
+        if email_circuit.allow(self.probe, self.circuit_options):
+            return True
+        if self.fail_silently:
+            return False
+        raise CircuitOpenError(email_circuit.retry_after())
+
     def open(self):
         if self.connection:
             return False
+        if not self.check_circuit():
+            return False
             
         try:
-            # Override the connection class based on security setting
-            if self.use_ssl:
-                connection_class = IPv4SMTP_SSL
-            else:
-                connection_class = IPv4SMTP
-                
-            # Instantiate our custom connection class
-            self.connection = connection_class(
-                host=self.host, 
-                port=self.port, 
-                timeout=self.timeout
-            )
-            
-            # Additional setup that Django's EmailBackend usually does
-            if not self.use_ssl and self.use_tls:
-                # Python 3.12 removed keyfile/certfile args from starttls
-                # Use context instead
-                if self.ssl_certfile or self.ssl_keyfile:
-                    import ssl
-                    context = ssl.create_default_context()
-                    context.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
-                    self.connection.starttls(context=context)
-                else:
-                    self.connection.starttls()
-                
-            if self.username and self.password:
-                self.connection.login(self.username, self.password)
-                
+            self.pooled = connection_pool.acquire(self.pool_key, self.connect, self.pool_options)
+            self.connection = self.pooled.smtp
+            # A pooled session keeps the timeout of whoever opened it
+            sock = getattr(self.connection, 'sock', None)
+            if sock is not None:
+                sock.settimeout(self.timeout)
             return True
         except OSError as e:
             if not self.fail_silently:
@@ -134,3 +384,66 @@ class IPv4EmailBackend(EmailBackend):
                 raise
                 
         return False
+
+    def close(self, broken=False):
+        """Return the session to the pool, or quit it if it failed"""
+        if self.connection is None:
+            return
+        pooled, self.pooled, self.connection = self.pooled, None, None
+        if broken:
+            connection_pool.discard(pooled)
+        else:
+            connection_pool.release(self.pool_key, pooled, self.pool_options)
+
+    def send_messages(self, email_messages):
+        """
+        Send all messages over one session, swapping in a fresh session when
+        the current one reaches EMAIL_POOL_MAX_MESSAGES. Failures and slow
+        sends are reported to the email circuit breaker.
+        """
+        if not email_messages:
+            return 0
+        if not self.check_circuit():
+            return 0
+        start = email_circuit.clock()
+        try:
+            num_sent = self._send_pooled(email_messages)
+        except CircuitOpenError:
+            raise
+        except (smtplib.SMTPException, OSError) as e:
+            email_circuit.record_failure(e, self.circuit_options, email_circuit.clock() - start)
+            raise
+        if num_sent < sum(1 for message in email_messages if message.recipients()):
+            # Swallowed by fail_silently
+            email_circuit.record_failure('Messages were not sent', self.circuit_options)
+        else:
+            email_circuit.record_success((email_circuit.clock() - start) / len(email_messages), self.circuit_options)
+        return num_sent
+
+    def _send_pooled(self, email_messages):
+        with self._lock:
+            new_conn_created = self.open()
+            if not self.connection or new_conn_created is None:
+                # We failed silently on open().
+                return 0
+            num_sent = 0
+            broken = False
+            try:
+                for message in email_messages:
+                    if self.pooled.messages_sent >= self.pool_options['max_messages']:
+                        self.close()
+                        if not self.open() or not self.connection:
+                            break
+                    if self._send(message):
+                        self.pooled.messages_sent += 1
+                        num_sent += 1
+                    elif message.recipients():
+                        # An SMTP error swallowed by fail_silently
+                        broken = True
+            except Exception:
+                # Never hand a session in an unknown state back to the pool
+                self.close(broken=True)
+                raise
+            if new_conn_created or broken:
+                self.close(broken=broken)
+        return num_sent
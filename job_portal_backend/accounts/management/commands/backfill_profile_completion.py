@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import PROFILE_COMPLETION_FIELD_NAMES, JobSeeker
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored profile completion of every job seeker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Job seekers per UPDATE batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['profile_completion', 'profile_missing_fields']
+        queryset = JobSeeker.objects.only('pk', *fields, *PROFILE_COMPLETION_FIELD_NAMES).order_by('pk')
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            changed = []
+            for job_seeker in batch:
+                before = (job_seeker.profile_completion, job_seeker.profile_missing_fields)
+                job_seeker.update_profile_completion()
+                if (job_seeker.profile_completion, job_seeker.profile_missing_fields) != before:
+                    changed.append(job_seeker)
+            JobSeeker.objects.bulk_update(changed, fields)
+            updated += len(changed)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Profile completion updated for {updated} job seekers'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_skill'),
+        ('accounts', '0003_jobseeker_profile_picture_jobseeker_resume'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSeekerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_seeker_skills', to='accounts.jobseeker')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_seeker_skills', to='jobs.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='job_seekers', through='accounts.JobSeekerSkill', to='jobs.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='jobseekerskill',
+            index=models.Index(fields=['skill', 'job_seeker'], name='accounts_seekerskill_skill_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobseekerskill',
+            unique_together={('job_seeker', 'skill')},
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+
+def hash_otp(email, purpose, otp_code):
+    # Frozen copy of accounts.otp_service.hash_otp as of this migration;
+    # pending codes only verify while the two still agree
+    return salted_hmac('accounts.otp', f'{email}|{purpose}|{otp_code}', algorithm='sha256').hexdigest()
+
+
+def hash_existing_codes(apps, schema_editor):
+    OTP = apps.get_model('accounts', 'OTP')
+    for otp in OTP.objects.only('email', 'purpose', 'otp_code'):
+        OTP.objects.filter(pk=otp.pk).update(code_hash=hash_otp(otp.email, otp.purpose, otp.otp_code))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_populate_jobseeker_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='otp',
+            name='code_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        # Pending codes keep working; they expire within minutes anyway
+        migrations.RunPython(hash_existing_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='otp',
+            name='otp_code',
+        ),
+    ]
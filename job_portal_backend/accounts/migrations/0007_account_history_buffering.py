@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_otp_code_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useraccounthistory',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='useraccounthistory',
+            index=models.Index(fields=['user', '-created_at'], name='accounthistory_user_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_account_history_buffering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseeker',
+            name='profile_completion',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Whole percent'),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='profile_missing_fields',
+            field=models.PositiveIntegerField(default=4095),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+BATCH_SIZE = 500
+# Frozen copy of accounts.models.PROFILE_COMPLETION_FIELDS as of this
+# migration; bit n of profile_missing_fields is the n-th field
+PROFILE_COMPLETION_FIELDS = [
+    'phone',
+    'date_of_birth',
+    'location',
+    'headline',
+    'bio',
+    'portfolio_url',
+    'linkedin_url',
+    'github_url',
+    'skills',
+    'preferred_job_types',
+    'preferred_locations',
+    'expected_salary',
+]
+
+
+def profile_completion_state(values):
+    missing = sum(1 << bit for bit, name in enumerate(PROFILE_COMPLETION_FIELDS) if not values[name])
+    total = len(PROFILE_COMPLETION_FIELDS)
+    return missing, round((total - bin(missing).count('1')) / total * 100)
+
+
+def populate_profile_completion(apps, schema_editor):
+    JobSeeker = apps.get_model('accounts', 'JobSeeker')
+    queryset = JobSeeker.objects.order_by('pk').values('pk', *PROFILE_COMPLETION_FIELDS)
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not rows:
+            break
+        job_seekers = []
+        for row in rows:
+            missing, completion = profile_completion_state(row)
+            job_seekers.append(JobSeeker(pk=row['pk'], profile_missing_fields=missing, profile_completion=completion))
+        JobSeeker.objects.bulk_update(job_seekers, ['profile_missing_fields', 'profile_completion'])
+        last_pk = rows[-1]['pk']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_jobseeker_profile_completion'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_profile_completion, migrations.RunPython.noop),
+    ]
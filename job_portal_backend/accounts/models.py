@@ -3,7 +3,40 @@ from django.contrib.auth.models import User
 from django.core.validators import URLValidator
 from django.utils import timezone
 
-class JobSeeker(models.Model):
+from jobs.tracking import DirtyFieldsMixin
+
+# Fields counted by the profile completion score, with the label shown for a
+# missing one. Bit i of JobSeeker.profile_missing_fields is set while field i
+# is empty, so only ever append to this list.
+PROFILE_COMPLETION_FIELDS = [
+    ('phone', 'Phone number'),
+    ('date_of_birth', 'Date of birth'),
+    ('location', 'Location'),
+    ('headline', 'Professional headline'),
+    ('bio', 'About section'),
+    ('portfolio_url', 'Portfolio URL'),
+    ('linkedin_url', 'LinkedIn URL'),
+    ('github_url', 'GitHub URL'),
+    ('skills', 'Skills'),
+    ('preferred_job_types', 'Preferred job types'),
+    ('preferred_locations', 'Preferred locations'),
+    ('expected_salary', 'Expected salary'),
+]
+PROFILE_COMPLETION_FIELD_NAMES = {name for name, label in PROFILE_COMPLETION_FIELDS}
+ALL_PROFILE_FIELDS_MISSING = (1 << len(PROFILE_COMPLETION_FIELDS)) - 1
+
+
+def profile_completion_state(values):
+    """(profile_missing_fields, profile_completion) for a {field name: value} mapping"""
+    missing = sum(
+        1 << bit for bit, (name, label) in enumerate(PROFILE_COMPLETION_FIELDS)
+        if not values[name]
+    )
+    total = len(PROFILE_COMPLETION_FIELDS)
+    return missing, round((total - bin(missing).count('1')) / total * 100)
+
+
+class JobSeeker(DirtyFieldsMixin, models.Model):
     """Model for job searchers/seekers"""
     EXPERIENCE_CHOICES = [
         ('fresher', 'Fresher'),
@@ -36,6 +69,12 @@ class JobSeeker(models.Model):
     
     # Skills (comma-separated or use a separate model for many-to-many)
     skills = models.TextField(blank=True, null=True, help_text="Comma-separated skills")
+    normalized_skills = models.ManyToManyField(
+        'jobs.Skill',
+        through='JobSeekerSkill',
+        related_name='job_seekers',
+        blank=True
+    )
     
     # Preferences
     preferred_job_types = models.CharField(
@@ -56,6 +95,10 @@ class JobSeeker(models.Model):
     is_profile_complete = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     
+    # Profile completion, maintained by save() from PROFILE_COMPLETION_FIELDS
+    profile_completion = models.PositiveSmallIntegerField(default=0, db_index=True, help_text="Whole percent")
+    profile_missing_fields = models.PositiveIntegerField(default=ALL_PROFILE_FIELDS_MISSING)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -85,20 +128,54 @@ class JobSeeker(models.Model):
     
     @property
     def profile_completion_percentage(self):
-        """Calculate profile completion percentage"""
-        fields_to_check = [
-            'phone', 'date_of_birth', 'location', 'headline', 'bio',
-            'portfolio_url', 'linkedin_url', 'github_url', 'skills',
-            'preferred_job_types', 'preferred_locations', 'expected_salary'
+        """Profile completion percentage"""
+        missing = bin(self.profile_missing_fields).count('1')
+        total = len(PROFILE_COMPLETION_FIELDS)
+        return ((total - missing) / total) * 100
+    
+    @property
+    def missing_profile_fields(self):
+        """Labels of the empty completion fields"""
+        return [
+            label for bit, (name, label) in enumerate(PROFILE_COMPLETION_FIELDS)
+            if self.profile_missing_fields & (1 << bit)
         ]
-        
-        completed = sum(1 for field in fields_to_check if getattr(self, field))
-        total = len(fields_to_check)
-        
-        return (completed / total) * 100 if total > 0 else 0
+    
+    def update_profile_completion(self):
+        """Recompute profile_missing_fields and profile_completion from the fields"""
+        self.profile_missing_fields, self.profile_completion = profile_completion_state(
+            {name: getattr(self, name) for name in PROFILE_COMPLETION_FIELD_NAMES}
+        )
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        fields = PROFILE_COMPLETION_FIELD_NAMES
+        if update_fields is not None:
+            fields = fields & set(update_fields)
+        # Only recompute when a counted field may have changed
+        if fields and (not self.is_tracked or self.changed_fields & fields):
+            self.update_profile_completion()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'profile_completion', 'profile_missing_fields'}
+        super().save(*args, **kwargs)
+
+
+class JobSeekerSkill(models.Model):
+    """Canonical skills of a job seeker, mirrored from JobSeeker.skills"""
+    job_seeker = models.ForeignKey(JobSeeker, on_delete=models.CASCADE, related_name='job_seeker_skills')
+    skill = models.ForeignKey('jobs.Skill', on_delete=models.CASCADE, related_name='job_seeker_skills')
+    
+    class Meta:
+        unique_together = ['job_seeker', 'skill']
+        indexes = [
+            models.Index(fields=['skill', 'job_seeker'], name='accounts_seekerskill_skill_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_seeker_id} - {self.skill_id}"
 
 
-class Employer(models.Model):
+class Employer(DirtyFieldsMixin, models.Model):
     """Model for employers/recruiters"""
     COMPANY_SIZE_CHOICES = [
         ('startup', 'Startup (1-50)'),
@@ -160,11 +237,15 @@ class UserAccountHistory(models.Model):
     description = models.TextField(blank=True, null=True)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered row is written (see audit.py)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='accounthistory_user_idx'),
+        ]
         verbose_name = "User Account History"
         verbose_name_plural = "User Account Histories"
     
@@ -175,7 +256,8 @@ class UserAccountHistory(models.Model):
 class OTP(models.Model):
     """Model to store OTP for email verification and authentication"""
     email = models.EmailField()
-    otp_code = models.CharField(max_length=6, unique=False)
+    # Keyed hash of the code, see otp_service.hash_otp; the code itself is only emailed
+    code_hash = models.CharField(max_length=64)
     purpose = models.CharField(
         max_length=20,
         choices=[
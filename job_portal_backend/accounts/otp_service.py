@@ -1,13 +1,28 @@
 """OTP generation and verification utilities"""
-import random
+import secrets
 import string
+from django.db import connection
+from django.db.models import F
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 from datetime import timedelta
+from .custom_email_backend import CircuitOpenError
 from .models import OTP
 
+MAX_ATTEMPTS = 5
+# Databases whose UPDATE supports RETURNING (SQLite 3.35+)
+RETURNING_VENDORS = ('postgresql', 'sqlite')
+
 def generate_otp(length=6):
     """Generate a random OTP code"""
-    return ''.join(random.choices(string.digits, k=length))
+    return ''.join(secrets.choice(string.digits) for _ in range(length))
+
+def hash_otp(email, purpose, otp_code):
+    """
+    Keyed hash of an OTP code, salted with the address and purpose. A leaked
+    OTP table doesn't reveal live codes without SECRET_KEY.
+    """
+    return salted_hmac('accounts.otp', f'{email}|{purpose}|{otp_code}', algorithm='sha256').hexdigest()
 
 def send_otp_email(email, otp_code, purpose='registration'):
     """Send OTP via email"""
@@ -35,6 +50,9 @@ def send_otp_email(email, otp_code, purpose='registration'):
             fail_silently=False,
         )
         return True
+    except CircuitOpenError:
+        # The caller tells the user to retry instead of waiting on the server
+        raise
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -62,7 +80,7 @@ def create_otp(email, purpose='registration'):
     
     otp = OTP.objects.create(
         email=email,
-        otp_code=otp_code,
+        code_hash=hash_otp(email, purpose, otp_code),
         purpose=purpose,
         expires_at=expires_at
     )
@@ -73,33 +91,61 @@ def create_otp(email, purpose='registration'):
     return otp
 
 def verify_otp(email, otp_code, purpose='registration'):
-    """Verify OTP for given email and purpose"""
-    try:
-        otp = OTP.objects.get(email=email, purpose=purpose)
-    except OTP.DoesNotExist:
-        return False, "OTP not found"
-    
-    # Check if OTP is expired
-    if otp.is_expired():
-        return False, "OTP has expired"
-    
-    # Check attempt limit
-    if otp.attempts >= 5:
+    """
+    Verify OTP for given email and purpose.
+
+    The attempt count, expiry and code are checked and updated by a single
+    conditional UPDATE, so concurrent guesses can't exceed MAX_ATTEMPTS.
+    The row is only read again to explain a rejection.
+    """
+    code_hash = hash_otp(email, purpose, otp_code)
+    if connection.vendor in RETURNING_VENDORS:
+        result = _guess_returning(email, purpose, code_hash)
+    else:
+        result = _guess_update(email, purpose, code_hash)
+
+    if result is None:
+        otp = OTP.objects.filter(email=email, purpose=purpose).only('attempts', 'expires_at').first()
+        if otp is None:
+            return False, "OTP not found"
+        if otp.is_expired():
+            return False, "OTP has expired"
         return False, "Too many incorrect attempts"
-    
-    # Check if OTP code matches
-    if otp.otp_code != otp_code:
-        otp.attempts += 1
-        otp.save()
-        return False, f"Invalid OTP. {5 - otp.attempts} attempts remaining"
-    
-    # Mark as verified
-    otp.is_verified = True
-    otp.save()
-    
+
+    matched, attempts = result
+    if not matched:
+        return False, f"Invalid OTP. {MAX_ATTEMPTS - attempts} attempts remaining"
     return True, "OTP verified successfully"
 
-def cleanup_expired_otps():
-    """Delete expired OTPs (scheduled task)"""
-    from django.utils import timezone
-    OTP.objects.filter(expires_at__lt=timezone.now()).delete()
+def _guess_returning(email, purpose, code_hash):
+    """(matched, attempts) for a live OTP, or None; one UPDATE ... RETURNING"""
+    table = connection.ops.quote_name(OTP._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET "
+            "attempts = CASE WHEN code_hash = %s THEN attempts ELSE attempts + 1 END, "
+            "is_verified = CASE WHEN code_hash = %s THEN %s ELSE is_verified END "
+            "WHERE email = %s AND purpose = %s AND attempts < %s AND expires_at > %s "
+            "RETURNING code_hash, attempts",
+            [code_hash, code_hash, True, email, purpose, MAX_ATTEMPTS, timezone.now()],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return constant_time_compare(row[0], code_hash), row[1]
+
+def _guess_update(email, purpose, code_hash):
+    """Same as _guess_returning for databases without UPDATE ... RETURNING"""
+    live = OTP.objects.filter(email=email, purpose=purpose, attempts__lt=MAX_ATTEMPTS, expires_at__gt=timezone.now())
+    if live.filter(code_hash=code_hash).update(is_verified=True):
+        return True, None
+    if not live.update(attempts=F('attempts') + 1):
+        return None
+    return False, OTP.objects.filter(email=email, purpose=purpose).values_list('attempts', flat=True).first()
+
+def cleanup_expired_otps(batch_size=None):
+    """Delete expired OTPs, at most batch_size of them; run by run_maintenance"""
+    expired = OTP.objects.filter(expires_at__lt=timezone.now())
+    if batch_size is not None:
+        expired = OTP.objects.filter(pk__in=list(expired.values_list('pk', flat=True)[:batch_size]))
+    return expired.delete()[0]
@@ -0,0 +1,108 @@
+"""
+Account registration.
+
+``register_user()`` creates everything a new account needs in one
+transaction: the User, its ``jobs.UserProfile``, the JobSeeker or Employer
+profile and the 'created' history row, and queues exactly one welcome email.
+The profile rows are written with ``bulk_create`` so none of the per-row
+model signals run for a brand new, empty profile.
+
+Every registration endpoint goes through here; the post_save(User)
+receivers that used to do this piecemeal on every ``user.save()`` are gone.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from jobs import outbox
+from jobs.email_assets import render_email
+from jobs.models import UserProfile
+
+from .models import Employer, JobSeeker, UserAccountHistory
+
+logger = logging.getLogger(__name__)
+
+# Meta.extra_kwargs for registration serializers: drops the UniqueValidator
+# ModelSerializer adds to username, since find_conflicts() already checks it
+SERIALIZER_EXTRA_KWARGS = {'username': {'validators': [UnicodeUsernameValidator()]}}
+
+
+def find_conflicts(username, email):
+    """Serializer-style errors for a taken username or email, in one query"""
+    match = Q(username=username)
+    if email:
+        match |= Q(email=email)
+    errors = {}
+    for taken_username, taken_email in User.objects.filter(match).values_list('username', 'email'):
+        if email and taken_email == email:
+            errors['email'] = "Email already in use."
+        if taken_username == username:
+            errors['username'] = "Username already taken."
+    return errors
+
+
+def build_welcome_email(user, user_type):
+    """(subject, html, plain) of the welcome email for a new account"""
+    if user_type == 'employer':
+        subject = "Welcome to Job Portal Employer Dashboard!"
+        context = {
+            'company_name': user.username,
+            'user_name': user.first_name or user.username,
+            'email': user.email,
+            'portal_url': settings.FRONTEND_URL,
+            'dashboard_url': f'{settings.FRONTEND_URL}/employer/dashboard',
+        }
+        html_message, plain_message = render_email('emails/employer_welcome.html', context)
+    else:
+        subject = f"Welcome to Job Portal, {user.first_name or user.username}!"
+        context = {
+            'user_name': user.first_name or user.username,
+            'email': user.email,
+            'username': user.username,
+            'portal_url': settings.FRONTEND_URL,
+            'jobs_url': f'{settings.FRONTEND_URL}/jobs',
+            'profile_url': f'{settings.FRONTEND_URL}/profile',
+        }
+        html_message, plain_message = render_email('emails/job_seeker_welcome.html', context)
+    return subject, html_message, plain_message
+
+
+def register_user(username, email, password, user_type='job_seeker', first_name='', last_name=''):
+    """
+    Create a user with all of its profile rows and queue the welcome email.
+    Raises a ValidationError if the username was taken concurrently.
+    """
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
+        first_name=first_name or '',
+        last_name=last_name or '',
+    )
+    user.set_password(password)
+    # Tells the fallback post_save receiver in jobs.signals not to add a profile
+    user._registering = True
+
+    role = 'Employer' if user_type == 'employer' else 'JobSeeker'
+    try:
+        with transaction.atomic():
+            user.save()
+            UserProfile.objects.bulk_create([UserProfile(user=user, user_type=user_type)])
+            if user_type == 'employer':
+                Employer.objects.bulk_create([Employer(user=user, company_name=user.username)])
+            else:
+                JobSeeker.objects.bulk_create([JobSeeker(user=user)])
+            # Written with the account, not through the audit buffer
+            UserAccountHistory.objects.bulk_create([
+                UserAccountHistory(user=user, action='created', description=f'New {role} account created')
+            ])
+            outbox.enqueue(*build_welcome_email(user, user_type), [user.email])
+    except IntegrityError:
+        raise serializers.ValidationError({'username': "Username already taken."})
+
+    logger.info(f"✅ {role} account registered: {user.username}")
+    return user
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import JobSeeker, Employer, UserAccountHistory
+from .registration import SERIALIZER_EXTRA_KWARGS, find_conflicts, register_user
 try:
     from jobs.models import UserProfile
 except ImportError:
@@ -75,55 +76,21 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'email', 'first_name', 'last_name', 'password', 'password_confirm', 'user_type']
+        extra_kwargs = SERIALIZER_EXTRA_KWARGS
     
     def validate(self, data):
         if data['password'] != data['password_confirm']:
             raise serializers.ValidationError({"password": "Passwords must match."})
         
-        if User.objects.filter(email=data['email']).exists():
-            raise serializers.ValidationError({"email": "Email already in use."})
-        
-        if User.objects.filter(username=data['username']).exists():
-            raise serializers.ValidationError({"username": "Username already taken."})
+        conflicts = find_conflicts(data['username'], data['email'])
+        if conflicts:
+            raise serializers.ValidationError(conflicts)
         
         return data
     
     def create(self, validated_data):
-        user_type = validated_data.pop('user_type')
         validated_data.pop('password_confirm')
-        
-        user = User.objects.create_user(**validated_data)
-        
-        # Create UserProfile in jobs app with user_type
-        if UserProfile:
-            try:
-                profile, created = UserProfile.objects.get_or_create(
-                    user=user,
-                    defaults={'user_type': user_type}
-                )
-                if not created:
-                    profile.user_type = user_type
-                    profile.save()
-            except Exception as e:
-                print(f"Error creating UserProfile: {e}")
-                raise
-        
-        # Create the appropriate profile based on user_type
-        if user_type == 'job_seeker':
-            try:
-                JobSeeker.objects.create(user=user)
-                print(f"✅ JobSeeker profile created for user: {user.username}")
-            except Exception as e:
-                print(f"Error creating JobSeeker profile: {e}")
-        elif user_type == 'employer':
-            try:
-                Employer.objects.create(user=user, company_name=user.username)
-                print(f"✅ Employer profile created for user: {user.username}")
-            except Exception as e:
-                print(f"Error creating Employer profile: {e}")
-        
-        return user
-
+        return register_user(**validated_data)
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -183,65 +150,31 @@ class OTPRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'email', 'password', 'password_confirm', 'otp_code', 'user_type', 'first_name', 'last_name']
+        extra_kwargs = SERIALIZER_EXTRA_KWARGS
     
     def validate(self, data):
         if data['password'] != data['password_confirm']:
             raise serializers.ValidationError({"password": "Passwords must match."})
         
-        if User.objects.filter(email=data['email']).exists():
-            raise serializers.ValidationError({"email": "Email already in use."})
-        
-        if User.objects.filter(username=data['username']).exists():
-            raise serializers.ValidationError({"username": "Username already taken."})
+        conflicts = find_conflicts(data['username'], data['email'])
+        if conflicts:
+            raise serializers.ValidationError(conflicts)
         
         return data
     
-        return user
-        
     def create(self, validated_data):
         from .otp_service import verify_otp
         
         # Verify OTP
         email = validated_data['email']
         otp_code = validated_data.pop('otp_code')
-        user_type = validated_data.pop('user_type')
         
         is_valid, message = verify_otp(email, otp_code, purpose='registration')
         if not is_valid:
             raise serializers.ValidationError({"otp_code": message})
         
-        # Create user
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
-        
-        # Create UserProfile in jobs app with user_type
-        if UserProfile:
-            try:
-                profile, created = UserProfile.objects.get_or_create(
-                    user=user,
-                    defaults={'user_type': user_type}
-                )
-                if not created:
-                    profile.user_type = user_type
-                    profile.save()
-            except Exception as e:
-                print(f"Error creating UserProfile: {e}")
-        
-        # Create the appropriate profile based on user_type
-        if user_type == 'job_seeker':
-            try:
-                JobSeeker.objects.create(user=user)
-                print(f"✅ JobSeeker profile created for user: {user.username}")
-            except Exception as e:
-                print(f"Error creating JobSeeker profile: {e}")
-        elif user_type == 'employer':
-            try:
-                Employer.objects.create(user=user, company_name=user.username)
-                print(f"✅ Employer profile created for user: {user.username}")
-            except Exception as e:
-                print(f"Error creating Employer profile: {e}")
-        
-        return user
+        return register_user(**validated_data)
 
 
 class OTPLoginSerializer(serializers.Serializer):
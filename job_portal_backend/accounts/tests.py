@@ -1,3 +1,667 @@
-from django.test import TestCase
+import smtplib
+import socket
+import threading
+import time
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from datetime import timedelta
+
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from jobs.models import OutboundEmail, UserProfile
+
+from . import audit, otp_service
+from .custom_email_backend import CircuitOpenError, IPv4EmailBackend, connection_pool, email_circuit
+from .models import OTP, PROFILE_COMPLETION_FIELDS, Employer, JobSeeker, UserAccountHistory
+from .otp_service import create_otp, verify_otp
+
+
+class FakeSMTP:
+    def __init__(self):
+        self.sent = []
+        self.noops = 0
+        self.closed = False
+        self.fail_next = False
+
+    def sendmail(self, from_email, recipients, message):
+        if self.fail_next:
+            raise smtplib.SMTPServerDisconnected("gone")
+        self.sent.append(recipients)
+
+    def noop(self):
+        self.noops += 1
+        return (421, b'closing') if self.closed else (250, b'OK')
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@override_settings(EMAIL_POOL_SIZE=2, EMAIL_POOL_MAX_MESSAGES=3, EMAIL_POOL_IDLE_TIMEOUT=60, EMAIL_POOL_CHECK_AFTER=5)
+class SMTPConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        connection_pool.clear()
+        email_circuit.reset()
+        self.addCleanup(email_circuit.reset)
+        self.sessions = []
+        patcher = mock.patch.object(IPv4EmailBackend, 'connect', side_effect=self.connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(connection_pool.clear)
+
+    def connect(self):
+        session = FakeSMTP()
+        self.sessions.append(session)
+        return session
+
+    def send(self, count=1):
+        messages = [EmailMessage('Hi', 'Body', 'from@test.com', [f'user{i}@test.com']) for i in range(count)]
+        return IPv4EmailBackend().send_messages(messages)
+
+    def test_sessions_are_reused_across_backends(self):
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(len(self.sessions), 1)
+        self.assertEqual(len(self.sessions[0].sent), 2)
+        self.assertFalse(self.sessions[0].closed)
+
+    def test_sessions_are_recycled_after_max_messages(self):
+        self.assertEqual(self.send(5), 5)
+        self.assertEqual([len(session.sent) for session in self.sessions], [3, 2])
+        self.assertTrue(self.sessions[0].closed)
+
+    def test_idle_sessions_are_health_checked_and_expired(self):
+        with mock.patch('accounts.custom_email_backend.time.monotonic', return_value=1000):
+            self.send()
+        self.sessions[0].closed = True  # server dropped it
+
+        with mock.patch('accounts.custom_email_backend.time.monotonic', return_value=1010):
+            self.send()
+        self.assertEqual(self.sessions[0].noops, 1)
+        self.assertEqual(len(self.sessions), 2)
+
+        with mock.patch('accounts.custom_email_backend.time.monotonic', return_value=2000):
+            self.send()
+        self.assertEqual(self.sessions[1].noops, 0)
+        self.assertTrue(self.sessions[1].closed)
+        self.assertEqual(len(self.sessions), 3)
+
+    def test_failed_sessions_are_not_returned_to_the_pool(self):
+        self.send()
+        self.sessions[0].fail_next = True
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            self.send()
+        self.assertTrue(self.sessions[0].closed)
+
+        self.send()
+        self.assertEqual(len(self.sessions), 2)
+
+    def test_persistent_connection_stays_checked_out(self):
+        backend = IPv4EmailBackend()
+        backend.open()
+        backend.send_messages([EmailMessage('Hi', 'Body', 'from@test.com', ['a@test.com'])])
+        # Another backend can't share a checked out session
+        self.send()
+        self.assertEqual(len(self.sessions), 2)
+        backend.close()
+
+
+class FakeSMTPServer:
+    """Minimal local SMTP server; with ``hang`` set it accepts connections and never answers"""
+    def __init__(self):
+        self.hang = False
+        self.connections = 0
+        self.messages = 0
+        self.clients = []
+        self.sock = socket.create_server(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self.clients.append(client)
+            if not self.hang:
+                threading.Thread(target=self.handle, args=(client,), daemon=True).start()
+
+    def handle(self, client):
+        stream = client.makefile('rwb')
+
+        def reply(line):
+            stream.write(line + b'\r\n')
+            stream.flush()
+
+        try:
+            reply(b'220 fake ESMTP')
+            for line in stream:
+                command = line[:4].upper()
+                if command == b'DATA':
+                    reply(b'354 go ahead')
+                    for data in stream:
+                        if data == b'.\r\n':
+                            break
+                    self.messages += 1
+                    reply(b'250 queued')
+                elif command == b'QUIT':
+                    reply(b'221 bye')
+                    break
+                else:
+                    reply(b'250 OK')
+        except OSError:
+            pass
+        client.close()
+
+    def close(self):
+        self.sock.close()
+        for client in self.clients:
+            client.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class EmailCircuitBreakerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = FakeSMTPServer()
+        self.addCleanup(self.server.close)
+        settings_override = override_settings(
+            EMAIL_BACKEND='accounts.custom_email_backend.IPv4EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.port, EMAIL_TIMEOUT=0.2,
+            EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_CIRCUIT_FAILURE_THRESHOLD=2, EMAIL_CIRCUIT_WINDOW=60, EMAIL_CIRCUIT_RESET_TIMEOUT=30,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        connection_pool.clear()
+        self.addCleanup(connection_pool.clear)
+        email_circuit.reset()
+        self.addCleanup(email_circuit.reset)
+        self.clock = FakeClock()
+        patcher = mock.patch.object(email_circuit, 'clock', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self):
+        return send_mail('Hi', 'Body', 'from@test.com', ['to@test.com'])
+
+    def trip(self):
+        self.server.hang = True
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.send()
+        self.assertEqual(email_circuit.state, email_circuit.OPEN)
+
+    def test_hanging_server_opens_the_circuit(self):
+        self.trip()
+        connections = self.server.connections
+
+        started = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            self.send()
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(self.server.connections, connections)
+        self.assertIn('timed out', email_circuit.snapshot()['last_error'])
+
+    @override_settings(EMAIL_TIMEOUT=60, EMAIL_CIRCUIT_SLOW_CALL=0.3)
+    def test_request_path_sends_time_out_at_the_slow_call_bound(self):
+        self.server.hang = True
+        started = time.monotonic()
+        with self.assertRaises(OSError):
+            self.send()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(get_connection(timeout=60).timeout, 60)
+
+    def test_half_open_probe_closes_the_circuit_in_the_background(self):
+        self.trip()
+        self.server.hang = False
+
+        self.clock.now += 31
+        # The send that finds the circuit due still fails fast; the probe runs beside it
+        with self.assertRaises(CircuitOpenError):
+            self.send()
+        email_circuit.probe_thread.join(5)
+        self.assertEqual(email_circuit.state, email_circuit.CLOSED)
+
+        connections = self.server.connections
+        self.assertEqual(self.send(), 1)
+        # Reuses the session the probe opened
+        self.assertEqual(self.server.connections, connections)
+        self.assertEqual(self.server.messages, 1)
+
+    def test_failed_probe_keeps_the_circuit_open(self):
+        self.trip()
+        self.clock.now += 31
+        with self.assertRaises(CircuitOpenError):
+            self.send()
+        email_circuit.probe_thread.join(5)
+        self.assertEqual(email_circuit.state, email_circuit.OPEN)
+        self.assertEqual(email_circuit.snapshot()['retry_after'], 30)
+
+    def test_slow_sends_count_as_failures(self):
+        options = IPv4EmailBackend().circuit_options
+        email_circuit.record_success(options['slow_call'] + 1, options)
+        self.assertEqual(email_circuit.state, email_circuit.CLOSED)
+        email_circuit.record_success(options['slow_call'] + 1, options)
+        self.assertEqual(email_circuit.state, email_circuit.OPEN)
+
+    def test_send_otp_and_health_report_the_open_circuit(self):
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.json()['status'], 'ok')
+
+        self.trip()
+        response = self.client.post('/api/accounts/otp/send_otp/', {'email': 'new@test.com', 'purpose': 'registration'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '30')
+
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.json()['status'], 'degraded')
+        self.assertEqual(response.json()['email']['state'], 'open')
+
+
+THROTTLE_RATES = {
+    'otp_send_ip': '100/h',
+    'otp_send_email': '2/10m',
+    'otp_verify_email': '3/10m',
+    'login_ip': '100/m',
+    'login_username': '3/15m',
+}
+
+
+@override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': THROTTLE_RATES})
+class AuthThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+
+    def test_login_attempts_are_limited_per_username(self):
+        with mock.patch('accounts.views.authenticate', return_value=None) as authenticate:
+            for _ in range(3):
+                response = self.client.post('/api/accounts/auth/login/', {'username': 'seeker', 'password': 'wrong'})
+                self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+            # Rejected before the password hasher runs
+            response = self.client.post('/api/accounts/auth/login/', {'username': 'SEEKER', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn('Retry-After', response)
+            self.assertEqual(authenticate.call_count, 3)
+
+            response = self.client.post('/api/accounts/auth/login/', {'username': 'other', 'password': 'wrong'})
+            self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_username_and_email_share_a_login_budget(self):
+        with mock.patch('accounts.views.authenticate', return_value=None):
+            for login in ['seek@test.com', 'seeker', 'Seek@Test.com']:
+                response = self.client.post('/api/accounts/auth/login/', {'username': login, 'password': 'wrong'})
+                self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+            response = self.client.post('/api/accounts/auth/login/', {'username': 'seeker', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_otp_sends_are_limited_per_email(self):
+        with mock.patch('accounts.views.create_otp') as create_otp:
+            for _ in range(2):
+                response = self.client.post('/api/accounts/otp/send_otp/', {'email': 'new@test.com', 'purpose': 'registration'})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            with self.assertNumQueries(0):
+                response = self.client.post('/api/accounts/otp/send_otp/', {'email': 'New@Test.com', 'purpose': 'registration'})
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(create_otp.call_count, 2)
+
+    def test_otp_guesses_are_limited_per_email(self):
+        for _ in range(3):
+            self.client.post('/api/accounts/otp/verify_otp/', {'email': 'seek@test.com', 'otp_code': '000000', 'purpose': 'login'})
+        response = self.client.post('/api/accounts/otp/login_with_otp/', {'email': 'seek@test.com', 'otp_code': '000000'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class OTPVerificationTest(TestCase):
+    def setUp(self):
+        create_otp('seek@test.com', 'login')
+        self.code = mail.outbox[-1].body.split(': ')[1][:6]
+
+    def test_codes_are_stored_hashed(self):
+        otp = OTP.objects.get(email='seek@test.com')
+        self.assertNotIn(self.code, otp.code_hash)
+        self.assertEqual(otp.code_hash, otp_service.hash_otp('seek@test.com', 'login', self.code))
+        self.assertNotEqual(otp.code_hash, otp_service.hash_otp('seek@test.com', 'registration', self.code))
+
+    def test_correct_code_verifies_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(verify_otp('seek@test.com', self.code, 'login'), (True, "OTP verified successfully"))
+        otp = OTP.objects.get(email='seek@test.com')
+        self.assertTrue(otp.is_verified)
+        self.assertEqual(otp.attempts, 0)
+
+    def test_wrong_guesses_are_capped(self):
+        wrong = '000000' if self.code != '000000' else '111111'
+        with self.assertNumQueries(1):
+            self.assertEqual(verify_otp('seek@test.com', wrong, 'login'), (False, "Invalid OTP. 4 attempts remaining"))
+        for _ in range(4):
+            verify_otp('seek@test.com', wrong, 'login')
+        self.assertEqual(verify_otp('seek@test.com', self.code, 'login'), (False, "Too many incorrect attempts"))
+        self.assertEqual(OTP.objects.get(email='seek@test.com').attempts, 5)
+
+    def test_expired_and_missing_codes(self):
+        OTP.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(verify_otp('seek@test.com', self.code, 'login'), (False, "OTP has expired"))
+        self.assertEqual(verify_otp('other@test.com', self.code, 'login'), (False, "OTP not found"))
+
+    def test_update_fallback_matches(self):
+        wrong = '000000' if self.code != '000000' else '111111'
+        with mock.patch.object(otp_service, 'RETURNING_VENDORS', ()):
+            self.assertEqual(verify_otp('seek@test.com', wrong, 'login'), (False, "Invalid OTP. 4 attempts remaining"))
+            self.assertEqual(verify_otp('seek@test.com', self.code, 'login'), (True, "OTP verified successfully"))
+        self.assertTrue(OTP.objects.get(email='seek@test.com').is_verified)
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentOTPVerificationTest(TransactionTestCase):
+    def test_parallel_guesses_never_exceed_the_cap(self):
+        create_otp('seek@test.com', 'login')
+        code = mail.outbox[-1].body.split(': ')[1][:6]
+        wrong = '000000' if code != '000000' else '111111'
+
+        guesses = 20
+        barrier = threading.Barrier(guesses)
+        messages = []
+
+        def guess():
+            try:
+                barrier.wait()
+                messages.append(verify_otp('seek@test.com', wrong, 'login')[1])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=guess) for _ in range(guesses)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(OTP.objects.get(email='seek@test.com').attempts, otp_service.MAX_ATTEMPTS)
+        self.assertEqual(messages.count("Too many incorrect attempts"), guesses - otp_service.MAX_ATTEMPTS)
+        self.assertEqual(
+            sorted(message for message in messages if message.startswith('Invalid')),
+            [f"Invalid OTP. {n} attempts remaining" for n in range(otp_service.MAX_ATTEMPTS)],
+        )
+        self.assertEqual(verify_otp('seek@test.com', code, 'login'), (False, "Too many incorrect attempts"))
+
+
+@override_settings(ACCOUNT_HISTORY_WRITE_MODE='buffered', ACCOUNT_HISTORY_BUFFER_SIZE=3, ACCOUNT_HISTORY_FLUSH_INTERVAL=5)
+class AccountHistoryBufferTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(audit, 'buffer', audit.AuditBuffer())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(audit.buffer.cancel_timer)
+        self.user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+
+    def test_events_are_written_in_bulk_at_the_size_threshold(self):
+        with self.assertNumQueries(0):
+            audit.record(self.user, 'logged_in')
+            audit.record(self.user, 'updated_profile')
+        with self.assertNumQueries(1):
+            audit.record(self.user, 'logged_out')
+        self.assertEqual(
+            list(UserAccountHistory.objects.order_by('created_at').values_list('action', flat=True)),
+            ['logged_in', 'updated_profile', 'logged_out'],
+        )
+
+    def test_old_events_are_flushed_when_a_request_finishes(self):
+        audit.record(self.user, 'logged_in')
+        self.client.get('/api/health/')
+        self.assertEqual(UserAccountHistory.objects.count(), 0)
+
+        with mock.patch('accounts.audit.time.monotonic', return_value=time.monotonic() + 6):
+            self.client.get('/api/health/')
+        self.assertEqual(UserAccountHistory.objects.count(), 1)
+
+    def test_login_is_logged_without_an_insert_and_visible_in_my_history(self):
+        response = self.client.post('/api/accounts/auth/login/', {'username': 'seeker', 'password': 'password'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(UserAccountHistory.objects.count(), 0)
+        self.assertEqual(len(audit.buffer), 1)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/accounts/account-history/my_history/')
+        self.assertEqual([event['action'] for event in response.data['history']], ['logged_in'])
+
+    def test_failed_bulk_insert_falls_back_to_single_rows(self):
+        audit.record(self.user, 'logged_in')
+        audit.record(self.user, 'logged_out')
+        with mock.patch.object(UserAccountHistory.objects, 'bulk_create', side_effect=DatabaseError('boom')):
+            self.assertEqual(audit.flush(), 2)
+        self.assertEqual(UserAccountHistory.objects.count(), 2)
+
+    @override_settings(ACCOUNT_HISTORY_WRITE_MODE='sync')
+    def test_sync_mode_writes_immediately(self):
+        with self.assertNumQueries(1):
+            audit.record(self.user, 'logged_in')
+        self.assertEqual(len(audit.buffer), 0)
+
+
+@override_settings(ACCOUNT_HISTORY_WRITE_MODE='buffered', ACCOUNT_HISTORY_FLUSH_INTERVAL=0.5)
+class AccountHistoryTimerTest(TransactionTestCase):
+    def test_idle_worker_flushes_after_the_interval(self):
+        user = User.objects.create_user(username='seeker', password='password')
+        with mock.patch.object(audit, 'buffer', audit.AuditBuffer()):
+            audit.record(user, 'logged_in')
+            timer = audit.buffer._timer
+            self.assertEqual(UserAccountHistory.objects.count(), 0)
+            timer.join(5)
+            self.assertEqual(len(audit.buffer), 0)
+        self.assertEqual(UserAccountHistory.objects.count(), 1)
+
+
+class RegistrationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def payload(self, username, user_type='job_seeker'):
+        return {
+            'username': username,
+            'email': f'{username}@test.com',
+            'password': 'SecurePass123',
+            'password_confirm': 'SecurePass123',
+            'user_type': user_type,
+        }
+
+    def assertRegistered(self, username, user_type):
+        user = User.objects.get(username=username)
+        self.assertEqual(user.profile.user_type, user_type)
+        role_model = Employer if user_type == 'employer' else JobSeeker
+        self.assertTrue(role_model.objects.filter(user=user).exists())
+        self.assertEqual(list(UserAccountHistory.objects.filter(user=user).values_list('action', flat=True)), ['created'])
+        self.assertEqual(list(OutboundEmail.objects.values_list('recipients', flat=True)), [[user.email]])
+
+    def test_registration_writes_everything_in_one_transaction(self):
+        # conflict check, then user, profile, role profile, history and email in a savepoint
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/auth/register/', self.payload('seeker'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertRegistered('seeker', 'job_seeker')
+
+    def test_employer_registration_with_session_login(self):
+        response = self.client.post('/api/accounts/auth/register/', self.payload('acme', 'employer'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertRegistered('acme', 'employer')
+
+    def test_taken_username_and_email_are_reported_together(self):
+        User.objects.create_user(username='seeker', email='seeker@test.com', password='password')
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/accounts/auth/register/', self.payload('seeker'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['errors']), {'username', 'email'})
+
+    def test_saving_a_user_does_not_touch_profiles(self):
+        user = User.objects.create_user(username='seeker', password='password')
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+        with self.assertNumQueries(1):
+            user.first_name = 'Sam'
+            user.save()
+
+
+@override_settings(ACCOUNT_HISTORY_WRITE_MODE='sync')
+class DirtyFieldsTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='seeker', email='seeker@test.com', password='password')
+        JobSeeker.objects.create(user=user, skills='Python')
+        self.seeker = JobSeeker.objects.get(user=user)
+
+    def test_only_changed_fields_are_written(self):
+        self.seeker.headline = 'Backend developer'
+        self.assertEqual(self.seeker.changed_fields, {'headline'})
+        with CaptureQueriesContext(connection) as queries:
+            self.seeker.save()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"headline"', queries[0]['sql'])
+        self.assertNotIn('"bio"', queries[0]['sql'])
+        self.assertEqual(self.seeker.changed_fields, set())
+
+    def test_unchanged_save_touches_updated_at(self):
+        updated_at = self.seeker.updated_at
+        with mock.patch('accounts.signals.ranking.invalidate_applicant') as invalidate, \
+                CaptureQueriesContext(connection) as queries:
+            self.seeker.save()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"updated_at"', queries[0]['sql'])
+        self.assertNotIn('"bio"', queries[0]['sql'])
+        self.assertGreater(JobSeeker.objects.get(pk=self.seeker.pk).updated_at, updated_at)
+        invalidate.assert_not_called()
+
+    def test_previous_value_is_kept_until_save(self):
+        self.seeker.experience_level = 'senior'
+        self.assertTrue(self.seeker.has_changed('experience_level'))
+        self.assertEqual(self.seeker.get_previous('experience_level'), 'fresher')
+        self.seeker.save()
+        self.assertEqual(self.seeker.get_previous('experience_level'), 'senior')
+
+    def test_completion_email_is_queued_once_without_rereading_the_row(self):
+        self.seeker.is_profile_complete = True
+        with CaptureQueriesContext(connection) as queries:
+            self.seeker.save()
+        self.assertFalse(any(query['sql'].startswith('SELECT "accounts_jobseeker"') for query in queries))
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+        self.seeker.headline = 'Backend developer'
+        self.seeker.save()
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_skills_are_synced_only_when_they_change(self):
+        self.seeker.skills = 'Python, Django'
+        self.seeker.save()
+        self.assertEqual(self.seeker.normalized_skills.count(), 2)
+
+        self.seeker.bio = 'Hello'
+        with self.assertNumQueries(1):
+            self.seeker.save()
+
+    def test_assigned_deferred_field_is_written(self):
+        seeker = JobSeeker.objects.only('id').get(pk=self.seeker.pk)
+        seeker.headline = 'Backend developer'
+        self.assertIn('headline', seeker.changed_fields)
+        seeker.save()
+        self.assertEqual(JobSeeker.objects.get(pk=seeker.pk).headline, 'Backend developer')
+
+    def test_empty_update_fields_keeps_pending_changes(self):
+        self.seeker.headline = 'Backend developer'
+        self.seeker.save(update_fields=[])
+        self.assertEqual(self.seeker.changed_fields, {'headline'})
+        self.seeker.save()
+        self.assertEqual(JobSeeker.objects.get(pk=self.seeker.pk).headline, 'Backend developer')
+
+
+class ProfileCompletionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seeker', email='seeker@test.com', password='password')
+        JobSeeker.objects.create(user=self.user)
+        self.seeker = JobSeeker.objects.get(user=self.user)
+
+    def test_new_profile_is_empty(self):
+        self.assertEqual(self.seeker.profile_completion, 0)
+        self.assertEqual(len(self.seeker.missing_profile_fields), len(PROFILE_COMPLETION_FIELDS))
+
+    def test_score_is_stored_when_counted_fields_change(self):
+        self.seeker.headline = 'Backend developer'
+        self.seeker.skills = 'Python'
+        self.seeker.save()
+
+        seeker = JobSeeker.objects.get(pk=self.seeker.pk)
+        self.assertEqual(seeker.profile_completion, 17)
+        self.assertAlmostEqual(seeker.profile_completion_percentage, 2 / 12 * 100)
+        self.assertNotIn('Skills', seeker.missing_profile_fields)
+        self.assertIn('About section', seeker.missing_profile_fields)
+
+    def test_other_fields_do_not_recompute_the_score(self):
+        self.seeker.is_active = False
+        with CaptureQueriesContext(connection) as queries:
+            self.seeker.save()
+        self.assertNotIn('profile_completion', queries[0]['sql'])
+
+    def test_backfill_command(self):
+        JobSeeker.objects.filter(pk=self.seeker.pk).update(bio='Hello', location='Pune')
+        call_command('backfill_profile_completion', stdout=StringIO())
+        seeker = JobSeeker.objects.get(pk=self.seeker.pk)
+        self.assertEqual(seeker.profile_completion, 17)
+        self.assertEqual(seeker.missing_profile_fields.count('About section'), 0)
+
+    def test_migration_populates_existing_rows(self):
+        from django.apps import apps
+        populate = import_module('accounts.migrations.0009_populate_profile_completion').populate_profile_completion
+
+        JobSeeker.objects.filter(pk=self.seeker.pk).update(bio='Hello', location='Pune')
+        populate(apps, None)
+        seeker = JobSeeker.objects.get(pk=self.seeker.pk)
+        self.assertEqual(seeker.profile_completion, 17)
+        self.assertNotIn('About section', seeker.missing_profile_fields)
+
+    def test_job_seekers_filter_and_sort_by_completion(self):
+        other = User.objects.create_user(username='other', password='password')
+        JobSeeker.objects.create(user=other, headline='Engineer', bio='Hi', skills='Go')
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/accounts/job-seekers/', {'min_completion': 20})
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([seeker['user']['username'] for seeker in results], ['other'])
+
+        response = client.get('/api/accounts/job-seekers/', {'ordering': 'profile_completion'})
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([seeker['user']['username'] for seeker in results], ['seeker', 'other'])
+
+    def test_profile_completion_endpoint_lists_missing_fields(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/accounts/job-seekers/profile_completion/')
+        self.assertEqual(response.data['completion_percentage'], 0)
+        self.assertEqual(response.data['missing_fields'], [
+            'Professional headline', 'About section', 'Skills', 'Experience level', 'Portfolio URL',
+        ])
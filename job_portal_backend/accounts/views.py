@@ -7,7 +7,9 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 import logging
+import math
 
+from . import audit
 from .models import JobSeeker, Employer, UserAccountHistory
 from .serializers import (
     UserSerializer, JobSeekerSerializer, EmployerSerializer,
@@ -16,6 +18,8 @@ from .serializers import (
     OTPRegisterSerializer, OTPLoginSerializer
 )
 from .otp_service import create_otp, verify_otp
+from .custom_email_backend import CircuitOpenError
+from jobs.throttling import LOGIN_THROTTLES, OTP_SEND_THROTTLES, OTP_VERIFY_THROTTLES
 
 logger = logging.getLogger(__name__)
 
@@ -50,10 +54,6 @@ class UserRegistrationViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             user = serializer.save()
             
-            # Set the user type for signal handling
-            user._user_type = request.data.get('user_type', 'job_seeker')
-            user.save()
-            
             # Establish Django session
             login(request, user)
             
@@ -75,7 +75,7 @@ class UserRegistrationViewSet(viewsets.ModelViewSet):
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], throttle_classes=LOGIN_THROTTLES)
     def login(self, request):
         """
         Login user with username or email and establish Django session.
@@ -124,7 +124,7 @@ class UserRegistrationViewSet(viewsets.ModelViewSet):
                 login(request, user)
                 
                 # Log the login
-                UserAccountHistory.objects.create(
+                audit.record(
                     user=user,
                     action='logged_in',
                     description='User logged in successfully'
@@ -161,7 +161,7 @@ class UserRegistrationViewSet(viewsets.ModelViewSet):
         """
         Logout user (clear Django session).
         """
-        UserAccountHistory.objects.create(
+        audit.record(
             user=request.user,
             action='logged_out',
             description='User logged out'
@@ -207,6 +207,24 @@ class JobSeekerViewSet(viewsets.ModelViewSet):
     serializer_class = JobSeekerSerializer
     permission_classes = [IsAuthenticated]
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
+        # Filter by minimum profile completion (whole percent)
+        min_completion = self.request.query_params.get('min_completion')
+        if min_completion:
+            try:
+                queryset = queryset.filter(profile_completion__gte=int(min_completion))
+            except ValueError:
+                pass
+        
+        # ?ordering=profile_completion or -profile_completion
+        ordering = self.request.query_params.get('ordering')
+        if ordering in ('profile_completion', '-profile_completion'):
+            queryset = queryset.order_by(ordering, '-created_at')
+        
+        return queryset
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_profile(self, request):
         """
@@ -243,7 +261,7 @@ class JobSeekerViewSet(viewsets.ModelViewSet):
             serializer.save()
             
             # Log profile update
-            UserAccountHistory.objects.create(
+            audit.record(
                 user=request.user,
                 action='updated_profile',
                 description='JobSeeker profile updated'
@@ -272,16 +290,12 @@ class JobSeekerViewSet(viewsets.ModelViewSet):
             job_seeker = request.user.job_seeker
             completion = job_seeker.profile_completion_percentage
             
-            missing_fields = []
-            if not job_seeker.headline:
-                missing_fields.append("Professional headline")
-            if not job_seeker.bio:
-                missing_fields.append("About section")
-            if not job_seeker.skills:
-                missing_fields.append("Skills")
+            # The prompts shown to the user, read from the stored bitmask
+            missing = job_seeker.missing_profile_fields
+            missing_fields = [label for label in ("Professional headline", "About section", "Skills") if label in missing]
             if not job_seeker.experience_level or job_seeker.experience_level == 'fresher':
                 missing_fields.append("Experience level")
-            if not job_seeker.portfolio_url:
+            if "Portfolio URL" in missing:
                 missing_fields.append("Portfolio URL")
             
             return Response({
@@ -337,7 +351,7 @@ class EmployerViewSet(viewsets.ModelViewSet):
                 serializer.save()
                 
                 # Log profile update
-                UserAccountHistory.objects.create(
+                audit.record(
                     user=request.user,
                     action='updated_profile',
                     description='Employer profile updated'
@@ -374,6 +388,9 @@ class UserAccountHistoryViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Return history only for the current user.
         """
+        # Include events this process is still buffering; other workers'
+        # appear within ACCOUNT_HISTORY_FLUSH_INTERVAL
+        audit.flush()
         return UserAccountHistory.objects.filter(user=self.request.user)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
@@ -395,7 +412,7 @@ class OTPViewSet(viewsets.ViewSet):
     """ViewSet for OTP-based authentication"""
     permission_classes = [AllowAny]
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=OTP_SEND_THROTTLES)
     def send_otp(self, request):
         """
         Send OTP to email
@@ -419,6 +436,12 @@ class OTPViewSet(viewsets.ViewSet):
                     'message': f'OTP sent to {email}',
                     'email': email
                 }, status=status.HTTP_200_OK)
+            except CircuitOpenError as e:
+                logger.warning(f"⚠️ OTP email to {email} not attempted: {e}")
+                return Response({
+                    'success': False,
+                    'message': 'Email service is temporarily unavailable. Please try again shortly.'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': str(math.ceil(e.retry_after))})
             except Exception as e:
                 logger.error(f"Error sending OTP: {e}")
                 return Response({
@@ -428,7 +451,7 @@ class OTPViewSet(viewsets.ViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=OTP_VERIFY_THROTTLES)
     def verify_otp(self, request):
         """
         Verify OTP
@@ -464,7 +487,7 @@ class OTPViewSet(viewsets.ViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=OTP_VERIFY_THROTTLES)
     def register_with_otp(self, request):
         """
         Register with OTP verification
@@ -559,7 +582,7 @@ class OTPViewSet(viewsets.ViewSet):
                 
         return Response(results, status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=OTP_VERIFY_THROTTLES)
     def login_with_otp(self, request):
         """
         Login with OTP verification
@@ -598,7 +621,7 @@ class OTPViewSet(viewsets.ViewSet):
             login(request, user)
             
             # Log the login
-            UserAccountHistory.objects.create(
+            audit.record(
                 user=user,
                 action='logged_in',
                 description='User logged in with OTP'
@@ -82,7 +82,18 @@ EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', 'your-email-host-user').strip()
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', 'your-email-host-password').strip()
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Jobportal <krishnananbu99@gmail.com>')
-EMAIL_TIMEOUT = 60
+EMAIL_TIMEOUT = 60  # send_queued_emails; sends inside a request time out at EMAIL_CIRCUIT_SLOW_CALL
+# IPv4EmailBackend keeps authenticated SMTP sessions in a per-process pool
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', 4))  # idle sessions kept per server
+EMAIL_POOL_IDLE_TIMEOUT = int(os.getenv('EMAIL_POOL_IDLE_TIMEOUT', 60))  # seconds before an idle session is dropped
+EMAIL_POOL_MAX_MESSAGES = int(os.getenv('EMAIL_POOL_MAX_MESSAGES', 100))  # messages before a session is recycled
+EMAIL_POOL_CHECK_AFTER = 5  # seconds idle before a reused session gets a NOOP health check
+# Circuit breaker: after this many failed or slow sends within the window,
+# sends fail immediately until a background probe reaches the server again
+EMAIL_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('EMAIL_CIRCUIT_FAILURE_THRESHOLD', 3))
+EMAIL_CIRCUIT_WINDOW = int(os.getenv('EMAIL_CIRCUIT_WINDOW', 60))  # seconds
+EMAIL_CIRCUIT_SLOW_CALL = int(os.getenv('EMAIL_CIRCUIT_SLOW_CALL', 10))  # seconds per message counted as a failure
+EMAIL_CIRCUIT_RESET_TIMEOUT = int(os.getenv('EMAIL_CIRCUIT_RESET_TIMEOUT', 30))  # seconds open before probing
 
 # Prioritize Supabase/Manual config if DB_HOST is set to a Supabase address
 if os.getenv('DB_HOST') and 'supabase' in os.getenv('DB_HOST'):
@@ -121,6 +132,32 @@ else:
         }
     }
 
+# Cache (locmem by default; set REDIS_URL or MEMCACHED_LOCATION to share it between workers)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+elif os.getenv('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.getenv('MEMCACHED_LOCATION'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Anonymous job list/detail result cache (jobs/cache.py)
+JOB_CACHE_ALIAS = 'default'
+JOB_CACHE_TIMEOUT = int(os.getenv('JOB_CACHE_TIMEOUT', 300))
+
 # Password Validators
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -169,7 +206,27 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 4,
+    # Budgets for the throttles in jobs/throttling.py ("limit/[n]period", None disables)
+    'DEFAULT_THROTTLE_RATES': {
+        'otp_send_ip': os.getenv('THROTTLE_OTP_SEND_IP', '20/h'),
+        'otp_send_email': os.getenv('THROTTLE_OTP_SEND_EMAIL', '3/10m'),
+        'otp_verify_email': os.getenv('THROTTLE_OTP_VERIFY_EMAIL', '10/10m'),
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '30/m'),
+        'login_username': os.getenv('THROTTLE_LOGIN_USERNAME', '10/15m'),
+        'apply_user': os.getenv('THROTTLE_APPLY_USER', '30/h'),
+    },
 }
+RATE_LIMIT_CACHE_ALIAS = 'default'
+
+# UserAccountHistory writes are buffered per process (accounts/audit.py) and
+# flushed in bulk; 'sync' inserts each event immediately
+ACCOUNT_HISTORY_WRITE_MODE = os.getenv('ACCOUNT_HISTORY_WRITE_MODE', 'buffered')
+ACCOUNT_HISTORY_BUFFER_SIZE = int(os.getenv('ACCOUNT_HISTORY_BUFFER_SIZE', 100))  # events per bulk insert
+ACCOUNT_HISTORY_FLUSH_INTERVAL = int(os.getenv('ACCOUNT_HISTORY_FLUSH_INTERVAL', 5))  # seconds an event may wait
+
+# Retention applied by the run_maintenance worker
+ACCOUNT_HISTORY_RETENTION_DAYS = int(os.getenv('ACCOUNT_HISTORY_RETENTION_DAYS', 365))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 30))  # sent/failed emails
 
 # JWT Settings
 SIMPLE_JWT = {
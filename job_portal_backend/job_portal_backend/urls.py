@@ -16,16 +16,27 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
 
+from accounts.custom_email_backend import email_circuit
+
 def home(request):
     return HttpResponse("Welcome to Job Portal API!")
 
+def health(request):
+    # The API keeps serving while mail is down, so report it as degraded
+    email = email_circuit.snapshot()
+    return JsonResponse({
+        'status': 'ok' if email['state'] == email_circuit.CLOSED else 'degraded',
+        'email': email,
+    })
+
 urlpatterns = [
     path('', home),  # 👈 FIX: Add ROOT URL
     path('admin/', admin.site.urls),
+    path('api/health/', health),
     path('api/', include('jobs.urls')),
     path('api/accounts/', include('accounts.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
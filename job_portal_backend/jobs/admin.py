@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, Job, Application, SavedJob
+from .models import UserProfile, Skill, Job, Application, SavedJob, OutboundEmail, MaintenanceTask
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -7,6 +7,11 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ['user_type']
     search_fields = ['user__username', 'company_name']
 
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name', 'label']
+    search_fields = ['name', 'label']
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'company', 'location', 'job_type', 'is_active', 'created_at']
@@ -24,4 +29,15 @@ class ApplicationAdmin(admin.ModelAdmin):
 @admin.register(SavedJob)
 class SavedJobAdmin(admin.ModelAdmin):
     list_display = ['user', 'job', 'saved_at']
-    search_fields = ['user__username', 'job__title']
\ No newline at end of file
+    search_fields = ['user__username', 'job__title']
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'send_after', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'recipients']
+    date_hierarchy = 'created_at'
+
+@admin.register(MaintenanceTask)
+class MaintenanceTaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at', 'last_started_at', 'last_duration', 'last_rows_affected', 'total_runs', 'lease_owner']
+    readonly_fields = ['lease_owner', 'lease_expires_at', 'last_started_at', 'last_duration', 'last_rows_affected', 'last_error', 'total_runs']
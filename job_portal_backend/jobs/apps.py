@@ -8,6 +8,8 @@ class JobsConfig(AppConfig):
 
     def ready(self):
         """
-        Import signals when Django app is ready
+        Import signals and load email assets when Django app is ready
         """
         import jobs.signals
+        from jobs.email_assets import load_logo
+        load_logo()
@@ -0,0 +1,215 @@
+"""
+Result cache for anonymous job list/detail responses.
+
+Entries are keyed on the normalized query parameters and validated with
+version tokens stored in the same cache:
+
+- ``jobs:list`` changes whenever a job is created, edited or deleted, since
+  any of those can move jobs in or out of a filtered page.
+- ``jobs:job:<id>`` changes whenever that job or one of its applications
+  changes. A list page remembers the tokens of the jobs it shows, so a new
+  application only invalidates the pages and detail entry showing that job.
+- ``jobs:jobs`` changes along with any ``jobs:job:<id>``. The listed jobs
+  aren't known until a page is rendered, so a list entry is only stored if
+  this token is the same before and after rendering; otherwise a job could
+  change mid-render and its stale row be stored under the new job token.
+- ``jobs:user:<id>`` changes whenever that user saves, unsaves, applies or
+  withdraws. It isn't used by this cache (which only stores responses
+  without user state) but by the ETags of responses that show
+  ``is_saved``/``is_applied`` (see jobs.conditional).
+
+Tokens are random rather than counters, so an evicted token can never make a
+stale entry valid again.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import not_modified_from_headers
+
+LIST_VERSION_KEY = 'jobs:list'
+JOB_VERSION_KEY = 'jobs:job:{}'
+JOBS_VERSION_KEY = 'jobs:jobs'
+USER_STATE_KEY = 'jobs:user:{}'
+STATS_KEY = 'jobs:cache:{}'
+# Validators stored with an entry so a cache hit can answer a conditional GET
+CACHED_HEADERS = ['ETag', 'Last-Modified', 'Vary']
+
+
+def get_cache():
+    return caches[getattr(settings, 'JOB_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'JOB_CACHE_TIMEOUT', 300)
+
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+def get_token(key):
+    cache = get_cache()
+    token = cache.get(key)
+    if token is None:
+        token = new_token()
+        if not cache.add(key, token, None):
+            token = cache.get(key) or token
+    return token
+
+
+def get_tokens(keys):
+    """Batched get_token(): one get_many plus one set_many for missing tokens"""
+    cache = get_cache()
+    tokens = cache.get_many(keys)
+    missing = {key: new_token() for key in keys if key not in tokens}
+    if missing:
+        cache.set_many(missing, None)
+        tokens.update(missing)
+    return tokens
+
+
+def bump(*keys):
+    """Replace the version tokens now and again once the transaction commits"""
+    def replace():
+        get_cache().set_many({key: new_token() for key in keys}, None)
+
+    replace()
+    transaction.on_commit(replace)
+
+
+def invalidate_job(job_id, listing=True):
+    keys = [JOB_VERSION_KEY.format(job_id), JOBS_VERSION_KEY]
+    if listing:
+        keys.append(LIST_VERSION_KEY)
+    bump(*keys)
+
+
+def invalidate_user_state(user_id):
+    bump(USER_STATE_KEY.format(user_id))
+
+
+def invalidate_jobs(job_ids):
+    """invalidate_job() for a bulk UPDATE that bypassed post_save"""
+    bump(LIST_VERSION_KEY, JOBS_VERSION_KEY, *[JOB_VERSION_KEY.format(job_id) for job_id in job_ids])
+
+
+def record(outcome):
+    cache = get_cache()
+    key = STATS_KEY.format(outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    cache = get_cache()
+    counts = cache.get_many([STATS_KEY.format('hit'), STATS_KEY.format('miss')])
+    hits = counts.get(STATS_KEY.format('hit'), 0)
+    misses = counts.get(STATS_KEY.format('miss'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+def request_digest(request, *parts):
+    """Stable digest of the host, path parts and sorted query parameters"""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+        if value != ''
+    )
+    raw = repr((request.get_host(), parts, params))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(request, shared=False):
+    """GET requests from anonymous users, or from anyone when the response is the same for every user"""
+    return request.method == 'GET' and (shared or not request.user.is_authenticated)
+
+
+def get_cached_headers(response):
+    return {header: response[header] for header in CACHED_HEADERS if header in response}
+
+
+def cached_response(request, entry):
+    """Rebuild a response from a cache entry, or a 304 if its validators match"""
+    response = not_modified_from_headers(request, entry['headers'])
+    if response is None:
+        response = Response(entry['data'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def cached_list(request, render, shared=False):
+    """
+    Serve a cached list response for anonymous requests (any request if
+    ``shared``), or call ``render()`` and cache its data along with the
+    tokens of the listed jobs. All tokens are read before rendering.
+    """
+    if not is_cacheable(request, shared):
+        return render()
+
+    cache = get_cache()
+    tokens = get_tokens([LIST_VERSION_KEY, JOBS_VERSION_KEY])
+    key = f'jobs:list:{tokens[LIST_VERSION_KEY]}:{request_digest(request, "list")}'
+
+    entry = cache.get(key)
+    if entry is not None:
+        version_keys = [JOB_VERSION_KEY.format(job_id) for job_id in entry['jobs']]
+        current = cache.get_many(version_keys)
+        if all(current.get(version_key) == entry['jobs'][job_id]
+               for job_id, version_key in zip(entry['jobs'], version_keys)):
+            record('hit')
+            return cached_response(request, entry)
+
+    record('miss')
+    response = render()
+    # The listed jobs' tokens can only be read now; they are the ones the
+    # page was rendered from as long as no job token changed meanwhile
+    if response.status_code == 200 and cache.get(JOBS_VERSION_KEY) == tokens[JOBS_VERSION_KEY]:
+        results = response.data.get('results', []) if isinstance(response.data, dict) else response.data
+        version_keys = {item['id']: JOB_VERSION_KEY.format(item['id']) for item in results}
+        tokens = get_tokens(list(version_keys.values()))
+        entry = {
+            'data': response.data,
+            'headers': get_cached_headers(response),
+            'jobs': {job_id: tokens[version_key] for job_id, version_key in version_keys.items()},
+        }
+        cache.set(key, entry, get_timeout())
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_detail(request, job_id, render):
+    """Serve a cached detail response for anonymous requests"""
+    if not is_cacheable(request):
+        return render()
+
+    cache = get_cache()
+    token = get_token(JOB_VERSION_KEY.format(job_id))
+    key = f'jobs:detail:{job_id}:{token}:{request_digest(request, "detail", job_id)}'
+
+    entry = cache.get(key)
+    if entry is not None:
+        record('hit')
+        return cached_response(request, entry)
+
+    record('miss')
+    response = render()
+    if response.status_code == 200:
+        cache.set(key, {'data': response.data, 'headers': get_cached_headers(response)}, get_timeout())
+    response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,127 @@
+"""
+Conditional GET (ETag / Last-Modified) for list and retrieve actions.
+
+Validators come from one aggregate query over the same filtered queryset the
+action would serialize (max ``updated_at``, row count, ...), so a matching
+``If-None-Match`` / ``If-Modified-Since`` is answered with a 304 before the
+page query runs or anything is serialized. The aggregate only reads columns
+(the queryset's annotations are left out of it), so it costs about what the
+paginator's COUNT would; state that lives elsewhere, such as a user's saved
+jobs, is covered by version tokens from jobs.cache instead.
+
+Lists only get an ETag: deleting a row removes it without advancing any
+timestamp, so a Last-Modified date alone could not tell a client that the
+collection changed. The row count doubles as the
+page-number paginator's count, so a 200 costs no extra query.
+
+Keyset (cursor) pages are left alone: they exist to avoid scanning the whole
+filtered set, which the aggregate would have to do.
+"""
+import hashlib
+from calendar import timegm
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def to_timestamp(value):
+    return timegm(value.utctimetuple()) if value else None
+
+
+def set_validators(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def not_modified_from_headers(request, headers):
+    """304 response if the stored ETag/Last-Modified headers satisfy the request"""
+    return get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None,
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Adds an ETag to ``list`` and ETag/Last-Modified to ``retrieve``.
+
+    Views describe their representation with ``get_validator_aggregates()``,
+    a dict of aggregate expressions over columns of the filtered queryset
+    (a row count is always included), and ``get_validator_tokens()``. Keys
+    listed in ``last_modified_fields`` are datetimes whose maximum is the
+    Last-Modified; responses that depend on a token get no Last-Modified.
+    """
+    last_modified_fields = ['last_modified']
+
+    def get_validator_aggregates(self):
+        raise NotImplementedError
+
+    def get_validator_tokens(self):
+        """Version tokens of state the aggregates can't see"""
+        return []
+
+    def get_validators(self, queryset):
+        """Return (etag, last_modified timestamp), or (None, None) for an empty queryset"""
+        # values() keeps the listing annotations out of the aggregate's subquery
+        state = queryset.order_by().values('pk').aggregate(total=Count('pk'), **self.get_validator_aggregates())
+        self.known_count = state['total']
+        if not state['total']:
+            # Let the action answer (empty page or 404) without validators
+            return None, None
+        tokens = self.get_validator_tokens()
+        timestamps = [state[field] for field in self.last_modified_fields if state.get(field)]
+        last_modified = to_timestamp(max(timestamps)) if timestamps and not tokens else None
+        etag = make_etag(
+            self.__class__.__name__,
+            self.request.get_full_path(),
+            self.request.user.pk,
+            sorted((key, str(value)) for key, value in state.items()),
+            tokens,
+        )
+        return etag, last_modified
+
+    def conditional_response(self, request, queryset, render, use_last_modified=True):
+        etag, last_modified = self.get_validators(queryset)
+        if not use_last_modified:
+            last_modified = None
+        response = None
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+            if response.status_code != 200:
+                return response
+        return set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        is_keyset = getattr(self.paginator, 'is_keyset', None)
+        if is_keyset and is_keyset(request):
+            return super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            use_last_modified=False,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # A malformed pk is a 404, as get_object() would answer
+            raise Http404
+        return self.conditional_response(request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
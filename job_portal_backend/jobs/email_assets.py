@@ -0,0 +1,84 @@
+"""
+Email assets loaded once per process.
+
+- The inline logo is located and encoded into a MIMEImage at startup
+  (``JobsConfig.ready``); each message gets a copy of the prebuilt part.
+- ``render_email()`` renders a template once per context shape into an HTML
+  skeleton and its ``strip_tags`` plain text, then fills in the per-email
+  values by string substitution.
+"""
+import copy
+import logging
+import os
+from email.mime.image import MIMEImage
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape, strip_tags
+
+logger = logging.getLogger(__name__)
+
+LOGO_CONTENT_ID = '<logo_image>'
+PLACEHOLDER = '__email_var_{}__'
+
+_logo = None
+
+
+def get_logo_paths():
+    # Development path first, then collected static files, then the build/
+    # folder the Docker image copies the frontend into
+    return [
+        os.path.join(settings.BASE_DIR, '..', 'job-portal-frontend', 'public', 'favicon_clean.png'),
+        os.path.join(settings.STATIC_ROOT or '', 'favicon_clean.png'),
+        os.path.join(settings.BASE_DIR, 'build', 'favicon_clean.png'),
+    ]
+
+
+def load_logo():
+    """Locate and encode the logo; warns once if it can't be found"""
+    global _logo
+    paths = get_logo_paths()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                logo = MIMEImage(f.read())
+            logo.add_header('Content-ID', LOGO_CONTENT_ID)
+            logo.add_header('Content-Disposition', 'inline', filename='logo.png')
+            _logo = logo
+            return logo
+    _logo = None
+    logger.warning(f"⚠️ Email logo not found, emails will be sent without it. Checked: {', '.join(paths)}")
+    return None
+
+
+def get_logo_part():
+    """A copy of the prebuilt logo part to attach, or None"""
+    return copy.deepcopy(_logo) if _logo is not None else None
+
+
+@lru_cache(maxsize=256)
+def render_skeleton(template_name, variable_keys, static_items):
+    context = dict(static_items)
+    context.update((key, PLACEHOLDER.format(key)) for key in variable_keys)
+    html = render_to_string(template_name, context)
+    return html, strip_tags(html)
+
+
+def render_email(template_name, context, static_keys=()):
+    """
+    Return ``(html, plain)`` for an email template, equivalent to
+    ``render_to_string`` followed by ``strip_tags``.
+
+    Keys the template only prints with a plain ``{{ key }}`` are substituted
+    into a cached skeleton. Keys used in ``{% if %}`` tags or filters must be
+    listed in ``static_keys``; their values become part of the cache key.
+    """
+    static_items = tuple(sorted((key, context[key]) for key in static_keys if key in context))
+    variables = {key: value for key, value in context.items() if key not in static_keys}
+    html, plain = render_skeleton(template_name, tuple(sorted(variables)), static_items)
+    for key, value in variables.items():
+        escaped = str(conditional_escape(value))
+        html = html.replace(PLACEHOLDER.format(key), escaped)
+        plain = plain.replace(PLACEHOLDER.format(key), escaped)
+    return html, plain
@@ -0,0 +1,68 @@
+"""
+Idempotency-Key support for unsafe endpoints.
+
+The first response for a (user, key) pair is stored in the same transaction
+as the change it reports, so a retried request either replays that response
+or, if the original rolled back, runs again.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+# Keys older than this are treated as unused and may be purged
+TTL = timedelta(hours=24)
+
+
+def get_key(request):
+    key = request.headers.get(HEADER, '').strip()
+    if len(key) > IdempotencyRecord._meta.get_field('key').max_length:
+        raise ValidationError({'detail': f'{HEADER} must be at most 255 characters.'})
+    return key or None
+
+
+def get_scope(request):
+    return f'{request.method} {request.path}'
+
+
+def replay(request, key):
+    """The stored response for this key, or None if it hasn't been used yet"""
+    record = IdempotencyRecord.objects.filter(
+        user=request.user, key=key, created_at__gte=timezone.now() - TTL
+    ).first()
+    if record is None:
+        return None
+    if record.scope != get_scope(request):
+        return Response(
+            {'detail': f'This {HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def remember(request, key, response):
+    """Store the response; call inside the transaction that made the change"""
+    IdempotencyRecord.objects.update_or_create(
+        user=request.user,
+        key=key,
+        defaults={
+            'scope': get_scope(request),
+            'status_code': response.status_code,
+            'response_body': response.data,
+            # Reusing an expired key starts its TTL over
+            'created_at': timezone.now(),
+        },
+    )
+
+
+def purge_expired(batch_size=None):
+    """Delete expired records, at most batch_size of them; run by run_maintenance"""
+    expired = IdempotencyRecord.objects.filter(created_at__lt=timezone.now() - TTL)
+    if batch_size is not None:
+        expired = IdempotencyRecord.objects.filter(pk__in=list(expired.values_list('pk', flat=True)[:batch_size]))
+    return expired.delete()[0]
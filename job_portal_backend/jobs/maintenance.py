@@ -0,0 +1,178 @@
+"""
+Periodic maintenance tasks, run by the ``run_maintenance`` command.
+
+Tasks are registered with ``@task(name, every)``. A task handles one bounded
+batch per call and returns the rows it affected; the runner calls it again,
+committing in between, until a batch comes back short or ``max_batches`` is
+reached. A task that still has a backlog is due again straight away.
+
+Any number of workers may run the command. A worker takes a task's lease
+with a conditional UPDATE of its ``MaintenanceTask`` row before running it,
+so each due task runs once; a lease left behind by a dead worker expires
+after ``LEASE_DURATION``.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.models import UserAccountHistory
+from accounts.otp_service import cleanup_expired_otps
+
+from . import cache as job_cache
+from . import idempotency
+from .models import Job, MaintenanceTask, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+LEASE_DURATION = timedelta(minutes=5)
+BATCH_SIZE = 500
+MAX_BATCHES = 20
+
+TASKS = {}
+
+
+class Task:
+    def __init__(self, name, func, every):
+        self.name = name
+        self.func = func
+        self.every = every
+
+
+def task(name, every):
+    def register(func):
+        TASKS[name] = Task(name, func, every)
+        return func
+    return register
+
+
+def delete_batch(queryset, batch_size):
+    """Delete up to batch_size rows of queryset; returns how many"""
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if ids:
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+# ==================== TASKS ====================
+
+@task('purge_expired_otps', every=timedelta(hours=1))
+def purge_expired_otps(batch_size):
+    return cleanup_expired_otps(batch_size)
+
+
+@task('purge_idempotency_records', every=timedelta(hours=6))
+def purge_idempotency_records(batch_size):
+    return idempotency.purge_expired(batch_size)
+
+
+@task('deactivate_expired_jobs', every=timedelta(hours=1))
+def deactivate_expired_jobs(batch_size):
+    """Close jobs whose deadline has passed; jobs stay open on the deadline day itself"""
+    ids = list(
+        Job.objects.filter(is_active=True, deadline__lt=timezone.localdate())
+        .order_by('pk').values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    # A bulk UPDATE skips post_save, so invalidate the cached pages here
+    updated = Job.objects.filter(pk__in=ids, is_active=True).update(is_active=False, updated_at=timezone.now())
+    job_cache.invalidate_jobs(ids)
+    return updated
+
+
+@task('purge_account_history', every=timedelta(days=1))
+def purge_account_history(batch_size):
+    days = getattr(settings, 'ACCOUNT_HISTORY_RETENTION_DAYS', 365)
+    cutoff = timezone.now() - timedelta(days=days)
+    return delete_batch(UserAccountHistory.objects.filter(created_at__lt=cutoff), batch_size)
+
+
+@task('purge_delivered_emails', every=timedelta(days=1))
+def purge_delivered_emails(batch_size):
+    days = getattr(settings, 'EMAIL_OUTBOX_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    return delete_batch(OutboundEmail.objects.filter(status__in=['sent', 'failed'], created_at__lt=cutoff), batch_size)
+
+
+# ==================== RUNNER ====================
+
+def get_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def register_tasks():
+    """Create the schedule rows of newly added tasks"""
+    MaintenanceTask.objects.bulk_create([MaintenanceTask(name=name) for name in TASKS], ignore_conflicts=True)
+
+
+def acquire(name, owner, force=False):
+    """Take the lease of a due (or, with force, any) task that no one else holds"""
+    now = timezone.now()
+    free = Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    due = Q() if force else Q(next_run_at__lte=now)
+    return MaintenanceTask.objects.filter(free, due, name=name).update(
+        lease_owner=owner, lease_expires_at=now + LEASE_DURATION
+    ) == 1
+
+
+def renew(name, owner):
+    MaintenanceTask.objects.filter(name=name, lease_owner=owner).update(
+        lease_expires_at=timezone.now() + LEASE_DURATION
+    )
+
+
+def run_task(task, owner, batch_size=BATCH_SIZE, max_batches=MAX_BATCHES):
+    """Run a leased task in batches, then record the run and release the lease"""
+    started_at = timezone.now()
+    start = time.monotonic()
+    rows = 0
+    backlog = False
+    error = ''
+    try:
+        for _ in range(max_batches):
+            with transaction.atomic():
+                affected = task.func(batch_size)
+            rows += affected
+            backlog = affected >= batch_size
+            if not backlog:
+                break
+            renew(task.name, owner)
+    except Exception as e:
+        error = str(e)
+        logger.error(f"❌ Maintenance task {task.name} failed after {rows} rows: {error}")
+    duration = time.monotonic() - start
+
+    MaintenanceTask.objects.filter(name=task.name, lease_owner=owner).update(
+        lease_owner='',
+        lease_expires_at=None,
+        next_run_at=timezone.now() if backlog and not error else started_at + task.every,
+        last_started_at=started_at,
+        last_duration=duration,
+        last_rows_affected=rows,
+        last_error=error,
+        total_runs=F('total_runs') + 1,
+    )
+    if not error:
+        logger.info(f"✅ Maintenance task {task.name}: {rows} rows in {duration:.2f}s")
+    return rows, duration, error
+
+
+def run_due(names=None, force=False, owner=None, batch_size=BATCH_SIZE, max_batches=MAX_BATCHES):
+    """
+    Run every due task (or just ``names``) whose lease this worker gets.
+    Returns {name: (rows, duration, error)} for the tasks it ran.
+    """
+    owner = owner or get_worker_id()
+    register_tasks()
+    results = {}
+    for name in names or TASKS:
+        if acquire(name, owner, force=force):
+            results[name] = run_task(TASKS[name], owner, batch_size, max_batches)
+    return results
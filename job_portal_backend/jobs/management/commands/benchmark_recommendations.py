@@ -0,0 +1,65 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.models import Job
+from jobs.recommendations import EXPERIENCE_LEVELS, JobFeatures, JobMatrix, SeekerFeatures, parse_locations
+
+LOCATIONS = ['Chennai', 'Bengaluru', 'Mumbai', 'Pune', 'Hyderabad', 'Delhi', 'Kolkata', 'Remote']
+JOB_TYPES = [job_type for job_type, label in Job.JOB_TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Time recommendation scoring over a synthetic job matrix (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100000, help='Active jobs in the matrix')
+        parser.add_argument('--skills', type=int, default=2000, help='Distinct skills')
+        parser.add_argument('--queries', type=int, default=200, help='Seekers to score')
+        parser.add_argument('--limit', type=int, default=20, help='Recommendations per seeker')
+        parser.add_argument('--max-p95', type=float, help='Fail if the p95 latency in ms is above this')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        skills = range(options['skills'])
+
+        start = time.perf_counter()
+        matrix = JobMatrix()
+        for job_id in range(1, options['jobs'] + 1):
+            salary_min = rng.choice([None, rng.randrange(20000, 200000, 5000)])
+            matrix.upsert(JobFeatures(
+                id=job_id,
+                skill_ids=frozenset(rng.sample(skills, rng.randint(2, 8))),
+                locations=parse_locations(f'{rng.choice(LOCATIONS)}, India'),
+                job_type=rng.choice(JOB_TYPES),
+                experience=rng.randrange(len(EXPERIENCE_LEVELS)),
+                salary_min=salary_min,
+                salary_max=salary_min and salary_min + rng.randrange(0, 100000, 5000),
+            ))
+        build = time.perf_counter() - start
+        self.stdout.write(f'Built a matrix of {len(matrix)} jobs in {build:.2f}s')
+
+        timings = []
+        for _ in range(options['queries']):
+            seeker = SeekerFeatures(
+                skill_ids=frozenset(rng.sample(skills, rng.randint(3, 12))),
+                locations=parse_locations(rng.choice(LOCATIONS)),
+                job_types=frozenset(rng.sample(JOB_TYPES, rng.randint(1, 2))),
+                experience=rng.randrange(len(EXPERIENCE_LEVELS)),
+                expected_salary=rng.choice([None, rng.randrange(20000, 250000, 5000)]),
+            )
+            start = time.perf_counter()
+            matrix.top(seeker, options['limit'])
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f'Scored {len(timings)} seekers: p50 {p50:.1f}ms, p95 {p95:.1f}ms, max {timings[-1]:.1f}ms')
+
+        if options['max_p95'] is not None and p95 > options['max_p95']:
+            raise CommandError(f"p95 latency {p95:.1f}ms is above the {options['max_p95']}ms target")
+        self.stdout.write(self.style.SUCCESS('✅ Recommendation benchmark finished'))
@@ -0,0 +1,181 @@
+import random
+import re
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+
+from jobs.models import Job, Application, SavedJob
+from jobs.views import JobViewSet
+
+# Filter combinations the jobs feed is expected to serve from an index
+CANONICAL_JOB_FILTERS = [
+    {},
+    {'ordering': '-created_at'},
+    {'ordering': 'salary_min'},
+    {'job_type': 'full-time'},
+    {'experience_required': 'senior'},
+    {'job_type': 'contract', 'experience_required': 'mid'},
+    {'job_type': 'full-time', 'ordering': 'salary_min'},
+    {'salary_min': '150000'},
+    {'salary_max': '40000'},
+    {'location': 'chennai'},
+    {'company': 'acme'},
+]
+
+# icontains filters served by the trigram indexes, which only exist on
+# PostgreSQL (jobs/migrations/0011); elsewhere a COUNT of them scans the table
+TRIGRAM_FILTERS = {'location', 'company'}
+
+SEQUENTIAL_SCAN_PATTERNS = {
+    'postgresql': r'Seq Scan on {table}\b',
+    'sqlite': r'SCAN (TABLE )?{table}\b(?! USING)',
+}
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the canonical job/application queries and their COUNTs, and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=5000, help='Number of jobs to seed (0 to use existing data)')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'EXPLAIN checks are not supported on {connection.vendor}')
+
+        failures = []
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'])
+                self.stdout.write(self.style.SUCCESS(f"Seeded {options['seed']} jobs"))
+
+            for label, explain, table in self.canonical_queries():
+                plan = explain()
+                if re.search(pattern.format(table=table), plan):
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f'✗ {label}\n{plan}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {label}'))
+                    self.stdout.write(plan, style_func=lambda text: text)
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries fell back to a sequential scan: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('\nAll canonical queries use an index'))
+
+    def canonical_queries(self):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10
+        job_table = Job._meta.db_table
+
+        for params in CANONICAL_JOB_FILTERS:
+            label = f'jobs {params or "(no filters)"}'
+            view, queryset = self.job_list_view(params)
+            yield label, queryset[:page_size].explain, job_table
+            if connection.vendor == 'postgresql' or not TRIGRAM_FILTERS & params.keys():
+                # The page's total comes from the validators query (see ConditionalGetMixin)
+                yield f'{label} count', partial(self.explain_executed, view.get_validators, queryset), job_table
+
+        employer = Job.objects.values_list('employer_id', flat=True).first()
+        applicant = Application.objects.values_list('applicant_id', flat=True).first()
+        saver = SavedJob.objects.values_list('user_id', flat=True).first()
+
+        listings = [
+            ('my_jobs', Job.objects.filter(employer_id=employer), job_table),
+            (
+                'applications (employer)',
+                Application.objects.filter(job__employer_id=employer).select_related(
+                    'job', 'applicant', 'applicant__job_seeker', 'applicant__profile'
+                ),
+                Application._meta.db_table,
+            ),
+            (
+                'applications (job seeker)',
+                Application.objects.filter(applicant_id=applicant).select_related('job'),
+                Application._meta.db_table,
+            ),
+            ('saved jobs', SavedJob.objects.filter(user_id=saver), SavedJob._meta.db_table),
+        ]
+        for label, queryset, table in listings:
+            yield label, queryset[:page_size].explain, table
+            yield f'{label} count', partial(self.explain_executed, queryset.count), table
+
+    def job_list_view(self, params):
+        """A JobViewSet list view for these query params, and its queryset as the view builds it"""
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        http_request.GET = QueryDict(mutable=True)
+        http_request.GET.update(params)
+
+        view = JobViewSet(action='list', format_kwarg=None)
+        view.request = Request(http_request)
+        view.request.user = AnonymousUser()
+        return view, view.filter_queryset(view.get_queryset())
+
+    def explain_executed(self, run, *args):
+        """EXPLAIN the last SELECT that run(*args) sends to the database"""
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            run(*args)
+        sql, params = [statement for statement in statements if statement[0].lstrip().upper().startswith('SELECT')][-1]
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def seed(self, count):
+        now = timezone.now()
+        employers = User.objects.bulk_create([
+            User(username=f'explain_employer_{i}_{now.timestamp():.0f}') for i in range(max(count // 100, 1))
+        ])
+        seekers = User.objects.bulk_create([
+            User(username=f'explain_seeker_{i}_{now.timestamp():.0f}') for i in range(max(count // 50, 1))
+        ])
+        job_types = [choice for choice, _ in Job.JOB_TYPE_CHOICES]
+        experience = [choice for choice, _ in Job.EXPERIENCE_CHOICES]
+        locations = ['Remote', 'Chennai', 'Bangalore', 'Mumbai', 'Pune', 'Hyderabad', 'Delhi', 'Coimbatore']
+
+        jobs = Job.objects.bulk_create([
+            Job(
+                employer=random.choice(employers),
+                title=f'Job {i}',
+                company=f'Company {i % 500}',
+                location=random.choice(locations),
+                job_type=random.choice(job_types),
+                description='Seeded for EXPLAIN',
+                requirements='',
+                salary_min=random.randrange(10000, 200000, 1000),
+                salary_max=random.randrange(200000, 400000, 1000),
+                experience_required=random.choice(experience),
+                skills='',
+                # Some inactive rows so the partial index predicates matter
+                is_active=random.random() < 0.9,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+        Application.objects.bulk_create([
+            Application(job=job, applicant=seeker)
+            for seeker in seekers
+            for job in random.sample(jobs, min(10, len(jobs)))
+        ], batch_size=1000, ignore_conflicts=True)
+        SavedJob.objects.bulk_create([
+            SavedJob(job=job, user=seeker)
+            for seeker in seekers
+            for job in random.sample(jobs, min(5, len(jobs)))
+        ], batch_size=1000, ignore_conflicts=True)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import maintenance
+
+
+class Command(BaseCommand):
+    help = 'Run periodic maintenance tasks (OTP purge, expired job deactivation, retention)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', action='append', dest='tasks', help='Run only this task, even if not due (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=maintenance.BATCH_SIZE, help='Rows per batch')
+        parser.add_argument('--max-batches', type=int, default=maintenance.MAX_BATCHES, help='Batches per task run')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds between schedule checks')
+        parser.add_argument('--once', action='store_true', help='Run the due tasks once and exit')
+
+    def handle(self, *args, **options):
+        unknown = set(options['tasks'] or []) - set(maintenance.TASKS)
+        if unknown:
+            raise CommandError(f"Unknown task(s): {', '.join(sorted(unknown))}. Available: {', '.join(maintenance.TASKS)}")
+
+        try:
+            while True:
+                results = maintenance.run_due(
+                    names=options['tasks'],
+                    force=bool(options['tasks']),
+                    batch_size=options['batch_size'],
+                    max_batches=options['max_batches'],
+                )
+                for name, (rows, duration, error) in results.items():
+                    if error:
+                        self.stdout.write(self.style.ERROR(f'❌ {name}: {error}'))
+                    else:
+                        self.stdout.write(f'🧹 {name}: {rows} rows in {duration:.2f}s')
+                if options['once'] or options['tasks']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('✅ Maintenance worker stopped'))
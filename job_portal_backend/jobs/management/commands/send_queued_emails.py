@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from jobs import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound emails over one persistent SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed per batch')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        # Off the request path, so a slow server may take the full EMAIL_TIMEOUT
+        connection = get_connection(fail_silently=False, timeout=settings.EMAIL_TIMEOUT)
+        try:
+            while True:
+                batch = outbox.claim_batch(options['batch_size'])
+                if batch:
+                    # No-op while the previous batch's session is still open
+                    outbox.open_connection(connection)
+                    sent, failed, deferred = outbox.deliver(batch, connection)
+                    self.stdout.write(f'📧 Sent {sent}, failed {failed}, deferred {deferred}')
+                    if not deferred:
+                        continue
+                    # Mail server is down: wait before claiming the deferred emails again
+                if options['once']:
+                    break
+                # Don't hold an idle SMTP session open between bursts
+                connection.close()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS('✅ Email worker stopped'))
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+SEARCH_FIELDS = ['title', 'company', 'location', 'skills', 'description']
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE jobs_job ADD COLUMN search_document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(skills, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX jobs_job_search_document_gin ON jobs_job USING GIN (search_document)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS jobs_job_search_document_gin",
+    "ALTER TABLE jobs_job DROP COLUMN IF EXISTS search_document",
+]
+
+SQLITE_FORWARD = [
+    f"CREATE VIRTUAL TABLE jobs_job_fts USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='porter unicode61')",
+    f"INSERT INTO jobs_job_fts (rowid, {', '.join(SEARCH_FIELDS)}) SELECT id, {', '.join(SEARCH_FIELDS)} FROM jobs_job",
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_document(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        try:
+            run_statements(schema_editor, SQLITE_FORWARD)
+        except Exception:
+            # SQLite built without FTS5, search falls back to icontains
+            pass
+
+
+def drop_search_document(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_alter_application_cover_letter'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_document, drop_search_document),
+    ]
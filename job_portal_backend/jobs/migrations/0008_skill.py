@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Case-folded, alias-merged name', max_length=100, unique=True)),
+                ('label', models.CharField(help_text='Display name as first entered', max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='jobs.job')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='jobs.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='normalized_skills',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobs.JobSkill', to='jobs.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='jobskill',
+            index=models.Index(fields=['skill', 'job'], name='jobs_jobskill_skill_job_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobskill',
+            unique_together={('job', 'skill')},
+        ),
+    ]
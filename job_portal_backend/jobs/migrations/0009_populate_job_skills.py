@@ -0,0 +1,86 @@
+from django.db import migrations
+
+# Frozen copy of jobs.skills as of this migration, so later changes to the
+# aliases or parsing don't change what this migration writes
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'drf': 'django rest framework',
+    'ml': 'machine learning',
+    'aws cloud': 'aws',
+}
+SKILL_MAX_LENGTH = 100
+
+
+def parse_skills(text):
+    skills = {}
+    for raw in (text or '').split(','):
+        label = ' '.join(raw.split())[:SKILL_MAX_LENGTH]
+        name = label.casefold()
+        name = SKILL_ALIASES.get(name, name)[:SKILL_MAX_LENGTH]
+        if name and name not in skills:
+            skills[name] = label
+    return skills
+
+
+def backfill_skills(Skill, through_model, owner_field, owners):
+    """Mirror (owner id, skills text) pairs into a through table in bulk"""
+    parsed = {owner_id: parse_skills(text) for owner_id, text in owners}
+
+    labels = {}
+    for skills in parsed.values():
+        for name, label in skills.items():
+            labels.setdefault(name, label)
+    Skill.objects.bulk_create(
+        [Skill(name=name, label=label) for name, label in labels.items()],
+        ignore_conflicts=True,
+    )
+    skill_ids = dict(Skill.objects.filter(name__in=labels).values_list('name', 'id'))
+
+    through_model.objects.bulk_create(
+        [
+            through_model(**{f'{owner_field}_id': owner_id, 'skill_id': skill_ids[name]})
+            for owner_id, skills in parsed.items()
+            for name in skills
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def populate_job_skills(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    backfill_skills(
+        apps.get_model('jobs', 'Skill'),
+        apps.get_model('jobs', 'JobSkill'),
+        'job',
+        Job.objects.values_list('id', 'skills'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_skill'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_job_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_populate_job_skills'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applicant', '-applied_at'], name='application_applicant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-applied_at'], name='application_job_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='job_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_min', 'id'], name='job_active_salary_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_max'], name='job_active_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['job_type', '-created_at'], name='job_active_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['experience_required', '-created_at'], name='job_active_exp_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['employer', '-created_at'], name='job_employer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedjob',
+            index=models.Index(fields=['user', '-saved_at'], name='savedjob_user_saved_idx'),
+        ),
+    ]
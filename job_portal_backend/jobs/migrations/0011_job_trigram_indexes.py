@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# icontains renders as UPPER(column) LIKE UPPER(%s) on PostgreSQL,
+# so the trigram indexes are built on the same expression.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS job_location_trgm_idx ON jobs_job USING GIN (UPPER(location) gin_trgm_ops) WHERE is_active",
+    "CREATE INDEX IF NOT EXISTS job_company_trgm_idx ON jobs_job USING GIN (UPPER(company) gin_trgm_ops) WHERE is_active",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS job_location_trgm_idx",
+    "DROP INDEX IF EXISTS job_company_trgm_idx",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_REVERSE:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
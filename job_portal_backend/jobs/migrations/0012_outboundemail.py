@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_job_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(help_text='Plain text alternative')),
+                ('html_body', models.TextField(blank=True)),
+                ('from_email', models.CharField(max_length=255)),
+                ('recipients', models.JSONField(default=list)),
+                ('attach_logo', models.BooleanField(default=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('send_after', models.DateTimeField(help_text='Not claimed before this time (retry backoff)')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'send_after'], name='outboundemail_due_idx')],
+            },
+        ),
+    ]
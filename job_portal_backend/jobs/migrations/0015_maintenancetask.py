@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_applicationstatuschange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lease_owner', models.CharField(blank=True, max_length=100)),
+                ('lease_expires_at', models.DateTimeField(blank=True, help_text='Another worker may take over after this', null=True)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration', models.FloatField(blank=True, help_text='Seconds', null=True)),
+                ('last_rows_affected', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('total_runs', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_maintenancetask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='match_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-match_score', '-id'], name='application_job_score_idx'),
+        ),
+    ]
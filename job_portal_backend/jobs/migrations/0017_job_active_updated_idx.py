@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_application_match_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'updated_at'], name='job_active_updated_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .tracking import DirtyFieldsMixin
 
 class UserProfile(models.Model):
     USER_TYPE_CHOICES = [
@@ -21,7 +27,59 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.user_type}"
 
-class Job(models.Model):
+class Skill(models.Model):
+    """Canonical skill shared by jobs and job seekers"""
+    name = models.CharField(max_length=100, unique=True, help_text="Case-folded, alias-merged name")
+    label = models.CharField(max_length=100, help_text="Display name as first entered")
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.label
+
+
+class JobQuerySet(models.QuerySet):
+    def with_listing_annotations(self, user=None):
+        """
+        Annotate applications_count, is_saved and is_applied so that
+        JobSerializer never has to query per row.
+        """
+        applications_count = Application.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(
+            total=Count('pk')
+        ).values('total')
+        queryset = self.select_related('employer').annotate(
+            applications_count=Coalesce(Subquery(applications_count, output_field=IntegerField()), Value(0))
+        )
+        if user is not None and user.is_authenticated:
+            queryset = queryset.annotate(
+                is_saved=Exists(SavedJob.objects.filter(user=user, job=OuterRef('pk'))),
+                is_applied=Exists(Application.objects.filter(applicant=user, job=OuterRef('pk'))),
+            )
+        return queryset
+    
+    def with_application_summary(self):
+        """
+        Annotate per-status application counts, applications_count,
+        latest_application_at and saved_count in one GROUP BY query.
+        """
+        status_counts = {
+            f'{status}_count': Count('applications', filter=Q(applications__status=status))
+            for status, _ in Application.STATUS_CHOICES
+        }
+        # A subquery rather than a second join, which would multiply the application rows
+        saved_count = SavedJob.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.order_by().annotate(
+            applications_count=Count('applications'),
+            latest_application_at=Max('applications__applied_at'),
+            saved_count=Coalesce(Subquery(saved_count, output_field=IntegerField()), Value(0)),
+            **status_counts,
+        )
+
+
+class Job(DirtyFieldsMixin, models.Model):
     JOB_TYPE_CHOICES = [
         ('full-time', 'Full Time'),
         ('part-time', 'Part Time'),
@@ -48,17 +106,48 @@ class Job(models.Model):
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     experience_required = models.CharField(max_length=20, choices=EXPERIENCE_CHOICES, default='junior')
     skills = models.CharField(max_length=500, help_text="Comma-separated skills")
+    normalized_skills = models.ManyToManyField(Skill, through='JobSkill', related_name='jobs', blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateField(null=True, blank=True)
     
+    objects = JobQuerySet.as_manager()
+    
+    # Tracked for the ranking signals only; saves still write every field
+    update_changed_fields = False
+    
     class Meta:
         ordering = ['-created_at']
+        # Partial indexes matching the JobViewSet filters/orderings on active jobs.
+        # Trigram indexes for location/company icontains are PostgreSQL-only (migration 0011).
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_active=True), name='job_active_created_idx'),
+            models.Index(fields=['salary_min', 'id'], condition=models.Q(is_active=True), name='job_active_salary_min_idx'),
+            models.Index(fields=['salary_max'], condition=models.Q(is_active=True), name='job_active_salary_max_idx'),
+            models.Index(fields=['job_type', '-created_at'], condition=models.Q(is_active=True), name='job_active_type_created_idx'),
+            models.Index(fields=['experience_required', '-created_at'], condition=models.Q(is_active=True), name='job_active_exp_created_idx'),
+            models.Index(fields=['employer', '-created_at'], name='job_employer_created_idx'),
+            # Covers the list's COUNT/validators aggregate (see ConditionalGetMixin)
+            models.Index(fields=['is_active', 'updated_at'], name='job_active_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.company}"
 
+class JobSkill(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='job_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_skills')
+    
+    class Meta:
+        unique_together = ['job', 'skill']
+        indexes = [
+            models.Index(fields=['skill', 'job'], name='jobs_jobskill_skill_job_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} - {self.skill_id}"
+
 class Application(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -75,14 +164,38 @@ class Application(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Cached applicant/job match (see jobs.ranking); NULL until computed
+    match_score = models.FloatField(null=True, blank=True, editable=False)
     
     class Meta:
         unique_together = ['job', 'applicant']
         ordering = ['-applied_at']
+        indexes = [
+            models.Index(fields=['applicant', '-applied_at'], name='application_applicant_idx'),
+            models.Index(fields=['job', '-applied_at'], name='application_job_applied_idx'),
+            models.Index(fields=['job', '-match_score', '-id'], name='application_job_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title}"
 
+class ApplicationStatusChange(models.Model):
+    """History of an application's status transitions"""
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_changes')
+    old_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    new_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    changed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['application', '-changed_at'], name='appstatuschange_app_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.application} {self.old_status} -> {self.new_status}"
+
 class SavedJob(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_jobs')
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='saved_by')
@@ -91,6 +204,76 @@ class SavedJob(models.Model):
     class Meta:
         unique_together = ['user', 'job']
         ordering = ['-saved_at']
+        indexes = [
+            models.Index(fields=['user', '-saved_at'], name='savedjob_user_saved_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} saved {self.job.title}"
+
+class OutboundEmail(models.Model):
+    """Queued email, delivered by the send_queued_emails worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField(help_text="Plain text alternative")
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    attach_logo = models.BooleanField(default=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(help_text="Not claimed before this time (retry backoff)")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'send_after'], name='outboundemail_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+class MaintenanceTask(models.Model):
+    """Schedule, lease and last run of a periodic task run by run_maintenance"""
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    lease_owner = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, help_text="Another worker may take over after this")
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    last_rows_affected = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    total_runs = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class IdempotencyRecord(models.Model):
+    """Response stored for an Idempotency-Key, replayed when a client retries"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_records')
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=255, help_text="Method and path the key was first used for")
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        unique_together = ['user', 'key']
     
     def __str__(self):
-        return f"{self.user.username} saved {self.job.title}"
\ No newline at end of file
+        return f"{self.user.username} {self.key} ({self.scope})"
@@ -0,0 +1,176 @@
+"""
+Durable outbound email queue.
+
+Signal handlers ``enqueue()`` a row inside the same transaction as the change
+that triggered the email, so mail is neither lost when a worker process
+recycles nor sent for a change that rolled back. The ``send_queued_emails``
+command claims due rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` (several
+workers can run side by side) and delivers them over one persistent
+connection of the configured ``EMAIL_BACKEND``.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.custom_email_backend import CircuitOpenError
+
+from .email_assets import get_logo_part
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# Retry delays: 1, 2, 4, 8 ... minutes, capped at an hour
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=1)
+# A 'sending' row whose worker died is claimed again after this long, as a new attempt
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def build(subject, html_message, plain_message, recipient_list, attach_logo=True):
+    return OutboundEmail(
+        subject=subject[:OutboundEmail._meta.get_field('subject').max_length],
+        body=plain_message,
+        html_body=html_message or '',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+        attach_logo=attach_logo,
+        send_after=timezone.now(),
+    )
+
+
+def enqueue(subject, html_message, plain_message, recipient_list, attach_logo=True):
+    email = build(subject, html_message, plain_message, recipient_list, attach_logo)
+    email.save()
+    return email
+
+
+def enqueue_many(messages):
+    """Queue (subject, html, plain, recipients) tuples with one bulk INSERT"""
+    return OutboundEmail.objects.bulk_create([build(*message) for message in messages], batch_size=500)
+
+
+def get_backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim_batch(size):
+    """
+    Mark up to ``size`` due emails as sending and return them.
+    Rows locked by another worker are skipped rather than waited on.
+
+    Each claim counts as an attempt, so an email whose worker keeps dying
+    mid-send is marked failed once it has used MAX_ATTEMPTS claims.
+    """
+    now = timezone.now()
+    due = Q(status='pending', send_after__lte=now) | Q(status='sending', claimed_at__lt=now - CLAIM_TIMEOUT)
+    with transaction.atomic():
+        rows = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('send_after', 'id')[:size]
+        )
+        exhausted = [email for email in rows if email.attempts >= MAX_ATTEMPTS]
+        batch = [email for email in rows if email.attempts < MAX_ATTEMPTS]
+        if exhausted:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in exhausted]).update(
+                status='failed', last_error='Claim timed out on the last attempt'
+            )
+            logger.error(f"❌ Giving up on {len(exhausted)} emails whose worker stopped on the last attempt")
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                status='sending', claimed_at=now, attempts=F('attempts') + 1
+            )
+            for email in batch:
+                email.attempts += 1
+    return batch
+
+
+def build_message(email, connection):
+    msg = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.recipients, connection=connection
+    )
+    if email.html_body:
+        msg.attach_alternative(email.html_body, "text/html")
+
+    if email.attach_logo:
+        logo = get_logo_part()
+        if logo is not None:
+            msg.attach(logo)
+    return msg
+
+
+def mark_sent(email):
+    OutboundEmail.objects.filter(pk=email.pk).update(status='sent', sent_at=timezone.now(), last_error='')
+
+
+def mark_failed(email, error):
+    # Counted when the email was claimed
+    attempts = email.attempts
+    if attempts >= MAX_ATTEMPTS:
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='failed', attempts=attempts, last_error=str(error)
+        )
+        logger.error(f"❌ Giving up on email {email.pk} to {email.recipients} after {attempts} attempts: {error}")
+    else:
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='pending', attempts=attempts, last_error=str(error),
+            send_after=timezone.now() + get_backoff(attempts),
+        )
+        logger.warning(f"⚠️ Email {email.pk} to {email.recipients} failed (attempt {attempts}), retrying: {error}")
+
+
+def release(emails):
+    """Hand claimed emails back to the queue without using up an attempt"""
+    OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        status='pending', claimed_at=None, attempts=F('attempts') - 1
+    )
+
+
+def open_connection(connection):
+    try:
+        connection.open()
+    except Exception as e:
+        # The next send_messages() fails and is retried with backoff
+        logger.error(f"❌ Error opening email connection: {str(e)}")
+
+
+def reopen(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+    open_connection(connection)
+
+
+def deliver(batch, connection):
+    """
+    Send a claimed batch over an open connection; returns (sent, failed,
+    deferred) counts. Emails are deferred while the email circuit is open.
+    """
+    sent = failed = deferred = 0
+    for index, email in enumerate(batch):
+        try:
+            if not connection.send_messages([build_message(email, connection)]):
+                raise RuntimeError('Backend reported no message sent')
+        except CircuitOpenError as e:
+            # The mail server is known to be down; retry these once it's back
+            release(batch[index:])
+            deferred = len(batch) - index
+            logger.warning(f"⚠️ {e}, returned {deferred} emails to the queue")
+            break
+        except Exception as e:
+            mark_failed(email, e)
+            failed += 1
+            # The SMTP session may be unusable now; reopen before the next message
+            reopen(connection)
+        else:
+            mark_sent(email)
+            logger.info(f"✅ Email sent successfully to {email.recipients}")
+            sent += 1
+    return sent, failed, deferred
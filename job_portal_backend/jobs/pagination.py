@@ -0,0 +1,212 @@
+"""
+Pagination for the jobs, applications and saved-jobs feeds.
+
+Page numbers stay the default. Passing ``?pagination=cursor`` (or following a
+``cursor`` link) switches to keyset pagination on ``(ordering field, id)``,
+which needs neither an OFFSET scan nor a COUNT(*) per page.
+"""
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from functools import partial
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def get_page_size(request, default, query_param, maximum):
+    try:
+        size = int(request.query_params[query_param])
+    except (KeyError, ValueError):
+        return default
+    if size <= 0:
+        return default
+    return min(size, maximum)
+
+
+def estimate_count(queryset):
+    """Planner row estimate on PostgreSQL; None where the database has no cheap estimate"""
+    if connection.vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return plan[0]['Plan']['Plan Rows']
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on ``(field, id)``.
+
+    The view lists the orderings it supports in ``cursor_orderings``,
+    e.g. ``['-created_at', 'salary_min']``. The first one is the default and
+    ``?ordering=`` picks another. ``?count=true`` adds an exact count and
+    ``?count=estimate`` adds the planner's estimate.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = get_page_size(request, self.page_size, self.page_size_query_param, self.max_page_size)
+        self.ordering = self.get_ordering(request, view)
+        self.field = self.ordering.lstrip('-')
+        self.descending = self.ordering.startswith('-')
+        self.nullable = queryset.model._meta.get_field(self.field).null
+        self.count, self.count_estimated = self.get_count(queryset, request)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor['previous'])
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if cursor:
+            queryset = queryset.filter(self.get_boundary(cursor['value'], cursor['id'], reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        self.next_row = rows[-1] if has_next and rows else None
+        self.previous_row = rows[0] if has_previous and rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+            if self.count_estimated:
+                response['count_estimated'] = True
+        response['next'] = self.get_link(self.next_row, previous=False)
+        response['previous'] = self.get_link(self.previous_row, previous=True)
+        response['results'] = data
+        return Response(response)
+
+    def get_ordering(self, request, view):
+        orderings = getattr(view, 'cursor_orderings', None) or ['-id']
+        requested = request.query_params.get(self.ordering_query_param)
+        return requested if requested in orderings else orderings[0]
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate, True
+            return queryset.count(), False
+        if mode in ('true', '1', 'exact'):
+            return queryset.count(), False
+        return None, False
+
+    def get_order_by(self, reverse):
+        descending = self.descending != reverse
+        # Nulls last walking forward, so first when walking back. Only spelled
+        # out for nullable fields so NOT NULL keys keep matching their index.
+        nulls = {}
+        if self.nullable:
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        key = F(self.field).desc(**nulls) if descending else F(self.field).asc(**nulls)
+        return [key, '-id' if descending else 'id']
+
+    def get_boundary(self, value, pk, reverse):
+        """Rows strictly after (value, pk) in the direction being walked"""
+        after = 'lt' if self.descending != reverse else 'gt'
+        field = self.field
+
+        if value is None:
+            # Nulls sort last when walking forward, first when walking back
+            condition = Q(**{f'{field}__isnull': True, f'id__{after}': pk})
+            if reverse:
+                condition |= Q(**{f'{field}__isnull': False})
+            return condition
+
+        condition = Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk})
+        if self.nullable and not reverse:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            value = cursor['v']
+            if value is not None:
+                value = model._meta.get_field(self.field).to_python(value)
+            return {'value': value, 'id': int(cursor['id']), 'previous': bool(cursor.get('p'))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, previous):
+        value = getattr(row, self.field)
+        cursor = {'v': None if value is None else str(value), 'id': row.pk}
+        if previous:
+            cursor['p'] = 1
+        return b64encode(json.dumps(cursor, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+    def get_link(self, row, previous):
+        if row is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(row, previous))
+
+
+class KnownCountPaginator(DjangoPaginator):
+    """Django paginator that skips COUNT(*) when the caller already knows it"""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class FeedPagination(PageNumberPagination):
+    """
+    Page-number pagination with ``?page_size=`` up to ``max_page_size``,
+    switching to KeysetPagination with ``?pagination=cursor``.
+
+    Reuses ``view.known_count`` (set by ConditionalGetMixin) instead of
+    running its own COUNT(*).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+
+    def is_keyset(self, request):
+        return request.query_params.get(self.mode_query_param) == 'cursor' or \
+            KeysetPagination.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.is_keyset(request):
+            self.keyset = KeysetPagination()
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.django_paginator_class = partial(KnownCountPaginator, count=getattr(view, 'known_count', None))
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class SummaryPagination(FeedPagination):
+    """Page numbers only, for listings ordered by aggregates a keyset cursor can't encode"""
+
+    def is_keyset(self, request):
+        return False
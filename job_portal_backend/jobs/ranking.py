@@ -0,0 +1,87 @@
+"""
+Applicant ranking for employers.
+
+``Application.match_score`` scores the applicant's JobSeeker skills,
+experience level and locations against the job's skills,
+``experience_required`` and ``location`` (0-1, see the weights below). It
+is a stored cache: NULL means not computed yet. The Job and JobSeeker
+post_save signals reset it to NULL when a field it depends on changes, and
+``score_applications()`` computes the missing scores of a queryset in one
+batch before the ApplicationViewSet sorts one job's applicants by it.
+"""
+import logging
+from collections import defaultdict
+
+from accounts.models import JobSeeker, JobSeekerSkill
+
+from .models import Application, Job
+from .recommendations import EXPERIENCE_INDEX, encode_jobs, experience_fit, parse_locations
+
+logger = logging.getLogger(__name__)
+
+W_SKILLS = 0.6
+W_EXPERIENCE = 0.25
+W_LOCATION = 0.15
+
+# Scored inside one ranked request; the rest sort last (NULL) until the next
+MAX_SCORES_PER_REQUEST = 1000
+
+# Changes to these fields make the stored scores stale
+JOB_FIELDS = {'skills', 'location', 'experience_required'}
+JOB_SEEKER_FIELDS = {'skills', 'location', 'preferred_locations', 'experience_level'}
+
+
+def score_applicant(job, skill_ids, experience, locations):
+    """Score of an applicant's features against a JobFeatures"""
+    skills = len(job.skill_ids & skill_ids) / len(job.skill_ids) if job.skill_ids else 0
+    return round(
+        W_SKILLS * skills
+        + W_EXPERIENCE * experience_fit(job.experience, experience)
+        + W_LOCATION * bool(job.locations & locations),
+        4,
+    )
+
+
+def score_applications(queryset, limit=None):
+    """
+    Store match_score for up to ``limit`` applications of queryset that have
+    none. Reads in five queries however many applications there are;
+    returns how many were scored.
+    """
+    stale = list(queryset.filter(match_score__isnull=True).order_by('id').values_list('id', 'job_id', 'applicant_id')[:limit])
+    if not stale:
+        return 0
+
+    jobs = {job.id: job for job in encode_jobs(Job.objects.filter(id__in={job_id for _, job_id, _ in stale}))}
+
+    seekers = {}
+    for seeker_id, user_id, experience, location, preferred_locations in JobSeeker.objects.filter(
+        user_id__in={applicant_id for _, _, applicant_id in stale}
+    ).values_list('id', 'user_id', 'experience_level', 'location', 'preferred_locations'):
+        places = [location or '', *(preferred_locations or '').split(',')]
+        seekers[seeker_id] = (user_id, EXPERIENCE_INDEX.get(experience), frozenset().union(*map(parse_locations, places)))
+    skills = defaultdict(set)
+    for seeker_id, skill_id in JobSeekerSkill.objects.filter(job_seeker_id__in=seekers).values_list('job_seeker_id', 'skill_id'):
+        skills[seeker_id].add(skill_id)
+    # Applicants without a JobSeeker profile match on nothing
+    features = {
+        user_id: (frozenset(skills[seeker_id]), experience, locations)
+        for seeker_id, (user_id, experience, locations) in seekers.items()
+    }
+    nothing = (frozenset(), None, frozenset())
+
+    applications = [
+        Application(id=application_id, match_score=score_applicant(jobs[job_id], *features.get(applicant_id, nothing)))
+        for application_id, job_id, applicant_id in stale
+    ]
+    Application.objects.bulk_update(applications, ['match_score'])
+    logger.info(f"✅ Scored {len(applications)} applications")
+    return len(applications)
+
+
+def invalidate_job(job_id):
+    Application.objects.filter(job_id=job_id, match_score__isnull=False).update(match_score=None)
+
+
+def invalidate_applicant(user_id):
+    Application.objects.filter(applicant_id=user_id, match_score__isnull=False).update(match_score=None)
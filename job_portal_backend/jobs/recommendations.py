@@ -0,0 +1,285 @@
+"""
+Job recommendations for job seekers.
+
+Every active job is encoded once into the columns of a per-process
+``JobMatrix``: its canonical skill ids, location parts, job type, experience
+level index and salary range. Skills, locations and job types are kept as
+posting lists (feature -> rows), i.e. the sparse one-hot columns of the
+matrix, so scoring a seeker accumulates skill overlaps only over the rows
+that share a feature with them. Experience and salary fit are cheap
+per-row terms.
+
+A job that shares no skill with the seeker can score at most
+``W_EXPERIENCE + W_SALARY`` plus the location and job type weights it
+matches. ``JobMatrix.top()`` scores the skill candidates first, then the
+other rows tier by tier (location and type, location, type, neither) only
+while a tier's bound can still beat the current k-th score, so results are
+the exact top-k without scoring most rows.
+
+The matrix follows the ``jobs:list`` cache token, which changes on every
+job create/edit/delete (see jobs.cache). When it changes, jobs updated since
+the last sync are re-read and patched in, and the ids of the active jobs are
+compared with the matrix so deleted jobs (which leave no updated_at behind)
+are dropped and any missed job is added. ``REBUILD_INTERVAL`` triggers a
+full rebuild.
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict, namedtuple
+from itertools import chain
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import cache as job_cache
+from .models import Job, JobSkill
+
+logger = logging.getLogger(__name__)
+
+W_SKILLS = 0.5
+W_EXPERIENCE = 0.15
+W_LOCATION = 0.15
+W_JOB_TYPE = 0.1
+W_SALARY = 0.1
+# Best score a job can reach without sharing a skill, location or job type
+NON_CANDIDATE_BOUND = W_EXPERIENCE + W_SALARY
+
+EXPERIENCE_LEVELS = [level for level, label in Job.EXPERIENCE_CHOICES]
+EXPERIENCE_INDEX = {level: index for index, level in enumerate(EXPERIENCE_LEVELS)}
+
+# Jobs whose transaction committed after a sync may carry an earlier updated_at
+SYNC_OVERLAP = timedelta(minutes=1)
+REBUILD_INTERVAL = 3600
+
+JobFeatures = namedtuple('JobFeatures', 'id skill_ids locations job_type experience salary_min salary_max')
+SeekerFeatures = namedtuple('SeekerFeatures', 'skill_ids locations job_types experience expected_salary')
+
+
+# ==================== ENCODING ====================
+
+def parse_locations(text):
+    """'Chennai, India' -> {'chennai, india', 'chennai', 'india'}"""
+    text = ' '.join((text or '').split()).casefold()
+    if not text:
+        return frozenset()
+    parts = {part.strip() for part in text.split(',') if part.strip()}
+    return frozenset(parts | {text})
+
+
+def parse_job_types(text):
+    """'Full-time, Part time' -> {'full-time', 'part-time'}"""
+    return frozenset(
+        '-'.join(part.casefold().split()) for part in (text or '').split(',') if part.strip()
+    )
+
+
+def experience_fit(job_level, seeker_level):
+    """1 for the same level, falling linearly to 0 at opposite ends of the scale"""
+    if job_level is None or seeker_level is None:
+        return 0.5
+    return 1 - abs(job_level - seeker_level) / (len(EXPERIENCE_LEVELS) - 1)
+
+
+def salary_fit(salary_min, salary_max, expected):
+    """1 when the expected salary is within reach of the job's range, less the further above it"""
+    ceiling = salary_max if salary_max is not None else salary_min
+    if ceiling is None or not expected:
+        return 0.5
+    if expected <= ceiling:
+        return 1.0
+    return max(0.0, 1 - (expected - ceiling) / expected)
+
+
+def encode_jobs(queryset):
+    """JobFeatures for every job of queryset, in two queries"""
+    rows = list(queryset.values_list(
+        'id', 'location', 'job_type', 'experience_required', 'salary_min', 'salary_max'
+    ))
+    skills = defaultdict(set)
+    for job_id, skill_id in JobSkill.objects.filter(job_id__in=[row[0] for row in rows]).values_list('job_id', 'skill_id'):
+        skills[job_id].add(skill_id)
+    return [
+        JobFeatures(
+            id=job_id,
+            skill_ids=frozenset(skills[job_id]),
+            locations=parse_locations(location),
+            job_type=job_type,
+            experience=EXPERIENCE_INDEX.get(experience),
+            salary_min=float(salary_min) if salary_min is not None else None,
+            salary_max=float(salary_max) if salary_max is not None else None,
+        )
+        for job_id, location, job_type, experience, salary_min, salary_max in rows
+    ]
+
+
+def encode_seeker(job_seeker):
+    """SeekerFeatures of a JobSeeker, in one query for its skills"""
+    return SeekerFeatures(
+        skill_ids=frozenset(job_seeker.job_seeker_skills.values_list('skill_id', flat=True)),
+        locations=frozenset().union(*(parse_locations(part) for part in (job_seeker.preferred_locations or '').split(','))),
+        job_types=parse_job_types(job_seeker.preferred_job_types),
+        experience=EXPERIENCE_INDEX.get(job_seeker.experience_level),
+        expected_salary=job_seeker.expected_salary,
+    )
+
+
+# ==================== MATRIX ====================
+
+class JobMatrix:
+    """Column store of active job features with sparse posting lists"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ids = []
+        self.skill_counts = []
+        self.experience = []
+        self.salary_min = []
+        self.salary_max = []
+        self.features = []
+        self.row_of = {}
+        self.free_rows = []
+        self.skill_rows = defaultdict(set)
+        self.location_rows = defaultdict(set)
+        self.type_rows = defaultdict(set)
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def upsert(self, job):
+        self.remove(job.id)
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = len(self.ids)
+            for column in (self.ids, self.skill_counts, self.experience, self.salary_min, self.salary_max, self.features):
+                column.append(None)
+        self.ids[row] = job.id
+        self.skill_counts[row] = len(job.skill_ids)
+        self.experience[row] = job.experience
+        self.salary_min[row] = job.salary_min
+        self.salary_max[row] = job.salary_max
+        self.features[row] = job
+        self.row_of[job.id] = row
+        for skill_id in job.skill_ids:
+            self.skill_rows[skill_id].add(row)
+        for location in job.locations:
+            self.location_rows[location].add(row)
+        self.type_rows[job.job_type].add(row)
+
+    def remove(self, job_id):
+        row = self.row_of.pop(job_id, None)
+        if row is None:
+            return
+        job = self.features[row]
+        for skill_id in job.skill_ids:
+            self.skill_rows[skill_id].discard(row)
+        for location in job.locations:
+            self.location_rows[location].discard(row)
+        self.type_rows[job.job_type].discard(row)
+        self.ids[row] = self.features[row] = None
+        self.free_rows.append(row)
+
+    def top(self, seeker, limit=20):
+        """[(score, job_id)] of the best `limit` jobs for seeker, best first"""
+        overlap = defaultdict(int)
+        for skill_id in seeker.skill_ids:
+            for row in self.skill_rows.get(skill_id, ()):
+                overlap[row] += 1
+        location_rows = set().union(*(self.location_rows.get(location, ()) for location in seeker.locations))
+        type_rows = set().union(*(self.type_rows.get(job_type, ()) for job_type in seeker.job_types))
+
+        experience_scores = {
+            level: W_EXPERIENCE * experience_fit(level, seeker.experience) for level in [None, *range(len(EXPERIENCE_LEVELS))]
+        }
+
+        def score(row):
+            skills = overlap.get(row, 0) / self.skill_counts[row] if self.skill_counts[row] else 0
+            return (
+                W_SKILLS * skills
+                + experience_scores[self.experience[row]]
+                + W_LOCATION * (row in location_rows)
+                + W_JOB_TYPE * (row in type_rows)
+                + W_SALARY * salary_fit(self.salary_min[row], self.salary_max[row], seeker.expected_salary)
+            )
+
+        best = heapq.nlargest(limit, ((score(row), self.ids[row]) for row in overlap))
+
+        # Rows sharing no skill, by the best score they can reach
+        tiers = [
+            (NON_CANDIDATE_BOUND + W_LOCATION + W_JOB_TYPE, lambda: location_rows & type_rows),
+            (NON_CANDIDATE_BOUND + W_LOCATION, lambda: location_rows - type_rows),
+            (NON_CANDIDATE_BOUND + W_JOB_TYPE, lambda: type_rows - location_rows),
+            (NON_CANDIDATE_BOUND, lambda: (
+                row for row in self.row_of.values() if row not in location_rows and row not in type_rows
+            )),
+        ]
+        for bound, rows in tiers:
+            if len(best) == limit and best[-1][0] > bound:
+                break
+            scored = ((score(row), self.ids[row]) for row in rows() if row not in overlap)
+            best = heapq.nlargest(limit, chain(best, scored))
+        return [(round(value, 4), job_id) for value, job_id in best]
+
+
+class RecommendationEngine:
+    """Keeps a JobMatrix of active jobs in sync with the database"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.matrix = JobMatrix()
+        self.token = None
+        self.synced_at = None
+        self.built_at = 0
+
+    def active_jobs(self):
+        return Job.objects.filter(is_active=True).order_by()
+
+    def rebuild(self):
+        matrix = JobMatrix()
+        synced_at = timezone.now()
+        for job in encode_jobs(self.active_jobs()):
+            matrix.upsert(job)
+        self.matrix, self.synced_at, self.built_at = matrix, synced_at, time.monotonic()
+        logger.info(f"✅ Recommendation matrix rebuilt with {len(matrix)} jobs")
+
+    def apply_changes(self):
+        """Patch in jobs updated since the last sync and drop jobs no longer active"""
+        synced_at = timezone.now()
+        active_ids = set(self.active_jobs().values_list('id', flat=True))
+        changed_ids = set(
+            self.active_jobs().filter(updated_at__gte=self.synced_at - SYNC_OVERLAP).values_list('id', flat=True)
+        )
+        # Deactivated or deleted, in this process or another
+        for job_id in set(self.matrix.row_of) - active_ids:
+            self.matrix.remove(job_id)
+        for job in encode_jobs(Job.objects.filter(id__in=changed_ids | (active_ids - set(self.matrix.row_of)))):
+            self.matrix.upsert(job)
+        self.synced_at = synced_at
+
+    def sync(self):
+        token = job_cache.get_token(job_cache.LIST_VERSION_KEY)
+        with self.lock:
+            if token == self.token and time.monotonic() - self.built_at < REBUILD_INTERVAL:
+                return
+            if self.synced_at is None or time.monotonic() - self.built_at >= REBUILD_INTERVAL:
+                self.rebuild()
+            else:
+                self.apply_changes()
+            self.token = token
+
+    def recommend(self, job_seeker, limit=20):
+        """[(score, job_id)] of the best active jobs for job_seeker"""
+        self.sync()
+        seeker = encode_seeker(job_seeker)
+        with self.lock:
+            return self.matrix.top(seeker, limit)
+
+
+engine = RecommendationEngine()
@@ -0,0 +1,186 @@
+"""
+Full-text search for jobs.
+
+Each Job has a maintained search document:
+- PostgreSQL: a weighted, generated ``search_document`` tsvector column with a
+  GIN index (see migration 0007), so it is always in sync with the row.
+- SQLite: an FTS5 shadow table (``jobs_job_fts``) keyed by the job id, kept in
+  sync by the Job post_save/post_delete signals.
+
+Other databases fall back to the old ``icontains`` scan.
+"""
+import re
+
+from django.db import connection, OperationalError
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Job
+
+SEARCH_FIELDS = ['title', 'company', 'location', 'skills', 'description']
+FTS_TABLE = 'jobs_job_fts'
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+
+def tokenize(terms):
+    """Split search terms into plain word tokens safe to embed in a FTS query"""
+    tokens = []
+    for term in terms:
+        tokens.extend(re.findall(r'\w+', term.lower()))
+    return tokens
+
+
+class BaseSearchBackend:
+    def search(self, queryset, terms):
+        raise NotImplementedError
+
+    def index(self, job):
+        """Refresh the search document for a job"""
+
+    def remove(self, job_id):
+        """Drop the search document for a deleted job"""
+
+    def rebuild(self):
+        """Rebuild every search document from the jobs table"""
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Fallback equivalent to DRF's SearchFilter: every term must match a field"""
+
+    def search(self, queryset, terms):
+        for term in terms:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Ranked tsquery search over the generated search_document column"""
+
+    def search(self, queryset, terms):
+        tokens = tokenize(terms)
+        if not tokens:
+            return queryset
+
+        # Prefix match every token: "pyth dev" -> "pyth:* & dev:*"
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        table = connection.ops.quote_name(Job._meta.db_table)
+
+        return queryset.filter(
+            RawSQL(
+                f"{table}.search_document @@ to_tsquery('english', %s)",
+                [tsquery],
+                output_field=BooleanField(),
+            ),
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({table}.search_document, to_tsquery('english', %s))",
+                [tsquery],
+                output_field=FloatField(),
+            ),
+            search_highlight=RawSQL(
+                f"ts_headline('english', {table}.description, to_tsquery('english', %s), "
+                f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=35, MinWords=15, MaxFragments=1')",
+                [tsquery],
+                output_field=TextField(),
+            ),
+        ).order_by('-search_rank', '-created_at')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Ranked FTS5 search over the jobs_job_fts shadow table"""
+
+    # bm25() weights, in SEARCH_FIELDS order
+    WEIGHTS = '10.0, 10.0, 2.0, 5.0, 1.0'
+
+    def search(self, queryset, terms):
+        tokens = tokenize(terms)
+        if not tokens:
+            return queryset
+
+        # Implicit AND of prefix queries: "pyth dev" -> '"pyth"* "dev"*'
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        table = connection.ops.quote_name(Job._meta.db_table)
+        description_column = SEARCH_FIELDS.index('description')
+
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]),
+        ).annotate(
+            # bm25() is lower-is-better, negate it so both backends sort descending
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {self.WEIGHTS}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+                [match],
+                output_field=FloatField(),
+            ),
+            search_highlight=RawSQL(
+                f"SELECT snippet({FTS_TABLE}, {description_column}, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 24) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+                [match],
+                output_field=TextField(),
+            ),
+        ).order_by('-search_rank', '-created_at')
+
+    def index(self, job):
+        values = [getattr(job, field) or '' for field in SEARCH_FIELDS]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(SEARCH_FIELDS))})",
+                [job.pk, *values],
+            )
+
+    def remove(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job_id])
+
+    def rebuild(self):
+        table = connection.ops.quote_name(Job._meta.db_table)
+        columns = ', '.join(SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM {table}")
+
+
+_backends = {}
+
+
+def get_search_backend():
+    """Return the search backend matching the default database"""
+    vendor = connection.vendor
+    if vendor not in _backends:
+        if vendor == 'postgresql':
+            _backends[vendor] = PostgresSearchBackend()
+        elif vendor == 'sqlite' and sqlite_fts_available():
+            _backends[vendor] = SQLiteSearchBackend()
+        else:
+            _backends[vendor] = LikeSearchBackend()
+    return _backends[vendor]
+
+
+def sqlite_fts_available():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            return cursor.fetchone() is not None
+    except OperationalError:
+        return False
+
+
+class JobSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on ``?search=``: results are
+    filtered through the search index and ordered by relevance unless
+    an explicit ``?ordering=`` is given.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+from accounts.registration import SERIALIZER_EXTRA_KWARGS, find_conflicts, register_user
 from .models import UserProfile, Job, Application, SavedJob
 
 class UserSerializer(serializers.ModelSerializer):
@@ -26,29 +28,19 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'email', 'password', 'password_confirm', 'first_name', 'last_name', 'user_type', 'access', 'refresh']
         read_only_fields = ['access', 'refresh']
+        extra_kwargs = SERIALIZER_EXTRA_KWARGS
     
     def validate(self, data):
         if data.get('password') != data.get('password_confirm'):
             raise serializers.ValidationError({'password': 'Passwords do not match'})
+        conflicts = find_conflicts(data['username'], data.get('email', ''))
+        if conflicts:
+            raise serializers.ValidationError(conflicts)
         return data
     
-    def validate_username(self, value):
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Username already exists")
-        return value
-    
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Email already exists")
-        return value
-    
     def create(self, validated_data):
-        user_type = validated_data.pop('user_type', 'job_seeker')
         validated_data.pop('password_confirm')
-        password = validated_data.pop('password')
-        user = User.objects.create_user(password=password, **validated_data)
-        UserProfile.objects.create(user=user, user_type=user_type)
-        return user
+        return register_user(**validated_data)
     
     def get_access(self, obj):
         if not hasattr(self, '_refresh_token'):
@@ -65,56 +57,113 @@ class JobSerializer(serializers.ModelSerializer):
     applications_count = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
     is_applied = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
     
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ['normalized_skills']
         read_only_fields = ['employer']
     
+    def get_fields(self):
+        fields = super().get_fields()
+        # Views pass include_user_state=False for responses shared across users
+        if not self.context.get('include_user_state', True):
+            fields.pop('is_saved')
+            fields.pop('is_applied')
+        return fields
+    
     def get_applications_count(self, obj):
+        # Annotated by Job.objects.with_listing_annotations()
+        if hasattr(obj, 'applications_count'):
+            return obj.applications_count
         return obj.applications.count()
 
     def get_is_saved(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'is_saved'):
+                return obj.is_saved
             return SavedJob.objects.filter(user=request.user, job=obj).exists()
         return False
 
     def get_is_applied(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'is_applied'):
+                return obj.is_applied
             return Application.objects.filter(applicant=request.user, job=obj).exists()
         return False
 
+    def get_search_highlight(self, obj):
+        # Annotated by the search backend when ?search= is used
+        return getattr(obj, 'search_highlight', None)
+
+class JobSummarySerializer(serializers.ModelSerializer):
+    """Employer dashboard row, read from Job.objects.with_application_summary()"""
+    applications_count = serializers.IntegerField(read_only=True)
+    status_counts = serializers.SerializerMethodField()
+    saved_count = serializers.IntegerField(read_only=True)
+    latest_application_at = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        model = Job
+        fields = ['id', 'title', 'company', 'location', 'job_type', 'is_active', 'created_at',
+                  'applications_count', 'status_counts', 'saved_count', 'latest_application_at']
+    
+    def get_status_counts(self, obj):
+        return {status: getattr(obj, f'{status}_count') for status, _ in Application.STATUS_CHOICES}
+
+def get_related_or_none(obj, name):
+    """A one-to-one relation, or None when the related row doesn't exist"""
+    try:
+        return getattr(obj, name)
+    except ObjectDoesNotExist:
+        return None
+
+class MediaFileField(serializers.FileField):
+    """FileField rendered through the parent serializer's absolute_media_url()"""
+    def to_representation(self, value):
+        return self.parent.absolute_media_url(value)
+
 class ApplicationSerializer(serializers.ModelSerializer):
     job_title = serializers.CharField(source='job.title', read_only=True)
     applicant_name = serializers.CharField(source='applicant.get_full_name', read_only=True)
     applicant_email = serializers.CharField(source='applicant.email', read_only=True)
-    resume = serializers.FileField(required=False, allow_null=True)
+    resume = MediaFileField(required=False, allow_null=True)
     cover_letter = serializers.CharField(required=False, allow_blank=True, default='')
     
     applicant_details = serializers.SerializerMethodField()
     
     class Meta:
         model = Application
-        fields = ['id', 'job_title', 'applicant_name', 'applicant_email', 'cover_letter', 'resume', 'status', 'applied_at', 'updated_at', 'applicant_details']
-        read_only_fields = ['status', 'applied_at', 'updated_at', 'job_title', 'applicant_name', 'applicant_email']
+        fields = ['id', 'job_title', 'applicant_name', 'applicant_email', 'cover_letter', 'resume', 'status', 'applied_at', 'updated_at', 'match_score', 'applicant_details']
+        read_only_fields = ['status', 'applied_at', 'updated_at', 'job_title', 'applicant_name', 'applicant_email', 'match_score']
 
-    def get_applicant_details(self, obj):
-        request = self.context.get('request')
-        
-        # 1. Try to get JobSeeker (from accounts app)
-        try:
-            job_seeker = obj.applicant.job_seeker
-            
-            profile_resume_url = None
-            if job_seeker.resume:
-                profile_resume_url = request.build_absolute_uri(job_seeker.resume.url) if request else job_seeker.resume.url
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('include_match_score'):
+            fields.pop('match_score')
+        return fields
 
-            profile_picture_url = None
-            if job_seeker.profile_picture:
-                profile_picture_url = request.build_absolute_uri(job_seeker.profile_picture.url) if request else job_seeker.profile_picture.url
+    def absolute_media_url(self, file):
+        """
+        Absolute URL of a stored file. The scheme and host are resolved once
+        per serializer instead of calling build_absolute_uri() per file.
+        """
+        if not file:
+            return None
+        url = file.url
+        request = self.context.get('request')
+        if request is None or not url.startswith('/') or url.startswith('//'):
+            return url
+        if not hasattr(self, '_url_base'):
+            self._url_base = request.build_absolute_uri('/')[:-1]
+        return self._url_base + url
 
+    def get_applicant_details(self, obj):
+        # ApplicationViewSet select_related()s both, so neither costs a query
+        job_seeker = get_related_or_none(obj.applicant, 'job_seeker')
+        if job_seeker is not None:
             return {
                 'id': job_seeker.id,
                 'phone': job_seeker.phone,
@@ -126,24 +175,13 @@ class ApplicationSerializer(serializers.ModelSerializer):
                 'portfolio_url': job_seeker.portfolio_url,
                 'linkedin_url': job_seeker.linkedin_url,
                 'github_url': job_seeker.github_url,
-                'profile_resume_url': profile_resume_url,
-                'profile_picture_url': profile_picture_url,
+                'profile_resume_url': self.absolute_media_url(job_seeker.resume),
+                'profile_picture_url': self.absolute_media_url(job_seeker.profile_picture),
             }
-        except Exception:
-            pass
-            
-        # 2. Fallback to UserProfile (from jobs app)
-        try:
-            profile = obj.applicant.profile
             
-            profile_resume_url = None
-            if profile.resume:
-                profile_resume_url = request.build_absolute_uri(profile.resume.url) if request else profile.resume.url
-
-            profile_picture_url = None
-            if profile.profile_picture:
-                profile_picture_url = request.build_absolute_uri(profile.profile_picture.url) if request else profile.profile_picture.url
-
+        # Fallback to UserProfile (from jobs app)
+        profile = get_related_or_none(obj.applicant, 'profile')
+        if profile is not None:
             return {
                 'id': profile.id,
                 'phone': profile.phone,
@@ -155,11 +193,9 @@ class ApplicationSerializer(serializers.ModelSerializer):
                 'portfolio_url': profile.website,
                 'linkedin_url': None,
                 'github_url': None,
-                'profile_resume_url': profile_resume_url,
-                'profile_picture_url': profile_picture_url,
+                'profile_resume_url': self.absolute_media_url(profile.resume),
+                'profile_picture_url': self.absolute_media_url(profile.profile_picture),
             }
-        except Exception:
-            pass
 
         return None
 
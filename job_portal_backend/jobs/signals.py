@@ -1,67 +1,25 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import timezone
 from jobs.models import UserProfile, Application, Job, SavedJob
+from jobs import cache as job_cache
+from jobs import outbox
+from jobs import ranking
+from jobs.email_assets import render_email
+from jobs.search import get_search_backend
+from jobs.skills import sync_job_skills
 import logging
-import os
-from email.mime.image import MIMEImage
 
 logger = logging.getLogger(__name__)
 
-import threading
-
-def send_email_thread(subject, html_message, plain_message, recipient_list):
-    """
-    Worker function to send email in a separate thread
-    """
-    try:
-        msg = EmailMultiAlternatives(subject, plain_message, settings.DEFAULT_FROM_EMAIL, recipient_list)
-        msg.attach_alternative(html_message, "text/html")
-
-        # Path to logo
-        # Try development path first
-        logo_path = os.path.join(settings.BASE_DIR, '..', 'job-portal-frontend', 'public', 'favicon_clean.png')
-        
-        # If not found (production/docker), try static root or build dir
-        if not os.path.exists(logo_path):
-            # Try collected static files (assuming runserver/gunicorn has run collectstatic)
-            logo_path = os.path.join(settings.STATIC_ROOT, 'favicon_clean.png')
-            
-            if not os.path.exists(logo_path):
-                 # Try directly in build/ which we copy to in Docker
-                 logo_path = os.path.join(settings.BASE_DIR, 'build', 'favicon_clean.png')
-
-        if os.path.exists(logo_path):
-            with open(logo_path, 'rb') as f:
-                logo_data = f.read()
-            logo = MIMEImage(logo_data)
-            logo.add_header('Content-ID', '<logo_image>')
-            logo.add_header('Content-Disposition', 'inline', filename='logo.png')
-            msg.attach(logo)
-        else:
-            logger.warning(f"⚠️ Logo not found at any checked path. Last checked: {logo_path}")
-
-        msg.send()
-        logger.info(f"✅ Email sent successfully to {recipient_list}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Error in send_email_thread: {str(e)}")
-        # raise e # Don't raise in thread, just log
-
 def send_email_with_logo(subject, html_message, plain_message, recipient_list):
     """
-    Helper function to trigger email sending in a background thread
+    Queue an email (with the inline logo) for the send_queued_emails worker.
+    Runs inside the caller's transaction, so a rolled back change sends nothing.
     """
-    email_thread = threading.Thread(
-        target=send_email_thread,
-        args=(subject, html_message, plain_message, recipient_list)
-    )
-    email_thread.daemon = True # Allow main program to exit even if thread is running
-    email_thread.start()
+    outbox.enqueue(subject, html_message, plain_message, recipient_list)
     return True
 
 # ==================== USER SIGNALS ====================
@@ -69,53 +27,16 @@ def send_email_with_logo(subject, html_message, plain_message, recipient_list):
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """
-    Signal to create UserProfile when a new User is created
-    """
-    if created:
-        try:
-            UserProfile.objects.get_or_create(user=instance)
-            logger.info(f"✅ UserProfile created for user: {instance.username}")
-        except Exception as e:
-            logger.error(f"❌ Error creating UserProfile for {instance.username}: {str(e)}")
-
-
-@receiver(post_save, sender=User)
-def send_welcome_email(sender, instance, created, **kwargs):
-    """
-    Signal to send welcome email when a new User is created
-    """
-    if created:
-        send_employee_welcome_email(instance)
-
-
-def send_employee_welcome_email(user):
-    """
-    Send welcome email to newly created user
+    Give users created outside accounts.registration (admin, createsuperuser,
+    scripts) a UserProfile. Registration creates its own, with the welcome email.
     """
+    if not created or getattr(instance, '_registering', False):
+        return
     try:
-        profile = user.profile
-        user_type_display = "Job Seeker" if profile.user_type == 'job_seeker' else "Employer"
-        
-        subject = f"Welcome to DreamRoute - {user_type_display}! 🎯"
-        
-        context = {
-            'user_name': user.first_name or user.username,
-            'username': user.username,
-            'email': user.email,
-            'user_type': user_type_display,
-            'portal_url': settings.FRONTEND_URL,
-            'dashboard_url': f'{settings.FRONTEND_URL}/jobs',
-        }
-        
-        html_message = render_to_string('emails/welcome_email.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_email_with_logo(subject, html_message, plain_message, [user.email])
-        
-        logger.info(f"✅ Welcome email sent to {user.email}")
-        
+        UserProfile.objects.get_or_create(user=instance)
+        logger.info(f"✅ UserProfile created for user: {instance.username}")
     except Exception as e:
-        logger.error(f"❌ Error sending welcome email to {user.email}: {str(e)}")
+        logger.error(f"❌ Error creating UserProfile for {instance.username}: {str(e)}")
 
 
 # ==================== USER PROFILE SIGNALS ====================
@@ -146,12 +67,11 @@ def send_profile_email(user):
             'profile_url': f'{settings.FRONTEND_URL}/profile',
         }
         
-        html_message = render_to_string('emails/profile_email.html', context)
-        plain_message = strip_tags(html_message)
+        html_message, plain_message = render_email('emails/profile_email.html', context)
         
         send_email_with_logo(subject, html_message, plain_message, [user.email])
         
-        logger.info(f"✅ Profile completion email sent to {user.email}")
+        logger.info(f"✅ Profile completion email queued for {user.email}")
         
     except Exception as e:
         logger.error(f"❌ Error sending profile email to {user.email}: {str(e)}")
@@ -183,12 +103,11 @@ def send_job_posted_email(job):
             'portal_url': settings.FRONTEND_URL,
         }
         
-        html_message = render_to_string('emails/job_posted_email.html', context)
-        plain_message = strip_tags(html_message)
+        html_message, plain_message = render_email('emails/job_posted_email.html', context)
         
         send_email_with_logo(subject, html_message, plain_message, [job.employer.email])
         
-        logger.info(f"✅ Job posted email sent to {job.employer.email}")
+        logger.info(f"✅ Job posted email queued for {job.employer.email}")
         
     except Exception as e:
         logger.error(f"❌ Error sending job posted email: {str(e)}")
@@ -208,17 +127,116 @@ def send_job_deleted_notification(sender, instance, **kwargs):
             'portal_url': settings.FRONTEND_URL,
         }
         
-        html_message = render_to_string('emails/job_deleted_email.html', context)
-        plain_message = strip_tags(html_message)
+        html_message, plain_message = render_email('emails/job_deleted_email.html', context)
         
         send_email_with_logo(subject, html_message, plain_message, [instance.employer.email])
         
-        logger.info(f"✅ Job deleted notification sent to {instance.employer.email}")
+        logger.info(f"✅ Job deleted notification queued for {instance.employer.email}")
         
     except Exception as e:
         logger.error(f"❌ Error sending job deleted email: {str(e)}")
 
 
+# ==================== SEARCH INDEX SIGNALS ====================
+
+@receiver(post_save, sender=Job)
+def update_job_search_document(sender, instance, **kwargs):
+    """
+    Keep the job's search document in sync on create and update
+    """
+    try:
+        get_search_backend().index(instance)
+    except Exception as e:
+        logger.error(f"❌ Error indexing job {instance.pk} for search: {str(e)}")
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_search_document(sender, instance, **kwargs):
+    """
+    Drop the search document of a deleted job
+    """
+    try:
+        get_search_backend().remove(instance.pk)
+    except Exception as e:
+        logger.error(f"❌ Error removing job {instance.pk} from search: {str(e)}")
+
+
+# ==================== CACHE SIGNALS ====================
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_cache(sender, instance, **kwargs):
+    """
+    A job change can affect any cached list page, plus its own detail entry
+    """
+    job_cache.invalidate_job(instance.pk)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_application_job_cache(sender, instance, **kwargs):
+    """
+    An application only changes the applications_count of its job
+    """
+    job_cache.invalidate_job(instance.job_id, listing=False)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def touch_application_job(sender, instance, created=True, **kwargs):
+    """
+    A new or removed application changes its job's applications_count, so
+    advance the job's updated_at for the conditional GET validators
+    (a bulk UPDATE, so the Job signals don't fire again)
+    """
+    if created:
+        Job.objects.filter(pk=instance.job_id).update(updated_at=timezone.now())
+        job_cache.invalidate_user_state(instance.applicant_id)
+
+
+@receiver(post_save, sender=SavedJob)
+@receiver(post_delete, sender=SavedJob)
+def invalidate_saved_job_user_state(sender, instance, created=True, **kwargs):
+    """
+    Saving or unsaving changes is_saved in the user's job responses
+    """
+    if created:
+        job_cache.invalidate_user_state(instance.user_id)
+
+
+# ==================== SKILL SIGNALS ====================
+
+@receiver(post_save, sender=Job)
+def update_job_skills(sender, instance, **kwargs):
+    """
+    Mirror Job.skills into the normalized JobSkill rows
+    """
+    try:
+        sync_job_skills(instance)
+    except Exception as e:
+        logger.error(f"❌ Error syncing skills for job {instance.pk}: {str(e)}")
+
+
+# ==================== RANKING SIGNALS ====================
+
+@receiver(post_save, sender=Job)
+def invalidate_applicant_scores(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Applicants' match scores are stale once the job's requirements change
+    """
+    if created:
+        return
+    changed = instance.changed_fields if instance.is_tracked else ranking.JOB_FIELDS
+    if update_fields is not None:
+        changed = changed & set(update_fields)
+    if not ranking.JOB_FIELDS & changed:
+        return
+    try:
+        ranking.invalidate_job(instance.pk)
+    except Exception as e:
+        logger.error(f"❌ Error invalidating match scores for job {instance.pk}: {str(e)}")
+
+
 # ==================== APPLICATION SIGNALS ====================
 
 @receiver(post_save, sender=Application)
@@ -245,12 +263,11 @@ def send_application_submitted_email(application):
             'portal_url': settings.FRONTEND_URL,
         }
         
-        html_message = render_to_string('emails/application_submitted_email.html', context)
-        plain_message = strip_tags(html_message)
+        html_message, plain_message = render_email('emails/application_submitted_email.html', context)
         
         send_email_with_logo(subject, html_message, plain_message, [application.applicant.email])
         
-        logger.info(f"✅ Application submitted email sent to {application.applicant.email}")
+        logger.info(f"✅ Application submitted email queued for {application.applicant.email}")
         
         # Email to employer
         employer_subject = f"New Application for {application.job.title}"
@@ -263,12 +280,11 @@ def send_application_submitted_email(application):
             'portal_url': settings.FRONTEND_URL,
         }
         
-        employer_html_message = render_to_string('emails/new_application_email.html', employer_context)
-        employer_plain_message = strip_tags(employer_html_message)
+        employer_html_message, employer_plain_message = render_email('emails/new_application_email.html', employer_context)
         
         send_email_with_logo(employer_subject, employer_html_message, employer_plain_message, [application.job.employer.email])
         
-        logger.info(f"✅ New application notification sent to {application.job.employer.email}")
+        logger.info(f"✅ New application notification queued for {application.job.employer.email}")
         
     except Exception as e:
         logger.error(f"❌ Error sending application email: {str(e)}")
@@ -283,42 +299,67 @@ def send_application_status_update(sender, instance, created, **kwargs):
         send_status_update_email(instance)
 
 
+STATUS_MESSAGES = {
+    'pending': 'Your application is under review',
+    'reviewed': 'Your application has been reviewed',
+    'shortlisted': 'Congratulations! You have been shortlisted! 🎉',
+    'rejected': 'Thank you for your interest',
+    'accepted': 'Congratulations! You have been accepted! 🎉',
+}
+
+
+def build_status_update_email(application):
+    """
+    Return (subject, html_message, plain_message) for an application's status update
+    """
+    status_display = STATUS_MESSAGES.get(application.status, application.status)
+    subject = f"Application Status Update: {status_display}"
+    
+    context = {
+        'applicant_name': application.applicant.first_name or application.applicant.username,
+        'job_title': application.job.title,
+        'company_name': application.job.company,
+        'status': application.status.upper(),
+        'status_message': status_display,
+        'portal_url': settings.FRONTEND_URL,
+    }
+    
+    html_message, plain_message = render_email('emails/application_status_email.html', context, static_keys=['status', 'status_message'])
+    return subject, html_message, plain_message
+
+
 def send_status_update_email(application):
     """
     Send status update email to applicant
     """
     try:
-        status_messages = {
-            'pending': 'Your application is under review',
-            'reviewed': 'Your application has been reviewed',
-            'shortlisted': 'Congratulations! You have been shortlisted! 🎉',
-            'rejected': 'Thank you for your interest',
-            'accepted': 'Congratulations! You have been accepted! 🎉',
-        }
-        
-        status_display = status_messages.get(application.status, application.status)
-        subject = f"Application Status Update: {status_display}"
-        
-        context = {
-            'applicant_name': application.applicant.first_name or application.applicant.username,
-            'job_title': application.job.title,
-            'company_name': application.job.company,
-            'status': application.status.upper(),
-            'status_message': status_display,
-            'portal_url': settings.FRONTEND_URL,
-        }
-        
-        html_message = render_to_string('emails/application_status_email.html', context)
-        plain_message = strip_tags(html_message)
+        subject, html_message, plain_message = build_status_update_email(application)
         
         send_email_with_logo(subject, html_message, plain_message, [application.applicant.email])
         
-        logger.info(f"✅ Application status update sent to {application.applicant.email}")
+        logger.info(f"✅ Application status update queued for {application.applicant.email}")
         
     except Exception as e:
         logger.error(f"❌ Error sending application status email: {str(e)}")
 
 
+def send_status_update_emails(applications):
+    """
+    Queue status update emails for many applications with one INSERT
+    (used by bulk status changes, which don't fire post_save)
+    """
+    try:
+        outbox.enqueue_many([
+            (*build_status_update_email(application), [application.applicant.email])
+            for application in applications
+        ])
+        
+        logger.info(f"✅ {len(applications)} application status updates queued")
+        
+    except Exception as e:
+        logger.error(f"❌ Error queueing application status emails: {str(e)}")
+
+
 # ==================== SAVED JOBS SIGNALS ====================
 
 @receiver(post_save, sender=SavedJob)
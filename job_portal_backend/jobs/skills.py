@@ -0,0 +1,116 @@
+"""
+Skill normalization.
+
+``Job.skills`` and ``JobSeeker.skills`` stay the comma-separated text the API
+accepts; every save mirrors them into the canonical ``Skill`` table through
+``JobSkill`` / ``JobSeekerSkill`` so that matching is an indexed join.
+"""
+from django.db.models import Count, Exists, OuterRef
+
+from .models import Skill, JobSkill
+
+# Common spellings merged into one canonical skill name
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'drf': 'django rest framework',
+    'ml': 'machine learning',
+    'aws cloud': 'aws',
+}
+
+
+def normalize_skill(name):
+    """Case-fold, collapse whitespace and merge aliases"""
+    name = ' '.join(name.split()).casefold()
+    return SKILL_ALIASES.get(name, name)
+
+
+def parse_skills(text):
+    """
+    Parse a comma-separated skills string into an ordered
+    {canonical name: display label} dict, without duplicates.
+    """
+    skills = {}
+    for raw in (text or '').split(','):
+        label = ' '.join(raw.split())[:Skill._meta.get_field('label').max_length]
+        name = normalize_skill(label)[:Skill._meta.get_field('name').max_length]
+        if name and name not in skills:
+            skills[name] = label
+    return skills
+
+
+def resolve_skills(skills):
+    """
+    Return the Skill rows for a {name: label} dict, creating missing ones.
+    Costs one SELECT, plus one INSERT and one SELECT when some are new.
+    """
+    if not skills:
+        return []
+    existing = {skill.name: skill for skill in Skill.objects.filter(name__in=skills)}
+    missing = [Skill(name=name, label=label) for name, label in skills.items() if name not in existing]
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update(
+            (skill.name, skill) for skill in Skill.objects.filter(name__in=[skill.name for skill in missing])
+        )
+    return [existing[name] for name in skills if name in existing]
+
+
+def sync_skills(through_model, owner_field, owner, text):
+    """Make the owner's through rows match its comma-separated skills text"""
+    wanted = {skill.id for skill in resolve_skills(parse_skills(text))}
+    rows = through_model.objects.filter(**{owner_field: owner})
+    current = set(rows.values_list('skill_id', flat=True))
+
+    stale = current - wanted
+    if stale:
+        rows.filter(skill_id__in=stale).delete()
+
+    added = wanted - current
+    if added:
+        through_model.objects.bulk_create(
+            [through_model(**{owner_field: owner, 'skill_id': skill_id}) for skill_id in added],
+            ignore_conflicts=True,
+        )
+
+
+def sync_job_skills(job):
+    sync_skills(JobSkill, 'job', job, job.skills)
+
+
+def filter_jobs_by_skills(queryset, text, match='all'):
+    """
+    Filter jobs by a comma-separated skills string.
+    ``match='any'`` keeps jobs with at least one of the skills,
+    ``match='all'`` keeps jobs that have every one of them.
+    """
+    names = list(parse_skills(text))
+    if not names:
+        return queryset
+
+    if match == 'any':
+        return queryset.filter(
+            Exists(JobSkill.objects.filter(job=OuterRef('pk'), skill__name__in=names))
+        )
+
+    matching_jobs = JobSkill.objects.filter(skill__name__in=names).values('job').annotate(
+        matched=Count('skill')
+    ).filter(matched=len(names)).values('job')
+    return queryset.filter(pk__in=matching_jobs)
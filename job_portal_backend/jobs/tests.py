@@ -1,10 +1,32 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from django.utils.http import http_date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from rest_framework import status
-from jobs.models import Job, Application, UserProfile
-from accounts.models import JobSeeker, Employer
+from accounts.custom_email_backend import CircuitOpenError
+from jobs import email_assets, maintenance, outbox, ranking, recommendations
+from jobs.throttling import SlidingWindowLimiter, TokenBucketLimiter, RateLimitThrottle, parse_rate
+from jobs.serializers import ApplicationSerializer
+from jobs.views import JobViewSet
+from jobs.models import Job, Application, UserProfile, SavedJob, Skill, OutboundEmail, IdempotencyRecord, ApplicationStatusChange, MaintenanceTask
+from accounts.models import JobSeeker, Employer, OTP, UserAccountHistory
 
 class ApplicationFileTransferTest(TestCase):
     def setUp(self):
@@ -92,3 +114,1363 @@ class ApplicationFileTransferTest(TestCase):
         
         # Verify other details
         self.assertEqual(applicant_details['phone'], '1234567890')
+
+
+class JobListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.employer_user.profile.user_type = 'employer'
+        self.employer_user.profile.save()
+
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+
+    def create_jobs(self, count):
+        jobs = []
+        for i in range(count):
+            job = Job.objects.create(
+                title=f"Dev {i}",
+                company="Test Corp",
+                employer=self.employer_user,
+                description="Code stuff",
+                location="Remote",
+                job_type='full-time',
+            )
+            jobs.append(job)
+        return jobs
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        """
+        Listing jobs costs a COUNT plus one SELECT, whatever the number of
+        rows on the page or whether the caller has saved/applied to them.
+        """
+        jobs = self.create_jobs(4)
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[0])
+        Application.objects.create(job=jobs[1], applicant=self.seeker_user)
+
+        self.client.force_authenticate(user=self.seeker_user)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = {item['id']: item for item in response.data['results']}
+        self.assertTrue(results[jobs[0].id]['is_saved'])
+        self.assertFalse(results[jobs[0].id]['is_applied'])
+        self.assertTrue(results[jobs[1].id]['is_applied'])
+        self.assertEqual(results[jobs[1].id]['applications_count'], 1)
+        self.assertEqual(results[jobs[1].id]['employer_name'], 'employer')
+
+        self.create_jobs(4)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/?page=2')
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_anonymous_list_query_count(self):
+        self.create_jobs(4)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['results'][0]['is_saved'])
+
+
+class JobSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+
+        self.title_match = Job.objects.create(
+            title="Python Developer",
+            company="Snake Corp",
+            employer=self.employer_user,
+            description="Build APIs",
+            location="Remote",
+            job_type='full-time',
+            skills="Django, REST",
+        )
+        self.description_match = Job.objects.create(
+            title="Data Analyst",
+            company="Numbers Inc",
+            employer=self.employer_user,
+            description="Some python scripting is a plus",
+            location="Chennai",
+            job_type='full-time',
+            skills="SQL",
+        )
+        Job.objects.create(
+            title="Designer",
+            company="Pixels",
+            employer=self.employer_user,
+            description="Figma all day",
+            location="Remote",
+            job_type='contract',
+            skills="Figma",
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/jobs/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_prefix_search_is_ranked_by_relevance(self):
+        results = self.search('pyth')
+        self.assertEqual(
+            [item['id'] for item in results],
+            [self.title_match.id, self.description_match.id],
+        )
+
+    def test_all_terms_must_match(self):
+        results = self.search('python chennai')
+        self.assertEqual([item['id'] for item in results], [self.description_match.id])
+
+    def test_search_returns_highlighted_snippet(self):
+        results = self.search('scripting')
+        self.assertEqual(len(results), 1)
+        self.assertIn('<mark>scripting</mark>', results[0]['search_highlight'])
+
+    def test_explicit_ordering_overrides_rank(self):
+        response = self.client.get('/api/jobs/', {'search': 'python', 'ordering': '-created_at'})
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.description_match.id, self.title_match.id],
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        self.title_match.title = "Golang Developer"
+        self.title_match.description = "Build services"
+        self.title_match.save()
+
+        self.assertEqual([item['id'] for item in self.search('golang')], [self.title_match.id])
+        self.assertEqual([item['id'] for item in self.search('python')], [self.description_match.id])
+
+        self.description_match.delete()
+        self.assertEqual(self.search('python'), [])
+
+
+class JobSkillFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+
+        self.python_django = self.create_job("Backend", "Python, Django, Postgres")
+        self.python_only = self.create_job("Scripting", "python3")
+        self.javascript = self.create_job("Frontend", "JS, ReactJS")
+
+    def create_job(self, title, skills):
+        return Job.objects.create(
+            title=title,
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+            skills=skills,
+        )
+
+    def filter(self, **params):
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['id'] for item in response.data['results']}
+
+    def test_skills_are_case_folded_and_alias_merged(self):
+        self.assertEqual(
+            sorted(self.python_django.normalized_skills.values_list('name', flat=True)),
+            ['django', 'postgresql', 'python'],
+        )
+        self.assertEqual(list(self.python_only.normalized_skills.values_list('name', flat=True)), ['python'])
+        self.assertEqual(Skill.objects.filter(name='python').count(), 1)
+
+    def test_all_skills_match_by_default(self):
+        self.assertEqual(self.filter(skills='PYTHON, django'), {self.python_django.id})
+        self.assertEqual(self.filter(skills='python'), {self.python_django.id, self.python_only.id})
+        self.assertEqual(self.filter(skills='python, cobol'), set())
+
+    def test_any_skill_match(self):
+        self.assertEqual(
+            self.filter(skills='django, javascript', skills_match='any'),
+            {self.python_django.id, self.javascript.id},
+        )
+
+    def test_skills_follow_job_updates(self):
+        self.javascript.skills = "React, TypeScript"
+        self.javascript.save()
+
+        self.assertEqual(
+            sorted(self.javascript.normalized_skills.values_list('name', flat=True)),
+            ['react', 'typescript'],
+        )
+        self.assertEqual(self.filter(skills='js'), set())
+        self.assertEqual(self.filter(skills='ts'), {self.javascript.id})
+
+
+class JobQueryIndexTest(TestCase):
+    def test_canonical_queries_use_indexes(self):
+        """
+        explain_job_queries raises CommandError if any canonical
+        filter combination falls back to a sequential scan.
+        """
+        out = StringIO()
+        call_command('explain_job_queries', seed=300, stdout=out)
+        self.assertIn('✓ jobs (no filters) count', out.getvalue())
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+
+        salaries = [50000, None, 30000, 50000, None, 70000, 30000]
+        self.jobs = [
+            Job.objects.create(
+                title=f"Dev {i}",
+                company="Test Corp",
+                employer=self.employer_user,
+                description="Code stuff",
+                location="Remote",
+                job_type='full-time',
+                salary_min=salary,
+            )
+            for i, salary in enumerate(salaries)
+        ]
+
+    def walk(self, params):
+        """Follow next links to the end, then previous links back to the start"""
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        pages = [response.data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.client.get(backwards[-1]['previous']).data)
+
+        forward_ids = [item['id'] for page in pages for item in page['results']]
+        backward_ids = [item['id'] for page in reversed(backwards) for item in page['results']]
+        return forward_ids, backward_ids, pages
+
+    def test_default_ordering_walks_every_job_once(self):
+        forward, backward, pages = self.walk({'pagination': 'cursor', 'page_size': 3})
+
+        expected = [job.id for job in sorted(self.jobs, key=lambda job: (job.created_at, job.id), reverse=True)]
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertNotIn('count', pages[0])
+
+    def test_salary_ordering_with_nulls_last(self):
+        forward, backward, _ = self.walk({'pagination': 'cursor', 'page_size': 2, 'ordering': 'salary_min'})
+
+        with_salary = sorted((job for job in self.jobs if job.salary_min is not None), key=lambda job: (job.salary_min, job.id))
+        without_salary = sorted((job for job in self.jobs if job.salary_min is None), key=lambda job: job.id)
+        expected = [job.id for job in with_salary + without_salary]
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_optional_count_and_page_size_cap(self):
+        response = self.client.get('/api/jobs/', {'pagination': 'cursor', 'count': 'true', 'page_size': 1000})
+        self.assertEqual(response.data['count'], len(self.jobs))
+        self.assertEqual(len(response.data['results']), len(self.jobs))
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_page_skips_count_query(self):
+        self.client.get('/api/jobs/')  # warm up content types etc.
+        with self.assertNumQueries(1):
+            self.client.get('/api/jobs/', {'pagination': 'cursor'})
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/jobs/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_numbers_remain_the_default(self):
+        response = self.client.get('/api/jobs/', {'page_size': 5})
+        self.assertEqual(response.data['count'], len(self.jobs))
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class JobResultCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+
+        self.job = self.create_job("Dev")
+        self.other_job = self.create_job("Ops")
+
+    def create_job(self, title):
+        return Job.objects.create(
+            title=title,
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+
+    def test_anonymous_list_is_served_from_cache(self):
+        first = self.client.get('/api/jobs/', {'job_type': 'full-time'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/jobs/', {'job_type': 'full-time'})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_query_params_are_normalized(self):
+        self.client.get('/api/jobs/', {'job_type': 'full-time', 'location': 'remote'})
+        response = self.client.get('/api/jobs/?location=remote&job_type=full-time&search=')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_job_edit_invalidates_lists_and_its_own_detail_only(self):
+        self.client.get('/api/jobs/')
+        self.client.get(f'/api/jobs/{self.job.id}/')
+        self.client.get(f'/api/jobs/{self.other_job.id}/')
+
+        self.job.title = "Senior Dev"
+        self.job.save()
+
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn("Senior Dev", [item['title'] for item in response.data['results']])
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(f'/api/jobs/{self.other_job.id}/')['X-Cache'], 'HIT')
+
+    def test_application_invalidates_only_pages_showing_the_job(self):
+        self.client.get('/api/jobs/')
+        self.client.get('/api/jobs/', {'search': 'ops'})
+
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        counts = {item['id']: item['applications_count'] for item in response.data['results']}
+        self.assertEqual(counts[self.job.id], 1)
+        self.assertEqual(self.client.get('/api/jobs/', {'search': 'ops'})['X-Cache'], 'HIT')
+
+    def test_changes_during_render_are_not_cached(self):
+        paginate_queryset = JobViewSet.paginate_queryset
+
+        def apply_after_fetch(view, queryset):
+            page = paginate_queryset(view, queryset)
+            Application.objects.create(job=self.job, applicant=self.seeker_user)
+            return page
+
+        with mock.patch.object(JobViewSet, 'paginate_queryset', apply_after_fetch):
+            self.client.get('/api/jobs/')
+
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        counts = {item['id']: item['applications_count'] for item in response.data['results']}
+        self.assertEqual(counts[self.job.id], 1)
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.get('/api/jobs/')
+        self.client.force_authenticate(user=self.seeker_user)
+        response = self.client.get('/api/jobs/')
+        self.assertNotIn('X-Cache', response)
+
+    def test_stats_are_exposed_to_admins(self):
+        self.client.get('/api/jobs/')
+        self.client.get('/api/jobs/')
+
+        self.client.force_authenticate(user=self.seeker_user)
+        self.assertEqual(self.client.get('/api/jobs/cache_stats/').status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(username='admin', password='password', email='admin@test.com')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/jobs/cache_stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        self.job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        first = self.client.get('/api/jobs/')
+        self.assertIn('ETag', first)
+        self.assertNotIn('Last-Modified', first)
+
+        # Only the validator aggregate runs; nothing is fetched or serialized
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_deleted_rows_are_not_hidden_by_if_modified_since(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        SavedJob.objects.create(user=self.seeker_user, job=self.job)
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get('/api/saved-jobs/', HTTP_IF_MODIFIED_SINCE=since).status_code, status.HTTP_200_OK)
+
+        SavedJob.objects.all().delete()
+        response = self.client.get('/api/saved-jobs/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+        # A single resource without user state still gets a Last-Modified
+        self.assertIn('Last-Modified', self.client.get(f'/api/jobs/{self.job.id}/?include_user_state=false'))
+        self.assertNotIn('Last-Modified', self.client.get(f'/api/jobs/{self.job.id}/'))
+
+    def test_saved_state_changes_the_etag(self):
+        jobs = [self.job] + [
+            Job.objects.create(title=f"Dev {i}", company="Test Corp", employer=self.employer_user, description="Code")
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.seeker_user)
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[0])
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[3])
+        etag = self.client.get('/api/jobs/')['ETag']
+
+        # Same number of saved jobs, with the same sum of job ids
+        SavedJob.objects.all().delete()
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[1])
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[2])
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_validators_read_only_job_columns(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        etag = self.client.get('/api/jobs/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/jobs/?search=dev', HTTP_IF_NONE_MATCH=etag)
+        self.assertNotIn('jobs_application', queries[0]['sql'])
+        self.assertNotIn('jobs_savedjob', queries[0]['sql'])
+
+    def test_etag_changes_with_the_representation(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        etag = self.client.get('/api/jobs/')['ETag']
+
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTrue(response.data['results'][0]['is_applied'])
+
+        etag = response['ETag']
+        self.job.title = "Senior Dev"
+        self.job.save()
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Validators are per user
+        self.client.force_authenticate(user=self.employer_user)
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_and_cached_responses(self):
+        url = f'/api/jobs/{self.job.id}/'
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url)['ETag'], first['ETag'])
+
+        self.job.description = "More code"
+        self.job.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get('/api/jobs/999999/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_saved_jobs_follow_the_users_application_state(self):
+        other = User.objects.create_user(username='other', password='password', email='other@test.com')
+        SavedJob.objects.create(user=self.seeker_user, job=self.job)
+        mine = Application.objects.create(job=self.job, applicant=self.seeker_user)
+        Application.objects.create(job=self.job, applicant=other)
+
+        self.client.force_authenticate(user=self.seeker_user)
+        first = self.client.get('/api/saved-jobs/')
+        self.assertTrue(first.data['results'][0]['job']['is_applied'])
+
+        # Withdrawing leaves the newest application (and so the max) unchanged
+        mine.delete()
+        response = self.client.get('/api/saved-jobs/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        job = response.data['results'][0]['job']
+        self.assertFalse(job['is_applied'])
+        self.assertEqual(job['applications_count'], 1)
+
+    def test_malformed_pk_is_not_found(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        for url in ['/api/jobs/abc/', '/api/applications/abc/', '/api/saved-jobs/abc/']:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND, url)
+
+    def test_application_and_saved_job_lists(self):
+        self.client.force_authenticate(user=self.seeker_user)
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+        SavedJob.objects.create(user=self.seeker_user, job=self.job)
+
+        for url in ['/api/applications/', '/api/saved-jobs/']:
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+
+            self.job.title = f"Dev {url}"
+            self.job.save()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP down")
+
+
+class CircuitOpenEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise CircuitOpenError(30)
+
+
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        self.job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+        OutboundEmail.objects.all().delete()
+
+    def drain(self):
+        call_command('send_queued_emails', once=True, stdout=StringIO())
+
+    def test_signals_queue_instead_of_sending(self):
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.filter(status='pending')
+        self.assertEqual(sorted(email.recipients[0] for email in queued), ['emp@test.com', 'seek@test.com'])
+
+        self.drain()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.CircuitOpenEmailBackend')
+    def test_open_circuit_returns_emails_without_using_attempts(self):
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+
+        self.drain()
+        self.assertEqual(
+            list(OutboundEmail.objects.values_list('status', 'attempts', 'claimed_at')),
+            [('pending', 0, None)] * 2,
+        )
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.FailingEmailBackend')
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+
+        self.drain()
+        email = OutboundEmail.objects.first()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("SMTP down", email.last_error)
+        self.assertGreater(email.send_after, email.created_at)
+
+        # Not due yet, so another pass leaves it alone
+        self.drain()
+        self.assertEqual(OutboundEmail.objects.get(pk=email.pk).attempts, 1)
+
+        OutboundEmail.objects.update(attempts=outbox.MAX_ATTEMPTS - 1, send_after=email.created_at)
+        self.drain()
+        self.assertEqual(OutboundEmail.objects.get(pk=email.pk).status, 'failed')
+
+    def test_reclaiming_a_stalled_email_uses_an_attempt(self):
+        Application.objects.create(job=self.job, applicant=self.seeker_user)
+        stalled = timezone.now() - outbox.CLAIM_TIMEOUT - timedelta(minutes=1)
+        OutboundEmail.objects.update(status='sending', claimed_at=stalled, attempts=1)
+
+        self.assertEqual([email.attempts for email in outbox.claim_batch(10)], [2, 2])
+        self.assertEqual(set(OutboundEmail.objects.values_list('attempts', flat=True)), {2})
+
+        # A worker that died on the last attempt does not get another one
+        OutboundEmail.objects.update(claimed_at=stalled, attempts=outbox.MAX_ATTEMPTS)
+        self.assertEqual(outbox.claim_batch(10), [])
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', flat=True)), {'failed'})
+
+
+class EmailAssetsTest(TestCase):
+    CONTEXT = {
+        'user_name': 'Ada <Admin> & "co"',
+        'username': 'ada',
+        'email': 'ada@test.com',
+        'user_type': 'Job Seeker',
+        'applicant_name': 'Grace',
+        'applicant_email': 'grace@test.com',
+        'employer_name': 'Acme',
+        'company_name': 'Acme & Sons',
+        'company': 'Acme',
+        'job_title': 'Python <Developer>',
+        'job_url': 'http://localhost/jobs/1',
+        'jobs_url': 'http://localhost/jobs',
+        'portal_url': 'http://localhost',
+        'dashboard_url': 'http://localhost/dashboard',
+        'profile_url': 'http://localhost/profile',
+        'status_message': 'Reviewed',
+    }
+    TEMPLATES = [
+        'emails/welcome_email.html',
+        'emails/profile_email.html',
+        'emails/job_posted_email.html',
+        'emails/job_deleted_email.html',
+        'emails/application_submitted_email.html',
+        'emails/new_application_email.html',
+        'emails/job_seeker_welcome.html',
+        'emails/job_seeker_profile_complete.html',
+        'emails/employer_welcome.html',
+    ]
+
+    def test_rendering_matches_render_to_string(self):
+        for template_name in self.TEMPLATES:
+            html, plain = email_assets.render_email(template_name, self.CONTEXT)
+            expected = render_to_string(template_name, self.CONTEXT)
+            self.assertEqual(html, expected, template_name)
+            self.assertEqual(plain, strip_tags(expected), template_name)
+
+    def test_static_keys_select_the_template_branch(self):
+        for status_value in ['shortlisted', 'rejected', 'accepted']:
+            context = dict(self.CONTEXT, status=status_value)
+            html, plain = email_assets.render_email(
+                'emails/application_status_email.html', context, static_keys=['status', 'status_message']
+            )
+            expected = render_to_string('emails/application_status_email.html', context)
+            self.assertEqual(html, expected)
+            self.assertEqual(plain, strip_tags(expected))
+
+    def test_logo_part_is_prebuilt_and_copied(self):
+        email_assets.load_logo()
+        first, second = email_assets.get_logo_part(), email_assets.get_logo_part()
+        if first is None:
+            self.skipTest("favicon_clean.png is not available in this checkout")
+        self.assertIsNot(first, second)
+        self.assertEqual(first['Content-ID'], '<logo_image>')
+        self.assertEqual(first.get_payload(), second.get_payload())
+
+
+class ApplyTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        self.job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+        self.other_job = Job.objects.create(
+            title="Ops",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Run stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+        self.client.force_authenticate(user=self.seeker_user)
+
+    def test_duplicate_apply_is_rejected_with_existing_application(self):
+        first = self.client.post(f'/api/jobs/{self.job.id}/apply/', {'cover_letter': 'Hi'})
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        resume = SimpleUploadedFile("cv.pdf", b"file_content", content_type="application/pdf")
+        second = self.client.post(f'/api/jobs/{self.job.id}/apply/', {'resume': resume}, format='multipart')
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.data['application_id'], first.data['id'])
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_idempotency_key_replays_the_first_response(self):
+        url = f'/api/jobs/{self.job.id}/apply/'
+        first = self.client.post(url, {'cover_letter': 'Hi'}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        # The retry skips validation and the INSERT altogether
+        with self.assertNumQueries(1):
+            retry = self.client.post(url, {'cover_letter': 'Hi again'}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+        reused = self.client.post(f'/api/jobs/{self.other_job.id}/apply/', {}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        url = f'/api/jobs/{self.job.id}/apply/'
+        self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY='abc')
+
+        other = User.objects.create_user(username='other', password='password', email='other@test.com')
+        self.client.force_authenticate(user=other)
+        response = self.client.post(url, {}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyRecord.objects.count(), 2)
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentApplyTest(TransactionTestCase):
+    def test_parallel_applies_create_one_application(self):
+        employer = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        seeker = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=employer,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+
+        attempts = 6
+        barrier = threading.Barrier(attempts)
+        codes = []
+
+        def apply(key):
+            client = APIClient()
+            client.force_authenticate(user=seeker)
+            try:
+                barrier.wait()
+                headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+                codes.append(client.post(f'/api/jobs/{job.id}/apply/', {'cover_letter': 'Hi'}, **headers).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=apply, args=('retry' if i % 2 else None,)) for i in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(Application.objects.filter(job=job, applicant=seeker).count(), 1)
+        self.assertEqual(len(codes), attempts)
+        self.assertEqual(codes.count(status.HTTP_201_CREATED) + codes.count(status.HTTP_400_BAD_REQUEST), attempts)
+        self.assertGreaterEqual(codes.count(status.HTTP_201_CREATED), 1)
+
+
+class JobRelationshipsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.seeker_user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        self.jobs = [
+            Job.objects.create(
+                title=f"Dev {i}",
+                company="Test Corp",
+                employer=self.employer_user,
+                description="Code stuff",
+                location="Remote",
+                job_type='full-time',
+            )
+            for i in range(3)
+        ]
+        SavedJob.objects.create(user=self.seeker_user, job=self.jobs[0])
+        self.application = Application.objects.create(job=self.jobs[1], applicant=self.seeker_user, status='reviewed')
+        self.client.force_authenticate(user=self.seeker_user)
+
+    def test_relationships_in_two_queries(self):
+        ids = ','.join(str(job.id) for job in self.jobs)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/relationships/', {'ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data['results']
+        self.assertTrue(results[str(self.jobs[0].id)]['is_saved'])
+        self.assertFalse(results[str(self.jobs[0].id)]['is_applied'])
+        self.assertEqual(results[str(self.jobs[1].id)]['application_status'], 'reviewed')
+        self.assertEqual(results[str(self.jobs[1].id)]['application_id'], self.application.id)
+        self.assertEqual(results[str(self.jobs[2].id)], {
+            'is_saved': False, 'is_applied': False, 'application_id': None, 'application_status': None,
+        })
+
+        response = self.client.post('/api/jobs/relationships/', {'ids': [self.jobs[0].id]}, format='json')
+        self.assertEqual(list(response.data['results']), [str(self.jobs[0].id)])
+
+    def test_invalid_and_oversized_requests(self):
+        self.assertEqual(self.client.get('/api/jobs/relationships/', {'ids': '1,x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        ids = ','.join(str(i) for i in range(1, 502))
+        self.assertEqual(self.client.get('/api/jobs/relationships/', {'ids': ids}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get('/api/jobs/relationships/', {'ids': '1'}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_without_user_state_is_shared_across_users(self):
+        params = {'include_user_state': 'false'}
+        first = self.client.get('/api/jobs/', params)
+        self.assertNotIn('is_saved', first.data['results'][0])
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        self.client.force_authenticate(user=self.employer_user)
+        second = self.client.get('/api/jobs/', params)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+        self.assertIn('is_saved', self.client.get('/api/jobs/').data['results'][0])
+
+
+class MyJobsSummaryTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.other_employer = User.objects.create_user(username='other', password='password', email='other@test.com')
+        self.jobs = [
+            Job.objects.create(
+                title=f"Dev {i}",
+                company="Test Corp",
+                employer=self.employer_user,
+                description="Code stuff",
+                location="Remote",
+                job_type='full-time',
+            )
+            for i in range(3)
+        ]
+        Job.objects.create(
+            title="Not mine",
+            company="Other Corp",
+            employer=self.other_employer,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+
+        statuses = ['pending', 'pending', 'shortlisted', 'rejected']
+        for i, application_status in enumerate(statuses):
+            seeker = User.objects.create_user(username=f'seeker{i}', password='password', email=f'seek{i}@test.com')
+            Application.objects.create(job=self.jobs[1], applicant=seeker, status=application_status)
+            SavedJob.objects.create(user=seeker, job=self.jobs[1])
+        Application.objects.create(job=self.jobs[2], applicant=seeker, status='accepted')
+        self.client.force_authenticate(user=self.employer_user)
+
+    def test_summary_counts_in_one_aggregate_query(self):
+        # One COUNT for the page plus one GROUP BY query for the rows
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/my_jobs/', {'summary': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+
+        rows = {row['id']: row for row in response.data['results']}
+        busy = rows[self.jobs[1].id]
+        self.assertEqual(busy['applications_count'], 4)
+        self.assertEqual(busy['saved_count'], 4)
+        self.assertEqual(busy['status_counts'], {
+            'pending': 2, 'reviewed': 0, 'shortlisted': 1, 'rejected': 1, 'accepted': 0,
+        })
+        self.assertIsNotNone(busy['latest_application_at'])
+        self.assertEqual(rows[self.jobs[0].id]['applications_count'], 0)
+        self.assertIsNone(rows[self.jobs[0].id]['latest_application_at'])
+
+    def test_summary_is_sortable_by_counts(self):
+        response = self.client.get('/api/jobs/my_jobs/', {'summary': 'true', 'ordering': '-applications_count'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.jobs[1].id, self.jobs[2].id, self.jobs[0].id])
+
+        response = self.client.get('/api/jobs/my_jobs/', {'summary': 'true', 'ordering': '-accepted_count', 'page_size': 1})
+        self.assertEqual(response.data['results'][0]['id'], self.jobs[2].id)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get('/api/jobs/my_jobs/', {'summary': 'true', 'ordering': '-latest_application_at'})
+        self.assertEqual(response.data['results'][-1]['id'], self.jobs[0].id)
+
+    def test_plain_my_jobs_is_unchanged(self):
+        response = self.client.get('/api/jobs/my_jobs/')
+        self.assertEqual(len(response.data), 3)
+        self.assertIn('is_saved', response.data[0])
+
+
+class BulkApplicationStatusTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.employer_user.profile.user_type = 'employer'
+        self.employer_user.profile.save()
+        other_employer = User.objects.create_user(username='other', password='password', email='other@test.com')
+
+        job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+        other_job = Job.objects.create(
+            title="Ops",
+            company="Other Corp",
+            employer=other_employer,
+            description="Run stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+        self.applications = []
+        for i in range(20):
+            seeker = User.objects.create_user(username=f'seeker{i}', password='password', email=f'seek{i}@test.com')
+            self.applications.append(Application.objects.create(job=job, applicant=seeker))
+        self.applications[0].status = 'shortlisted'
+        self.applications[0].save()
+        self.foreign = Application.objects.create(job=other_job, applicant=seeker)
+
+        OutboundEmail.objects.all().delete()
+        self.client.force_authenticate(user=self.employer_user)
+
+    def test_bulk_update_is_constant_in_queries(self):
+        ids = [application.id for application in self.applications] + [self.foreign.id, 999999]
+
+        # SELECT, UPDATE, history INSERT, email INSERT and the ownership
+        # lookup, plus the transaction's savepoint, however many rows change
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                '/api/applications/bulk_update_status/', {'ids': ids, 'status': 'shortlisted'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['updated']), 19)
+        self.assertEqual(response.data['unchanged'], [self.applications[0].id])
+        self.assertEqual(response.data['not_found'], sorted([self.foreign.id, 999999]))
+
+        self.assertEqual(Application.objects.filter(status='shortlisted').count(), 20)
+        self.assertEqual(Application.objects.get(pk=self.foreign.pk).status, 'pending')
+        self.assertEqual(ApplicationStatusChange.objects.filter(new_status='shortlisted', old_status='pending').count(), 19)
+        self.assertEqual(OutboundEmail.objects.count(), 19)
+        self.assertIn('shortlisted', OutboundEmail.objects.first().subject)
+
+    def test_invalid_requests(self):
+        url = '/api/applications/bulk_update_status/'
+        self.assertEqual(self.client.post(url, {'ids': [1], 'status': 'hired'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {'ids': 'all', 'status': 'reviewed'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_single_update_records_history(self):
+        application = self.applications[1]
+        self.client.patch(f'/api/applications/{application.id}/update_status/', {'status': 'rejected'}, format='json')
+        change = ApplicationStatusChange.objects.get(application=application)
+        self.assertEqual((change.old_status, change.new_status, change.changed_by), ('pending', 'rejected', self.employer_user))
+
+
+class ApplicantDetailsQueryTest(TestCase):
+    APPLICANTS = 1000
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.employer_user.profile.user_type = 'employer'
+        self.employer_user.profile.save()
+        job = Job.objects.create(
+            title="Dev",
+            company="Test Corp",
+            employer=self.employer_user,
+            description="Code stuff",
+            location="Remote",
+            job_type='full-time',
+        )
+
+        # bulk_create skips the signals, so half the applicants have only a
+        # JobSeeker, a quarter only a UserProfile and the rest neither
+        seekers = User.objects.bulk_create([
+            User(username=f'seeker{i}', email=f'seek{i}@test.com') for i in range(self.APPLICANTS)
+        ])
+        JobSeeker.objects.bulk_create([
+            JobSeeker(user=seeker, resume=f'resumes/cv{i}.pdf', skills='python, django')
+            for i, seeker in enumerate(seekers[:self.APPLICANTS // 2])
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=seeker, resume=f'resumes/profile{i}.pdf')
+            for i, seeker in enumerate(seekers[self.APPLICANTS // 2:self.APPLICANTS * 3 // 4])
+        ])
+        Application.objects.bulk_create([Application(job=job, applicant=seeker) for seeker in seekers])
+        self.client.force_authenticate(user=self.employer_user)
+
+    def test_page_of_applicants_in_fixed_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/applications/', {'page_size': 100})
+        self.assertEqual(response.data['count'], self.APPLICANTS)
+
+        details = [row['applicant_details'] for row in response.data['results']]
+        self.assertEqual(len(details), 100)
+
+    def test_all_applicants_serialize_in_one_query(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            queryset = Application.objects.filter(job__employer=self.employer_user).select_related(
+                'job', 'applicant', 'applicant__job_seeker', 'applicant__profile'
+            )
+            data = ApplicationSerializer(queryset, many=True, context={'request': request}).data
+
+        by_email = {row['applicant_email']: row['applicant_details'] for row in data}
+        self.assertEqual(by_email['seek0@test.com']['profile_resume_url'], 'http://testserver/media/resumes/cv0.pdf')
+        self.assertEqual(by_email['seek0@test.com']['skills'], ['python', 'django'])
+        self.assertEqual(
+            by_email[f'seek{self.APPLICANTS // 2}@test.com']['profile_resume_url'],
+            'http://testserver/media/resumes/profile0.pdf',
+        )
+        self.assertIsNone(by_email[f'seek{self.APPLICANTS - 1}@test.com'])
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/min'), (5, 60))
+        self.assertEqual(parse_rate('3/10m'), (3, 600))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+        self.assertIsNone(parse_rate(None))
+        with self.assertRaises(ValueError):
+            parse_rate('often')
+
+    def test_sliding_window_weights_the_previous_window(self):
+        limiter = SlidingWindowLimiter(4, 60, clock=self.clock)
+        self.clock.now = 60 * 1000  # start of a window
+        self.assertEqual([limiter.hit('k')[0] for _ in range(5)], [True] * 4 + [False])
+
+        # Half way into the next window half of the previous 5 still count
+        self.clock.advance(90)
+        self.assertEqual(limiter.hit('k'), (True, 0))
+        allowed, retry_after = limiter.hit('k')
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+
+        self.assertEqual(round(retry_after), 18)
+
+        self.clock.advance(retry_after + 0.01)
+        self.assertTrue(limiter.hit('k')[0])
+        self.assertTrue(limiter.hit('other')[0])
+
+    def test_token_bucket_refills_over_time(self):
+        limiter = TokenBucketLimiter(3, 30, clock=self.clock)
+        self.assertEqual([limiter.hit('k')[0] for _ in range(4)], [True, True, True, False])
+        allowed, retry_after = limiter.hit('k')
+        self.assertEqual(retry_after, 10)
+
+        self.clock.advance(10)
+        self.assertTrue(limiter.hit('k')[0])
+        self.assertFalse(limiter.hit('k')[0])
+
+    def test_apply_throttle_rejects_before_touching_the_database(self):
+        employer = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        seeker = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        client = APIClient()
+        client.force_authenticate(user=seeker)
+
+        with override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'apply_user': '2/h'}}), \
+                mock.patch.object(RateLimitThrottle, 'timer', self.clock):
+            for _ in range(2):
+                client.post('/api/jobs/999/apply/')
+            with self.assertNumQueries(0):
+                response = client.post('/api/jobs/999/apply/')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '1800')
+
+
+class MaintenanceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        today = timezone.localdate()
+        self.expired_job, self.closing_job, self.open_job = [
+            Job.objects.create(
+                title=f"Dev {i}",
+                company="Test Corp",
+                employer=self.employer_user,
+                description="Code stuff",
+                location="Remote",
+                job_type='full-time',
+                deadline=deadline,
+            )
+            for i, deadline in enumerate([today - timedelta(days=1), today, None])
+        ]
+        now = timezone.now()
+        for i in range(3):
+            OTP.objects.create(email=f'old{i}@test.com', code_hash='x', expires_at=now - timedelta(minutes=1))
+        OTP.objects.create(email='live@test.com', code_hash='x', expires_at=now + timedelta(minutes=5))
+        UserAccountHistory.objects.create(user=self.employer_user, action='logged_in')
+        UserAccountHistory.objects.create(user=self.employer_user, action='logged_in')
+        UserAccountHistory.objects.filter(pk=UserAccountHistory.objects.first().pk).update(created_at=now - timedelta(days=400))
+
+    def test_due_tasks_run_once_and_record_their_runs(self):
+        results = maintenance.run_due(owner='worker-1')
+        self.assertEqual(results['purge_expired_otps'][0], 3)
+        self.assertEqual(results['deactivate_expired_jobs'][0], 1)
+        self.assertEqual(results['purge_account_history'][0], 1)
+
+        self.assertEqual(list(OTP.objects.values_list('email', flat=True)), ['live@test.com'])
+        self.assertEqual(
+            list(Job.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)),
+            [self.closing_job.pk, self.open_job.pk],
+        )
+        self.assertEqual(UserAccountHistory.objects.count(), 1)
+
+        record = MaintenanceTask.objects.get(name='purge_expired_otps')
+        self.assertEqual((record.last_rows_affected, record.total_runs, record.last_error), (3, 1, ''))
+        self.assertIsNotNone(record.last_duration)
+        self.assertEqual(record.lease_owner, '')
+        self.assertGreater(record.next_run_at, timezone.now())
+
+        # Nothing is due any more, for this worker or another
+        self.assertEqual(maintenance.run_due(owner='worker-2'), {})
+
+    def test_leased_tasks_are_skipped_until_the_lease_expires(self):
+        maintenance.register_tasks()
+        MaintenanceTask.objects.update(lease_owner='worker-1', lease_expires_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(maintenance.run_due(owner='worker-2', force=True), {})
+
+        MaintenanceTask.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        results = maintenance.run_due(names=['purge_expired_otps'], owner='worker-2')
+        self.assertEqual(list(results), ['purge_expired_otps'])
+
+    def test_batches_are_bounded_and_a_backlog_stays_due(self):
+        results = maintenance.run_due(names=['purge_expired_otps'], batch_size=2, max_batches=1)
+        self.assertEqual(results['purge_expired_otps'][0], 2)
+        self.assertLessEqual(MaintenanceTask.objects.get(name='purge_expired_otps').next_run_at, timezone.now())
+
+        with self.assertNumQueries(2):
+            # One SELECT of the ids and one DELETE per batch
+            self.assertEqual(maintenance.purge_expired_otps(2), 1)
+        self.assertEqual(OTP.objects.count(), 1)
+
+    def test_failed_task_records_the_error(self):
+        with mock.patch.object(maintenance.TASKS['purge_expired_otps'], 'func', side_effect=RuntimeError('boom')):
+            results = maintenance.run_due(names=['purge_expired_otps'])
+        self.assertEqual(results['purge_expired_otps'][2], 'boom')
+        record = MaintenanceTask.objects.get(name='purge_expired_otps')
+        self.assertEqual((record.last_error, record.lease_owner), ('boom', ''))
+
+    def test_deactivated_jobs_leave_cached_lists(self):
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.data['count'], 3)
+
+        maintenance.run_due(names=['deactivate_expired_jobs'])
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_command_runs_named_tasks(self):
+        out = StringIO()
+        call_command('run_maintenance', task=['purge_expired_otps'], stdout=out)
+        self.assertIn('purge_expired_otps: 3 rows', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('run_maintenance', task=['nope'], stdout=out)
+
+
+class RecommendationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        recommendations.engine.reset()
+        self.addCleanup(recommendations.engine.reset)
+        self.employer = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+
+        self.user = User.objects.create_user(username='seeker', password='password', email='seek@test.com')
+        JobSeeker.objects.create(
+            user=self.user,
+            skills='Python, Django',
+            preferred_locations='Chennai, Remote',
+            preferred_job_types='Full-time',
+            experience_level='mid',
+            expected_salary=90000,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.backend = self.create_job('Backend', 'Python, Django', 'Chennai, India', 'mid', 80000, 100000)
+        self.scripting = self.create_job('Scripting', 'Python, Bash', 'Pune', 'senior', 50000, 60000)
+        self.frontend = self.create_job('Frontend', 'React', 'Delhi', 'fresher', None, None, job_type='internship')
+
+    def create_job(self, title, skills, location, experience, salary_min, salary_max, job_type='full-time'):
+        return Job.objects.create(
+            title=title, company='Test Corp', employer=self.employer, description='Code stuff',
+            requirements='None', location=location, job_type=job_type, skills=skills,
+            experience_required=experience, salary_min=salary_min, salary_max=salary_max,
+        )
+
+    def recommended(self, **params):
+        response = self.client.get('/api/jobs/recommended/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item['id'], item['match_score']) for item in response.data['results']]
+
+    def test_jobs_are_ranked_by_match(self):
+        ranked = self.recommended()
+        self.assertEqual([job_id for job_id, score in ranked], [self.backend.id, self.scripting.id, self.frontend.id])
+        self.assertEqual(ranked[0][1], 1.0)
+        self.assertEqual([job_id for job_id, score in self.recommended(limit=1)], [self.backend.id])
+
+    def test_matrix_follows_job_changes_incrementally(self):
+        self.recommended()
+        self.scripting.skills = 'Python, Django'
+        self.scripting.location = 'Remote'
+        self.scripting.save()
+        self.backend.is_active = False
+        self.backend.save()
+
+        with mock.patch.object(recommendations.engine, 'rebuild', wraps=recommendations.engine.rebuild) as rebuild:
+            ranked = self.recommended()
+        rebuild.assert_not_called()
+        self.assertEqual([job_id for job_id, score in ranked], [self.scripting.id, self.frontend.id])
+
+    def test_deleted_job_is_dropped_without_a_rebuild(self):
+        self.recommended()
+        # A delete plus a create leaves the number of active jobs unchanged
+        self.frontend.delete()
+        devops = self.create_job('DevOps', 'Bash', 'Delhi', 'fresher', None, None)
+
+        with mock.patch.object(recommendations.engine, 'rebuild', wraps=recommendations.engine.rebuild) as rebuild:
+            ranked = self.recommended()
+        rebuild.assert_not_called()
+        self.assertEqual([job_id for job_id, score in ranked], [self.backend.id, self.scripting.id, devops.id])
+
+    def test_unchanged_jobs_are_not_reread(self):
+        self.recommended()
+        # job seeker, its skills and the ranked jobs; the matrix is up to date
+        with self.assertNumQueries(3):
+            self.recommended()
+
+    def test_job_seeker_profile_required(self):
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.get('/api/jobs/recommended/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_recommendations', jobs=2000, queries=20, stdout=out)
+        self.assertIn('p95', out.getvalue())
+
+
+class ApplicantRankingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='password', email='emp@test.com')
+        self.employer.profile.user_type = 'employer'
+        self.employer.profile.save()
+        self.job = Job.objects.create(
+            title='Backend', company='Test Corp', employer=self.employer, description='Code stuff',
+            requirements='None', location='Chennai, India', job_type='full-time',
+            skills='Python, Django', experience_required='mid',
+        )
+
+        self.strong = self.apply('strong', skills='Python, Django', experience_level='mid', location='Chennai')
+        self.partial = self.apply('partial', skills='Python', experience_level='expert', preferred_locations='Pune')
+        self.no_profile = self.apply('no_profile')
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.employer)
+
+    def apply(self, username, **profile):
+        user = User.objects.create_user(username=username, password='password', email=f'{username}@test.com')
+        if profile:
+            JobSeeker.objects.create(user=user, **profile)
+        return Application.objects.create(job=self.job, applicant=user)
+
+    def ranked(self, **params):
+        response = self.client.get('/api/applications/', {'job': self.job.id, 'ordering': '-match_score', **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row['id'], row['match_score']) for row in response.data['results']]
+
+    def test_applicants_are_ranked_against_the_job(self):
+        ranked = self.ranked()
+        self.assertEqual([pk for pk, score in ranked], [self.strong.id, self.partial.id, self.no_profile.id])
+        self.assertEqual(ranked[0][1], 1.0)
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 0)
+
+        ranked = self.ranked(pagination='cursor')
+        self.assertEqual([pk for pk, score in ranked], [self.strong.id, self.partial.id, self.no_profile.id])
+
+    def test_scores_are_computed_in_fixed_queries(self):
+        # stale ids, the job and its skills, job seekers and their skills, one
+        # bulk UPDATE, then the validator aggregate and the page
+        with self.assertNumQueries(8):
+            self.ranked()
+        with self.assertNumQueries(3):
+            self.ranked()
+
+        for i in range(5):
+            self.apply(f'more{i}', skills='Go', experience_level='junior')
+        with self.assertNumQueries(8):
+            self.ranked()
+        with self.assertNumQueries(3):
+            self.ranked()
+
+    def test_profile_changes_invalidate_their_scores(self):
+        self.ranked()
+        seeker = JobSeeker.objects.get(user=self.partial.applicant)
+        seeker.skills = 'Python, Django'
+        seeker.experience_level = 'mid'
+        seeker.save()
+        self.assertEqual(list(Application.objects.filter(match_score__isnull=True)), [self.partial])
+
+        seeker.headline = 'Backend developer'
+        seeker.save()
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 1)
+        self.assertEqual(dict(self.ranked())[self.partial.id], 0.85)
+
+    def test_job_changes_invalidate_its_scores(self):
+        self.ranked()
+        job = Job.objects.get(pk=self.job.pk)
+        job.title = 'Senior Backend'
+        job.save()
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 0)
+
+        job.location = 'Pune'
+        job.skills = 'Python'
+        job.experience_required = 'expert'
+        job.save()
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 3)
+        self.assertEqual([pk for pk, score in self.ranked()], [self.partial.id, self.strong.id, self.no_profile.id])
+
+    def test_scores_are_only_computed_for_one_job(self):
+        response = self.client.get('/api/applications/', {'ordering': '-match_score'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 3)
+
+        with mock.patch.object(ranking, 'MAX_SCORES_PER_REQUEST', 2):
+            self.ranked()
+        self.assertEqual(Application.objects.filter(match_score__isnull=True).count(), 1)
+
+    def test_applicants_do_not_see_their_score(self):
+        self.ranked()
+        client = APIClient()
+        client.force_authenticate(user=self.strong.applicant)
+        response = client.get('/api/applications/')
+        self.assertNotIn('match_score', response.data['results'][0])
+        self.assertIn('match_score', self.client.get(f'/api/applications/{self.strong.id}/').data)
+
+    def test_unchanged_job_save_is_still_written(self):
+        job = Job.objects.get(pk=self.job.pk)
+        with mock.patch('jobs.signals.job_cache.invalidate_job') as invalidate:
+            job.save()
+        invalidate.assert_called_once_with(job.pk)
+        self.assertGreater(Job.objects.get(pk=job.pk).updated_at, self.job.updated_at)
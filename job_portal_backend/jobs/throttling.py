@@ -0,0 +1,197 @@
+"""
+Cache-backed rate limiting.
+
+Two interchangeable limiters keep their state in the Django cache:
+
+- ``SlidingWindowLimiter`` weights the previous fixed window's count by how
+  much of it still overlaps the sliding window. Costs one incr and one get.
+- ``TokenBucketLimiter`` refills ``limit`` tokens per period and allows
+  short bursts. Costs one get and one set (last writer wins under races).
+
+``RateLimitThrottle`` exposes them to DRF. Each subclass names a ``scope``,
+whose rate comes from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``, and the
+request attribute it keys on (IP, email, username or user). Throttles run
+before the view, so a rejected request never reaches the password hasher
+(and, apart from the email lookup of ``LoginUsernameThrottle``, never
+reaches the database).
+"""
+import hashlib
+import math
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])')
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60), '3/10m' -> (3, 600); None for no limit"""
+    if rate is None:
+        return None
+    match = RATE_PATTERN.match(rate)
+    if match is None:
+        raise ValueError(f'Invalid rate {rate!r}, expected e.g. "5/min" or "3/10m"')
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIODS[unit]
+
+
+def get_cache():
+    return caches[getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'default')]
+
+
+class SlidingWindowLimiter:
+    def __init__(self, limit, period, cache=None, clock=time.time):
+        self.limit = limit
+        self.period = period
+        self.cache = cache or get_cache()
+        self.clock = clock
+
+    def hit(self, key):
+        """Record a request; return (allowed, seconds until the next one would be)"""
+        now = self.clock()
+        window = int(now // self.period)
+        current_key = f'{key}:{window}'
+        # Rejected requests count too, so a flood stays rejected
+        if self.cache.add(current_key, 1, self.period * 2):
+            current = 1
+        else:
+            try:
+                current = self.cache.incr(current_key)
+            except ValueError:
+                # Evicted between add() and incr()
+                self.cache.set(current_key, 1, self.period * 2)
+                current = 1
+        previous = self.cache.get(f'{key}:{window - 1}', 0)
+
+        elapsed = now / self.period - window
+        estimated = previous * (1 - elapsed) + current
+        if estimated <= self.limit:
+            return True, 0
+        # The retry counts as a hit too; wait until enough of the older
+        # window has slid out for it to fit
+        if current < self.limit:
+            overlap_allowed = (self.limit - current - 1) / previous
+            return False, max((1 - overlap_allowed - elapsed) * self.period, 0)
+        overlap_allowed = (self.limit - 1) / current
+        return False, (window + 1) * self.period - now + max(1 - overlap_allowed, 0) * self.period
+
+
+class TokenBucketLimiter:
+    def __init__(self, limit, period, cache=None, clock=time.time):
+        self.limit = limit
+        self.period = period
+        self.cache = cache or get_cache()
+        self.clock = clock
+
+    def hit(self, key):
+        now = self.clock()
+        rate = self.limit / self.period
+        tokens, updated = self.cache.get(key, (self.limit, now))
+        tokens = min(self.limit, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            self.cache.set(key, (tokens - 1, now), self.period * 2)
+            return True, 0
+        self.cache.set(key, (tokens, now), self.period * 2)
+        return False, (1 - tokens) / rate
+
+
+LIMITERS = {
+    'sliding_window': SlidingWindowLimiter,
+    'token_bucket': TokenBucketLimiter,
+}
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Base DRF throttle. Subclasses set ``scope`` and ``key``: 'ip', 'user',
+    or a request data field such as 'email' or 'username'. A request without
+    that key (e.g. no email posted) isn't limited by this throttle.
+    """
+    scope = None
+    key = 'ip'
+    algorithm = 'sliding_window'
+    timer = time.time
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_key_value(self, request):
+        if self.key == 'ip':
+            return self.get_ident(request)
+        if self.key == 'user':
+            return request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        value = request.data.get(self.key) if hasattr(request.data, 'get') else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return value.strip().casefold()
+
+    def get_cache_key(self, value):
+        digest = hashlib.sha1(str(value).encode('utf-8')).hexdigest()
+        return f'throttle:{self.scope}:{self.key}:{digest}'
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        rate = parse_rate(self.get_rate())
+        value = self.get_key_value(request)
+        if rate is None or value is None:
+            return True
+        limiter = LIMITERS[self.algorithm](*rate, clock=self.timer)
+        allowed, retry_after = limiter.hit(self.get_cache_key(value))
+        if not allowed:
+            self.retry_after = retry_after
+        return allowed
+
+    def wait(self):
+        return math.ceil(self.retry_after) if self.retry_after else None
+
+
+class OTPSendIPThrottle(RateLimitThrottle):
+    scope = 'otp_send_ip'
+
+
+class OTPSendEmailThrottle(RateLimitThrottle):
+    scope = 'otp_send_email'
+    key = 'email'
+
+
+class OTPVerifyEmailThrottle(RateLimitThrottle):
+    scope = 'otp_verify_email'
+    key = 'email'
+
+
+class LoginIPThrottle(RateLimitThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(RateLimitThrottle):
+    """
+    Keys on the account, so guesses by username and by email share a budget.
+    Login accepts either; an email is resolved to its account's username.
+    """
+    scope = 'login_username'
+    key = 'username'
+
+    def get_key_value(self, request):
+        value = super().get_key_value(request)
+        if value is None or '@' not in value:
+            return value
+        usernames = list(get_user_model().objects.filter(email__iexact=value).values_list('username', flat=True)[:2])
+        # Unknown (or ambiguous) emails are limited on their own
+        return usernames[0].casefold() if len(usernames) == 1 else value
+
+
+class ApplyUserThrottle(RateLimitThrottle):
+    scope = 'apply_user'
+    key = 'user'
+    algorithm = 'token_bucket'
+
+
+OTP_SEND_THROTTLES = [OTPSendIPThrottle, OTPSendEmailThrottle]
+OTP_VERIFY_THROTTLES = [LoginIPThrottle, OTPVerifyEmailThrottle]
+LOGIN_THROTTLES = [LoginIPThrottle, LoginUsernameThrottle]
@@ -0,0 +1,86 @@
+"""
+Dirty-field tracking for models.
+
+``DirtyFieldsMixin`` remembers the field values an instance was loaded with,
+so code can ask what changed (``changed_fields``, ``has_changed()``,
+``get_previous()``) without reading the row again. ``save()`` of a loaded
+instance writes only the changed fields, plus any ``auto_now`` fields; a
+save with nothing changed still writes the ``auto_now`` fields and fires
+the save signals (a model without any gets a normal full save).
+A field deferred at load time counts as changed once it is assigned; after
+a save only the fields written are taken as the new database values.
+
+Models that only want the tracking set ``update_changed_fields = False``,
+which leaves ``save()`` as Django's.
+
+pre_save/post_save receivers see the saved fields in ``update_fields``;
+``changed_fields`` and ``get_previous()`` still describe the change until
+``save()`` returns.
+"""
+from copy import copy
+
+
+class DirtyFieldsMixin:
+    update_changed_fields = True
+
+    def _snapshot(self, fields=None):
+        loaded = self.__dict__
+        values = {
+            field.attname: copy(loaded[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in loaded and (fields is None or field.attname in fields)
+        }
+        if fields is None or not hasattr(self, '_loaded_values'):
+            self._loaded_values = values
+        else:
+            self._loaded_values.update(values)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._snapshot({self._meta.get_field(name).attname for name in fields} if fields else None)
+
+    @property
+    def is_tracked(self):
+        """False for instances that were not loaded from the database"""
+        return hasattr(self, '_loaded_values') and not self._state.adding
+
+    @property
+    def changed_fields(self):
+        """Names of the fields whose value differs from the database, or that were assigned after being deferred"""
+        if not self.is_tracked:
+            return set()
+        loaded = self.__dict__
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in loaded and (
+                # Deferred at load time, and assigned since
+                field.attname not in self._loaded_values
+                or getattr(self, field.attname) != self._loaded_values[field.attname]
+            )
+        }
+
+    def has_changed(self, field_name):
+        return field_name in self.changed_fields
+
+    def get_previous(self, field_name):
+        """The value field_name was loaded with"""
+        return self._loaded_values.get(self._meta.get_field(field_name).attname)
+
+    def save(self, *args, **kwargs):
+        if self.update_changed_fields and self.is_tracked and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            changed = self.changed_fields | {
+                field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+            }
+            kwargs['update_fields'] = changed or None
+        super().save(*args, **kwargs)
+        # Only what was written is now the database value
+        update_fields = args[3] if len(args) > 3 else kwargs.get('update_fields')
+        self._snapshot(None if update_fields is None else {self._meta.get_field(name).attname for name in update_fields})
+
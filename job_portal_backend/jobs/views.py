@@ -1,16 +1,30 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.db.models import F, Prefetch, Max, Sum
 from django.contrib.auth import authenticate
-from .models import UserProfile, Job, Application, SavedJob
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+from accounts.models import JobSeeker
+from .models import UserProfile, Job, Application, ApplicationStatusChange, SavedJob
 from .serializers import (
     UserSerializer, UserProfileSerializer, RegisterSerializer,
-    JobSerializer, ApplicationSerializer, SavedJobSerializer
+    JobSerializer, JobSummarySerializer, ApplicationSerializer, SavedJobSerializer
 )
+from . import cache as job_cache
+from . import idempotency
+from . import ranking
+from . import recommendations
+from .conditional import ConditionalGetMixin
+from .pagination import FeedPagination, SummaryPagination
+from .search import JobSearchFilter
+from .signals import send_status_update_emails
+from .skills import filter_jobs_by_skills
+from .throttling import ApplyUserThrottle, LOGIN_THROTTLES
+
 
 class AuthViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
@@ -25,7 +39,7 @@ class AuthViewSet(viewsets.ViewSet):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], throttle_classes=LOGIN_THROTTLES)
     def login(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
@@ -51,18 +65,67 @@ class AuthViewSet(viewsets.ViewSet):
             'profile': UserProfileSerializer(profile).data
         })
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Job.objects.filter(is_active=True)
     serializer_class = JobSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [JobSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'company', 'location', 'skills', 'description']
     ordering_fields = ['created_at', 'salary_min']
+    pagination_class = FeedPagination
+    cursor_orderings = ['-created_at', 'created_at', 'salary_min', '-salary_min']
+    user_state_query_param = 'include_user_state'
+    summary_ordering_fields = [
+        'created_at', 'title', 'applications_count', 'saved_count', 'latest_application_at',
+    ] + [f'{status}_count' for status, _ in Application.STATUS_CHOICES]
+    max_relationship_ids = 500
+    max_recommendations = 50
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             return [AllowAny()]
+        if self.action == 'cache_stats':
+            return [IsAdminUser()]
         return [IsAuthenticated()]
     
+    def list(self, request, *args, **kwargs):
+        return job_cache.cached_list(
+            request,
+            lambda: super(JobViewSet, self).list(request, *args, **kwargs),
+            shared=not self.include_user_state(),
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        return job_cache.cached_detail(
+            request, kwargs.get('pk'), lambda: super(JobViewSet, self).retrieve(request, *args, **kwargs)
+        )
+    
+    def include_user_state(self):
+        """
+        False with ?include_user_state=false: is_saved/is_applied are left out
+        (clients fetch them from relationships/), so one cached response
+        serves every user.
+        """
+        value = self.request.query_params.get(self.user_state_query_param, '')
+        return value.lower() not in ('false', '0')
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_user_state'] = self.include_user_state()
+        return context
+    
+    def get_validator_aggregates(self):
+        # New and withdrawn applications advance the job's updated_at
+        return {'last_modified': Max('updated_at')}
+    
+    def get_validator_tokens(self):
+        if self.request.user.is_authenticated and self.include_user_state():
+            return [job_cache.get_token(job_cache.USER_STATE_KEY.format(self.request.user.pk))]
+        return []
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        return Response(job_cache.get_stats())
+    
     def perform_create(self, serializer):
         # Check if user can post jobs (must be employer)
         user = self.request.user
@@ -109,32 +172,149 @@ class JobViewSet(viewsets.ModelViewSet):
         if company:
             queryset = queryset.filter(company__icontains=company)
         
-        # Filter by skills (any skill match)
+        # Filter by skills (?skills_match=any for any skill, all skills by default)
         skills = self.request.query_params.get('skills')
         if skills:
-            for skill in skills.split(','):
-                queryset = queryset.filter(skills__icontains=skill.strip())
+            match = self.request.query_params.get('skills_match', 'all')
+            queryset = filter_jobs_by_skills(queryset, skills, match)
         
-        return queryset
+        return queryset.with_listing_annotations(self.request.user if self.include_user_state() else None)
+    
+    @action(detail=False, methods=['get', 'post'])
+    def relationships(self, request):
+        """
+        The user's saved/applied state for many jobs in two queries.
+        Job ids come from ?ids=1,2,3 or a JSON body {"ids": [1, 2, 3]}.
+        """
+        raw = request.data.get('ids') if request.method == 'POST' else request.query_params.get('ids', '')
+        if isinstance(raw, str):
+            raw = [part for part in raw.split(',') if part.strip()]
+        try:
+            job_ids = list(dict.fromkeys(int(job_id) for job_id in raw or []))
+        except (TypeError, ValueError):
+            return Response({'ids': 'Expected a list of job ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(job_ids) > self.max_relationship_ids:
+            return Response(
+                {'ids': f'At most {self.max_relationship_ids} job ids per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        saved = set(
+            SavedJob.objects.filter(user=request.user, job_id__in=job_ids).values_list('job_id', flat=True)
+        )
+        applications = {
+            job_id: (application_id, application_status)
+            for job_id, application_id, application_status in Application.objects.filter(
+                applicant=request.user, job_id__in=job_ids
+            ).values_list('job_id', 'id', 'status')
+        }
+        
+        results = {}
+        for job_id in job_ids:
+            application_id, application_status = applications.get(job_id, (None, None))
+            results[str(job_id)] = {
+                'is_saved': job_id in saved,
+                'is_applied': application_id is not None,
+                'application_id': application_id,
+                'application_status': application_status,
+            }
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        """
+        Active jobs ranked for the current job seeker by skills, location,
+        job type, experience and salary fit (see jobs.recommendations).
+        ?limit= sets how many, up to max_recommendations.
+        """
+        try:
+            job_seeker = JobSeeker.objects.get(user=request.user)
+        except JobSeeker.DoesNotExist:
+            return Response({'detail': 'Job seeker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_recommendations)
+        except ValueError:
+            return Response({'limit': 'Expected a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ranked = recommendations.engine.recommend(job_seeker, limit)
+        jobs = Job.objects.filter(pk__in=[job_id for score, job_id in ranked], is_active=True).with_listing_annotations(request.user)
+        jobs_by_id = {job.pk: job for job in jobs}
+        # A job deactivated since the matrix was synced is left out
+        ranked = [(score, jobs_by_id[job_id]) for score, job_id in ranked if job_id in jobs_by_id]
+        serializer = self.get_serializer([job for score, job in ranked], many=True)
+        results = [{**data, 'match_score': score} for data, (score, job) in zip(serializer.data, ranked)]
+        return Response({'results': results})
     
     @action(detail=False, methods=['get'])
     def my_jobs(self, request):
-        jobs = Job.objects.filter(employer=request.user)
+        if request.query_params.get('summary', '').lower() in ('true', '1'):
+            return self.my_jobs_summary(request)
+        jobs = Job.objects.filter(employer=request.user).with_listing_annotations(request.user)
         serializer = self.get_serializer(jobs, many=True)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['post'])
+    def my_jobs_summary(self, request):
+        """
+        Paginated dashboard rows with application counts by status, saved
+        count and latest application, sortable with ?ordering= on any of them.
+        """
+        ordering = request.query_params.get('ordering', '-created_at')
+        if ordering.lstrip('-') not in self.summary_ordering_fields:
+            ordering = '-created_at'
+        field = F(ordering.lstrip('-'))
+        # Jobs without applications have no latest_application_at; keep them last
+        key = field.desc(nulls_last=True) if ordering.startswith('-') else field.asc(nulls_last=True)
+        jobs = Job.objects.filter(employer=request.user).with_application_summary().order_by(
+            key, '-id' if ordering.startswith('-') else 'id'
+        )
+        
+        paginator = SummaryPagination()
+        page = paginator.paginate_queryset(jobs, request, view=self)
+        return paginator.get_paginated_response(JobSummarySerializer(page, many=True).data)
+    
+    @action(detail=True, methods=['post'], throttle_classes=[ApplyUserThrottle])
     def apply(self, request, pk=None):
+        """
+        Apply in one INSERT; the unique (job, applicant) constraint decides
+        races. With an Idempotency-Key header, a retry replays the stored
+        response instead of applying (and uploading) again.
+        """
+        key = idempotency.get_key(request)
+        if key:
+            replayed = idempotency.replay(request, key)
+            if replayed is not None:
+                return replayed
+        
         job = self.get_object()
+        serializer = ApplicationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        if Application.objects.filter(job=job, applicant=request.user).exists():
-            return Response({'detail': 'You have already applied for this job.'}, status=status.HTTP_400_BAD_REQUEST)
+        application = Application(job=job, applicant=request.user, **serializer.validated_data)
+        try:
+            with transaction.atomic():
+                application.save()
+                response = Response(ApplicationSerializer(application).data, status=status.HTTP_201_CREATED)
+                if key:
+                    idempotency.remember(request, key, response)
+            return response
+        except IntegrityError:
+            # The resume was stored before the INSERT failed
+            if application.resume:
+                application.resume.delete(save=False)
+            if key:
+                replayed = idempotency.replay(request, key)
+                if replayed is not None:
+                    return replayed
+            existing = Application.objects.filter(job=job, applicant=request.user).first()
+            if existing is None:
+                raise
         
-        serializer = ApplicationSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(job=job, applicant=request.user)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'detail': 'You have already applied for this job.',
+            'application_id': existing.id,
+            'status': existing.status,
+        }, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
     def save(self, request, pk=None):
@@ -149,27 +329,65 @@ class JobViewSet(viewsets.ModelViewSet):
             SavedJob.objects.create(user=user, job=job)
             return Response({'status': 'saved', 'is_saved': True}, status=status.HTTP_201_CREATED)
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+    cursor_orderings = ['-applied_at', '-match_score', 'match_score']
+    score_orderings = ['-match_score', 'match_score']
+    last_modified_fields = ['last_modified', 'job_modified', 'profile_modified']
+    max_bulk_ids = 1000
     
-    def get_queryset(self):
+    def is_employer(self):
         user = self.request.user
         # Safely checks for user profile or assumes employer if user is superuser/staff
-        is_employer = False
         if hasattr(user, 'profile'):
-            is_employer = user.profile.user_type == 'employer'
-        elif hasattr(user, 'employer'): # Check for Employer model from accounts
-            is_employer = True
+            return user.profile.user_type == 'employer'
+        return hasattr(user, 'employer') # Check for Employer model from accounts
+    
+    def get_queryset(self):
+        user = self.request.user
+        # applicant_details reads the applicant's JobSeeker, falling back to UserProfile
+        related = ['job', 'applicant', 'applicant__job_seeker', 'applicant__profile']
+        if self.is_employer():
+            queryset = Application.objects.filter(job__employer=user).select_related(*related)
             
-        if is_employer:
-            return Application.objects.filter(job__employer=user).select_related(
-                'job', 
-                'applicant', 
-                'applicant__profile' 
-            )
-        return Application.objects.filter(applicant=user).select_related('job')
+            # Filter by job
+            job_id = self.request.query_params.get('job')
+            if job_id:
+                try:
+                    queryset = queryset.filter(job_id=int(job_id))
+                except ValueError:
+                    queryset = queryset.none()
+            
+            # Rank applicants: ?ordering=-match_score (best first) or match_score
+            ordering = self.request.query_params.get('ordering')
+            if self.action == 'list' and ordering in self.score_orderings:
+                score = F('match_score').desc(nulls_last=True) if ordering.startswith('-') else F('match_score').asc(nulls_last=True)
+                queryset = queryset.order_by(score, '-id' if ordering.startswith('-') else 'id')
+            return queryset
+        return Application.objects.filter(applicant=user).select_related(*related)
+    
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('ordering') in self.score_orderings and request.query_params.get('job') and self.is_employer():
+            # Fill in the job's missing match scores in one batch so SQL can sort by them
+            ranking.score_applications(self.get_queryset(), limit=ranking.MAX_SCORES_PER_REQUEST)
+        return super().list(request, *args, **kwargs)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Applicants don't see how they rank
+        context['include_match_score'] = self.is_employer()
+        return context
+    
+    def get_validator_aggregates(self):
+        return {
+            'last_modified': Max('updated_at'),
+            'job_modified': Max('job__updated_at'),
+            'profile_modified': Max('applicant__job_seeker__updated_at'),
+            'ids': Sum('pk'),
+        }
     
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
@@ -177,18 +395,87 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         new_status = request.data.get('status')
         
         if new_status in dict(Application.STATUS_CHOICES):
-            application.status = new_status
-            application.save()
-            return Response(ApplicationSerializer(application).data)
+            old_status = application.status
+            with transaction.atomic():
+                application.status = new_status
+                application.save()
+                if old_status != new_status:
+                    ApplicationStatusChange.objects.create(
+                        application=application, old_status=old_status, new_status=new_status, changed_by=request.user
+                    )
+            return Response(self.get_serializer(application).data)
         return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Move many applications to one status: {"ids": [...], "status": "shortlisted"}.
+        Only applications to the employer's own jobs are changed, with one
+        UPDATE, one history INSERT and one batch of queued emails.
+        """
+        new_status = request.data.get('status')
+        if new_status not in dict(Application.STATUS_CHOICES):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({'ids': 'Expected a list of application ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_bulk_ids:
+            return Response({'ids': f'At most {self.max_bulk_ids} applications per request.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        owned = Application.objects.filter(pk__in=ids, job__employer=request.user)
+        with transaction.atomic():
+            applications = list(
+                owned.exclude(status=new_status).select_related('job', 'applicant').select_for_update(of=('self',))
+            )
+            changed_ids = [application.pk for application in applications]
+            if changed_ids:
+                Application.objects.filter(pk__in=changed_ids).update(status=new_status, updated_at=timezone.now())
+                ApplicationStatusChange.objects.bulk_create([
+                    ApplicationStatusChange(
+                        application=application,
+                        old_status=application.status,
+                        new_status=new_status,
+                        changed_by=request.user,
+                    )
+                    for application in applications
+                ], batch_size=500)
+                for application in applications:
+                    application.status = new_status
+                send_status_update_emails(applications)
+        
+        found = set(owned.values_list('pk', flat=True))
+        return Response({
+            'status': new_status,
+            'updated': changed_ids,
+            'unchanged': sorted(found - set(changed_ids)),
+            'not_found': sorted(set(ids) - found),
+        })
 
-class SavedJobViewSet(viewsets.ModelViewSet):
+class SavedJobViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = SavedJob.objects.all()
     serializer_class = SavedJobSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+    cursor_orderings = ['-saved_at']
+    last_modified_fields = ['last_modified', 'job_modified']
     
     def get_queryset(self):
-        return SavedJob.objects.filter(user=self.request.user)
+        user = self.request.user
+        return SavedJob.objects.filter(user=user).prefetch_related(
+            Prefetch('job', queryset=Job.objects.with_listing_annotations(user))
+        )
+    
+    def get_validator_aggregates(self):
+        return {
+            'last_modified': Max('saved_at'),
+            # Includes the nested job's applications_count (see JobViewSet)
+            'job_modified': Max('job__updated_at'),
+            'ids': Sum('pk'),
+        }
+    
+    def get_validator_tokens(self):
+        # The nested job's is_applied
+        return [job_cache.get_token(job_cache.USER_STATE_KEY.format(self.request.user.pk))]
     
     def perform_create(self, serializer):
         job_id = self.request.data.get('job')